@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Packing / unpacking of wide integers into MI-sized slices
+
+import numpy as np
+
+
+# Slice widths that map directly to numpy unsigned integer types
+_DTYPES = {
+    8:  np.dtype('<u1'),
+    16: np.dtype('<u2'),
+    32: np.dtype('<u4'),
+    64: np.dtype('<u8'),
+}
+
+
+def mask(width : int) -> int:
+    return (1 << width) - 1
+
+
+def get_bits(val : int, width : int, pos : int) -> int:
+    """
+    Get `width` bits of `val` starting at bit `pos`
+    """
+
+    return (val >> pos) & mask(width)
+
+
+def set_bits(val : int, width : int, pos : int, bits : int) -> int:
+    """
+    Return `val` with `width` bits starting at bit `pos` replaced by `bits`
+    """
+
+    m = mask(width) << pos
+    return (val & ~m) | ((bits << pos) & m)
+
+
+def split(val : int, width : int, cnt : int):
+    """
+    Split wide integer into `cnt` slices of `width` bits (LSB slice first)
+
+    Example:
+
+        ```
+        split(0x11223344_55667788, 32, 2) == [0x55667788, 0x11223344]
+        ```
+    """
+
+    return split_array([val], width, cnt)[0].tolist()
+
+
+def join(slices, width : int) -> int:
+    """
+    Join slices of `width` bits (LSB slice first) into wide integer
+    """
+
+    dtype = _DTYPES.get(width)
+    if dtype is not None:
+        return int.from_bytes(np.asarray(slices, dtype=dtype).tobytes(), 'little')
+
+    val = 0
+    for i, s in enumerate(slices):
+        val |= (int(s) & mask(width)) << (i * width)
+    return val
+
+
+def split_array(values, width : int, cnt : int) -> np.ndarray:
+    """
+    Split list of wide integers into slices in a single pass
+
+    Parameters
+    ----------
+        values : List[int]
+            Wide integers (only the lowest `width * cnt` bits are used)
+        width : int
+            Slice width
+        cnt : int
+            Number of slices of each integer
+
+    Returns
+    -------
+        np.ndarray
+            Array with shape `(len(values), cnt)`
+            (dtype is uint8 - uint64 for byte aligned widths up to 64 bits, object otherwise)
+    """
+
+    dtype = _DTYPES.get(width)
+    if dtype is None:
+        m = mask(width)
+        res = np.empty((len(values), cnt), dtype=object)
+        for i, v in enumerate(values):
+            for s in range(cnt):
+                res[i, s] = (v >> (s * width)) & m
+        return res
+
+    nbytes = width // 8 * cnt
+    m = mask(width * cnt)
+    buff = b''.join((int(v) & m).to_bytes(nbytes, 'little') for v in values)
+    return np.frombuffer(buff, dtype=dtype).reshape(len(values), cnt)
+
+
+def join_array(slices, width : int):
+    """
+    Join 2D array of slices with shape `(items, cnt)` into list of wide integers
+    """
+
+    dtype = _DTYPES.get(width)
+    if dtype is None:
+        return [join(row, width) for row in slices]
+
+    slices = np.asarray(slices, dtype=dtype)
+    if slices.size == 0:
+        return [0] * len(slices)
+    nbytes = slices.shape[1] * dtype.itemsize
+    buff = slices.tobytes()
+    return [int.from_bytes(buff[i:i + nbytes], 'little') for i in range(0, len(buff), nbytes)]
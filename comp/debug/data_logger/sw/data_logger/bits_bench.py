@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Micro-benchmark of wide integer slicing (string based vs. data_logger.bits)
+
+import random
+import argparse
+import timeit
+
+from data_logger import bits
+
+
+def get_bits_str(val, width, pos):
+    # Original string based implementation of DataLogger.get_bits
+    binary = bin(val)[2:]
+    end   = - pos
+    start = end - width
+    if end == 0:
+        end = None
+    cut = binary[start:end]
+    if len(cut) == 0:
+        return 0
+    else:
+        return int(cut, 2)
+
+
+def split_str(values, width, cnt):
+    return [[get_bits_str(v, width, width * s) for s in range(cnt)] for v in values]
+
+
+def split_shift(values, width, cnt):
+    return [[bits.get_bits(v, width, width * s) for s in range(cnt)] for v in values]
+
+
+def bench(word_width, mi_width=32, words=1024, repeat=5):
+    cnt = word_width // mi_width
+    values = [random.getrandbits(word_width) for _ in range(words)]
+
+    ref = split_str(values, mi_width, cnt)
+    assert split_shift(values, mi_width, cnt) == ref
+    assert bits.split_array(values, mi_width, cnt).tolist() == ref
+    assert bits.join_array(ref, mi_width) == values
+
+    res = {}
+    for name, f in (
+        ('string', lambda: split_str(values, mi_width, cnt)),
+        ('shift', lambda: split_shift(values, mi_width, cnt)),
+        ('split_array', lambda: bits.split_array(values, mi_width, cnt)),
+        ('join_array', lambda: bits.join_array(ref, mi_width)),
+    ):
+        res[name] = min(timeit.repeat(f, number=1, repeat=repeat)) / words
+    return res
+
+
+def parseParams():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of wide integer slicing",
+    )
+    parser.add_argument('-w', '--widths', type=int, nargs='+', default=[512, 1024], help="word widths")
+    parser.add_argument('-m', '--mi-width', type=int, default=32, help="MI data width")
+    parser.add_argument('-n', '--words', type=int, default=1024, help="number of words")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parseParams()
+
+    for w in args.widths:
+        res = bench(w, args.mi_width, args.words)
+        print(f"{w}-bit words ({w // args.mi_width} x {args.mi_width}-bit slices), time per word:")
+        for name, t in res.items():
+            print(f"    {name:<12}: {t * 1e6:8.3f} us  ({res['string'] / t:6.1f}x)")
@@ -6,10 +6,170 @@
 
 
 import nfb
+import os
 import math
 import sys
+import copy
 import json
+import hashlib
 import argparse
+import numpy as np
+
+from data_logger import bits
+from data_logger.wait import wait_bit
+
+
+class DataLoggerSnapshot:
+    """
+    All counters and values of a data_logger read in a single pass (see `DataLogger.snapshot()`)
+
+    Attributes
+    ----------
+        ctrl : dict
+            Main control register flags (`sw_rst`, `rst_done`)
+        cnters : np.ndarray
+            Values of all `CNTER_CNT` counters
+        values : List[dict]
+            Value interfaces in the same format as `DataLogger.load_value()`,
+            histograms are stored as np.ndarray
+        mi_reads : int
+            Number of MI read transactions used for the snapshot
+        mi_writes : int
+            Number of MI write transactions used for the snapshot
+    """
+
+    def __init__(self, ctrl, cnters, values, mi_reads, mi_writes):
+        self.ctrl = ctrl
+        self.cnters = cnters
+        self.values = values
+        self.mi_reads = mi_reads
+        self.mi_writes = mi_writes
+
+    @property
+    def mi_transactions(self):
+        return self.mi_reads + self.mi_writes
+
+    def cnter(self, index):
+        return self.cnters[index]
+
+    def value(self, index):
+        return self.values[index]
+
+    def to_dict(self, hist=False):
+        stats = dict(self.ctrl)
+        for i, c in enumerate(self.cnters):
+            stats['cnter_' + str(i)] = int(c)
+        for i, v in enumerate(self.values):
+            val = {k: x for k, x in v.items() if k != 'hist'}
+            if hist and 'hist' in v:
+                val['hist'] = [int(b) for b in v['hist']]
+            stats['value_' + str(i)] = val
+        return stats
+
+
+class ConfigCache:
+    """
+    Persistent cache of data_logger configurations shared between processes
+
+    Configuration of data_logger (widths, counts, histogram parameters) is fixed for given firmware,
+    so it is stored on the disk and reused when the same component is opened again.
+
+    - Entries are keyed by device path and DT node path
+    - Each entry is valid only for firmware with the same DTB hash
+    - File is replaced atomically, concurrent writers can only cause cache misses
+    - File is parsed once per process, lookups are served from memory
+      (updates re-read the file, so entries written by other processes are kept)
+
+    Default file is `$DATA_LOGGER_CACHE` or `$XDG_CACHE_HOME/data_logger/config.json`.
+    """
+
+    Version = 1
+
+    # Parsed entries of each cache file loaded by this process
+    _Entries = {}
+
+    def __init__(self, file : str = None):
+        """
+        Parameters
+        ----------
+            file : str
+                Cache file (default file is used when None)
+        """
+
+        self.file = file if file is not None else self.default_file()
+
+    @staticmethod
+    def default_file():
+        if 'DATA_LOGGER_CACHE' in os.environ:
+            return os.environ['DATA_LOGGER_CACHE']
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'data_logger', 'config.json')
+
+    def _load(self):
+        try:
+            with open(self.file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != self.Version:
+            return {}
+        return data.get('entries', {})
+
+    def _store(self, entries):
+        self._Entries[self.file] = entries
+        try:
+            os.makedirs(os.path.dirname(self.file) or '.', exist_ok=True)
+            tmp = f"{self.file}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({'version': self.Version, 'entries': entries}, f)
+            os.replace(tmp, self.file)
+        except OSError as e:
+            print(f"Warning: Could not write data_logger config cache {self.file}: {e}", file=sys.stderr)
+
+    def _entries(self):
+        # Entries parsed by this process (the file is read only on the first access)
+        entries = self._Entries.get(self.file)
+        if entries is None:
+            entries = self._load()
+            self._Entries[self.file] = entries
+        return entries
+
+    def get(self, key : str, fw_hash : str):
+        """
+        Get cached entry or None if it is missing or belongs to a different firmware
+        """
+
+        entry = self._entries().get(key)
+        if entry is None or entry.get('fw_hash') != fw_hash:
+            return None
+        return entry
+
+    def update(self, key : str, fw_hash : str, **items):
+        """
+        Update items of the entry (entry of a different firmware is replaced)
+        """
+
+        entries = self._load()
+        entry = entries.get(key)
+        if entry is None or entry.get('fw_hash') != fw_hash:
+            entry = {'fw_hash': fw_hash}
+        entry.update(items)
+        entries[key] = entry
+        self._store(entries)
+
+    def invalidate(self, key : str = None):
+        """
+        Remove entry (or all entries when key is None)
+        """
+
+        entries = self._load()
+        if key is None:
+            entries = {}
+        elif key in entries:
+            del entries[key]
+        else:
+            return
+        self._store(entries)
 
 
 class DataLogger(nfb.BaseComp):
@@ -54,25 +214,99 @@ class DataLogger(nfb.BaseComp):
     _BIT_SUM_EN         = 2
     _BIT_HIST_EN        = 3
 
-    def __init__(self, **kwargs):
+    def __init__(self, cache=True, **kwargs):
+        """
+        Parameters
+        ----------
+            cache : bool or ConfigCache
+                Persistent configuration cache (see `ConfigCache`).
+                When the firmware is unchanged, opening the component needs no MI reads for the configuration.
+            dev, index, node, ...
+                Arguments of `nfb.BaseComp`
+        """
+
         super().__init__(**kwargs)
 
+        if cache is True:
+            cache = ConfigCache()
+        self._cache = cache if cache else None
+        self._cache_key, self._fw_hash = self._cache_id(kwargs)
+
         self._rst_selection()
         self.load_config()
 
+    def _cache_id(self, kwargs):
+        # Cache key (device path + DT node path) and firmware hash
+        # Caching is disabled (None, None) if the firmware can not be identified
+        if self._cache is None:
+            return None, None
+
+        dev = getattr(self, '_dev', None)
+        try:
+            fw_hash = hashlib.sha256(bytes(dev.fdt.to_dtb())).hexdigest()
+        except Exception as e:
+            print(f"Warning: data_logger config cache is disabled, firmware can not be identified (no DTB): {e}", file=sys.stderr)
+            return None, None
+
+        dev_path = kwargs.get('dev')
+        if not isinstance(dev_path, str):
+            dev_path = getattr(dev, 'path', None) or nfb.libnfb.Nfb.default_dev_path
+
+        node = getattr(self, '_node', None)
+        if node is not None and getattr(node, 'name', None) is not None:
+            node_path = f"{getattr(node, 'path', '')}/{node.name}"
+        else:
+            node_path = f"{self.DT_COMPATIBLE}[{kwargs.get('index', 0)}]"
+
+        return f"{dev_path}:{node_path}", fw_hash
+
+    def _cache_get(self, item):
+        # Entries are shared by all components of the process, the caller gets its own copy
+        if self._cache_key is None:
+            return None
+        entry = self._cache.get(self._cache_key, self._fw_hash)
+        return None if entry is None else copy.deepcopy(entry.get(item))
+
+    def _cache_set(self, item, value):
+        if self._cache_key is not None:
+            self._cache.update(self._cache_key, self._fw_hash, **{item: copy.deepcopy(value)})
+
+    def invalidate(self):
+        """
+        Remove this component from the persistent configuration cache
+        """
+
+        if self._cache_key is not None:
+            self._cache.invalidate(self._cache_key)
+
+    def refresh(self):
+        """
+        Reload configuration from the hardware and update the persistent cache
+        """
+
+        self.invalidate()
+        self.load_config(refresh=True)
+
     def _select(self, stat=None, index=None, slice=None, hist_addr=None):
+        # Returns number of issued MI writes
+        writes = 0
         if stat is not None and self.last_stat != stat:
             self._comp.write32(self._REG_STATS, stat)
             self.last_stat = stat
+            writes += 1
         if index is not None and self.last_index != index:
             self._comp.write32(self._REG_INDEX, index)
             self.last_index = index
+            writes += 1
         if slice is not None and self.last_slice != slice:
             self._comp.write32(self._REG_SLICE, slice)
             self.last_slice = slice
+            writes += 1
         if hist_addr is not None and self.last_hist_addr != hist_addr:
             self._comp.write32(self._REG_HIST, hist_addr)
             self.last_hist_addr = hist_addr
+            writes += 1
+        return writes
 
     def _rst_selection(self):
         self.last_stat  = None
@@ -80,8 +314,6 @@ class DataLogger(nfb.BaseComp):
         self.last_slice = None
         self.last_hist_addr = None
 
-        self.load_config()
-
     def main_ctrl_read(self):
         return {
             "sw_rst":   (self._comp.get_bit(self._REG_CTRL, self._BIT_SW_RST)),
@@ -91,20 +323,131 @@ class DataLogger(nfb.BaseComp):
     def rst(self):
         self._comp.set_bit(self._REG_CTRL, self._BIT_SW_RST)
         self._comp.set_bit(self._REG_CTRL, self._BIT_SW_RST, False)
-        if not self._comp.wait_for_bit(self._REG_CTRL, self._BIT_RST_DONE, level=True):
+        if not wait_bit(self._comp, self._REG_CTRL, self._BIT_RST_DONE, level=True):
             print("Err: Could not reset data_logger!", file=sys.stderr)
 
         self._rst_selection()
 
     def _load_slices(self, width):
         slices = math.ceil(width / self.config["MI_DATA_WIDTH"])
-        value = 0
+        words = []
 
         for i in range(0, slices):
             self._select(slice=i)
-            value += self._comp.read32(self._REG_VALUE) << (i * self.config["MI_DATA_WIDTH"])
+            words.append(self._comp.read32(self._REG_VALUE))
+
+        return bits.join(words, self.config["MI_DATA_WIDTH"])
+
+    def _slice_order(self, slices):
+        # Continue from the currently selected slice to save one MI write per item
+        if slices > 1 and self.last_slice == slices - 1:
+            return range(slices - 1, -1, -1)
+        return range(0, slices)
+
+    def _read_plan(self, plan):
+        """
+        Read list of statistics with the minimal number of selection changes
+
+        Parameters
+        ----------
+            plan : List[(stat, index, hist_addr, width)]
+                Statistics to read (hist_addr is None for non-histogram statistics)
+
+        Returns
+        -------
+            (values, reads, writes)
+        """
+
+        mi_width = self.config["MI_DATA_WIDTH"]
+        res = []
+        reads = 0
+        writes = 0
+
+        for stat, index, hist_addr, width in plan:
+            writes += self._select(stat=stat, index=index, hist_addr=hist_addr)
+            value = 0
+            for i in self._slice_order(math.ceil(width / mi_width)):
+                writes += self._select(slice=i)
+                value |= self._comp.read32(self._REG_VALUE) << (i * mi_width)
+                reads += 1
+            res.append(value)
+
+        return res, reads, writes
+
+    def _value_plan(self, indexes):
+        # Group reads by statistic id, so that the STATS register changes only few times
+        plan = []
+        for en, stat in (("MIN", self._ID_VALUE_MIN), ("MAX", self._ID_VALUE_MAX), ("SUM", self._ID_VALUE_SUM)):
+            for i in indexes:
+                if not self.config["VALUE_EN"][i][en]:
+                    continue
+                width = self.config["VALUE_WIDTH"][i]
+                if stat == self._ID_VALUE_SUM:
+                    width += self.config["SUM_EXTRA_WIDTH"][i]
+                plan.append((stat, i, None, width))
+
+        for i in indexes:
+            if not self.config["VALUE_EN"][i]["HIST"]:
+                continue
+            width = self.config["HIST_BOX_WIDTH"][i]
+            plan += [(self._ID_VALUE_HIST, i, b, width) for b in range(0, self.config["HIST_BOX_CNT"][i])]
+
+        return plan
+
+    def _parse_values(self, indexes, cnts, plan, data):
+        values = {i: {"cnt": cnts[n]} for n, i in enumerate(indexes)}
+        hists = {}
+        for (stat, i, _, _), d in zip(plan, data):
+            if stat == self._ID_VALUE_MIN:
+                values[i]["min"] = d
+            elif stat == self._ID_VALUE_MAX:
+                values[i]["max"] = d
+            elif stat == self._ID_VALUE_SUM:
+                values[i]["sum"] = d
+                values[i]["avg"] = d / values[i]["cnt"] if values[i]["cnt"] != 0 else 0
+            else:
+                hists.setdefault(i, []).append(d)
+
+        for i, h in hists.items():
+            values[i]["hist"] = np.array(h, dtype=self._array_dtype(self.config["HIST_BOX_WIDTH"][i]))
+
+        return [values[i] for i in indexes]
+
+    @staticmethod
+    def _array_dtype(width):
+        return np.uint64 if width <= 64 else object
+
+    def snapshot(self):
+        """
+        Read all counters and values (including histograms) in one pass
+
+        The whole register access sequence is planned up front, so that
+        selection registers are written only when their value changes.
+
+        Returns
+        -------
+            DataLoggerSnapshot
+        """
+
+        ctrl_reg = self._comp.read32(self._REG_CTRL)
+        ctrl = {
+            "sw_rst":   bool((ctrl_reg >> self._BIT_SW_RST) & 1),
+            "rst_done": bool((ctrl_reg >> self._BIT_RST_DONE) & 1),
+        }
+
+        cnter_cnt = self.config["CNTER_CNT"]
+        value_cnt = self.config["VALUE_CNT"]
+        width = self.config["CNTER_WIDTH"]
 
-        return value
+        # Value counters are stored right after common counters
+        plan = [(self._ID_CNTER, i, None, width) for i in range(0, cnter_cnt + value_cnt)]
+        value_plan = self._value_plan(range(0, value_cnt))
+
+        data, reads, writes = self._read_plan(plan + value_plan)
+        cnters = np.array(data[:cnter_cnt], dtype=self._array_dtype(width))
+        values = self._parse_values(range(0, value_cnt), data[cnter_cnt:len(plan)], value_plan, data[len(plan):])
+
+        return DataLoggerSnapshot(ctrl, cnters, values, reads + 1, writes)
 
     def stat_read(self, stat, index=0, en_slices=True):
         self._select(stat=stat, index=index)
@@ -136,7 +479,25 @@ class DataLogger(nfb.BaseComp):
 
         return self._load_slices(width)
 
-    def load_config(self):
+    def load_config(self, refresh=False):
+        """
+        Load data_logger configuration (from the persistent cache if possible)
+
+        Parameters
+        ----------
+            refresh : bool
+                Always read configuration from the hardware
+        """
+
+        config = None if refresh else self._cache_get('config')
+        if config is None:
+            config = self._read_config()
+            self._cache_set('config', config)
+
+        self.mi_width = config["MI_DATA_WIDTH"]
+        self.config = config
+
+    def _read_config(self):
         config = {}
         config["CNTER_CNT"]         = self.stat_read(self._ID_CNTER_CNT,     en_slices=False)
         config["VALUE_CNT"]         = self.stat_read(self._ID_VALUE_CNT,     en_slices=False)
@@ -171,8 +532,7 @@ class DataLogger(nfb.BaseComp):
             hist_step = hist_max / hist_box_cnt if hist_box_cnt != 0 else 0
             config["HIST_STEP"].append(hist_step)
 
-        self.mi_width = config["MI_DATA_WIDTH"]
-        self.config = config
+        return config
 
     def load_ctrl(self, out):
         id    = self._ID_CTRLO if out else self._ID_CTRLI
@@ -184,14 +544,23 @@ class DataLogger(nfb.BaseComp):
     def load_ctrli(self):
         return self.stat_read(self._ID_CTRLI, 0)
 
+    def load_constants(self):
+        """
+        Load CTRLI port that is used for constants (the value is stored in the persistent cache)
+        """
+
+        ctrli = self._cache_get('constants')
+        if ctrli is None:
+            ctrli = self.load_ctrli()
+            self._cache_set('constants', ctrli)
+        return ctrli
+
     def set_ctrlo(self, val):
         self._select(stat=self._ID_CTRLO, index=0)
 
         slices = math.ceil(self.config["CTRLO_WIDTH"] / self.mi_width)
-        for i in range(0, slices):
+        for i, slice in enumerate(bits.split(val, self.mi_width, slices)):
             self._select(slice=i)
-
-            slice = self.get_bits(val, self.mi_width, i * self.mi_width)
             self._comp.write32(self._REG_VALUE, slice)
 
     def load_cnter(self, index):
@@ -209,47 +578,23 @@ class DataLogger(nfb.BaseComp):
                 'hist': [],
             }
 
-        val = {}
-        val["cnt"] = self.stat_read(self._ID_CNTER, index + self.config["CNTER_CNT"])
-        if self.config["VALUE_EN"][index]["MIN"]:
-            val["min"] = self.stat_read(self._ID_VALUE_MIN, index)
-        if self.config["VALUE_EN"][index]["MAX"]:
-            val["max"] = self.stat_read(self._ID_VALUE_MAX, index)
-        if self.config["VALUE_EN"][index]["SUM"]:
-            val["sum"] = self.stat_read(self._ID_VALUE_SUM, index)
-            val["avg"] = val["sum"] / val["cnt"] if val["cnt"] != 0 else 0
-        if self.config["VALUE_EN"][index]["HIST"]:
-            val["hist"] = []
-            for b in range(0, self.config["HIST_BOX_CNT"][index]):
-                val["hist"].append(self.hist_read(index, b))
+        cnt = self.stat_read(self._ID_CNTER, index + self.config["CNTER_CNT"])
+        plan = self._value_plan([index])
+        data, _, _ = self._read_plan(plan)
+        val = self._parse_values([index], [cnt], plan, data)[0]
+        if "hist" in val:
+            val["hist"] = val["hist"].tolist()
 
         return val
 
     def get_bits(self, val, width, pos):
-        binary = bin(val)[2:]
-        end   = - pos
-        start = end - width
-        if end == 0:
-            end = None
-        cut = binary[start:end]
-        if len(cut) == 0:
-            return 0
-        else:
-            return int(cut, 2)
+        return bits.get_bits(val, width, pos)
 
     def config_to_str(self):
         return json.dumps(self.config, indent=4)
 
     def stats_to_str(self, hist=False):
-        stats = self.main_ctrl_read()
-        for i in range(0, self.config['CNTER_CNT']):
-            stats['cnter_' + str(i)] = self.load_cnter(i)
-        for i in range(0, self.config['VALUE_CNT']):
-            val = self.load_value(i)
-            if not hist and 'hist' in val:
-                del val['hist']
-            stats['value_' + str(i)] = val
-        return json.dumps(stats, indent=4)
+        return json.dumps(self.snapshot().to_dict(hist=hist), indent=4)
 
 
 def parseParams():
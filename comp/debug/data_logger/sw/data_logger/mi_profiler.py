@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Opt-in profiling of MI register traffic of nfb.BaseComp based tools
+
+import os
+import sys
+import time
+import atexit
+import runpy
+import argparse
+
+import nfb
+
+
+class _Entry:
+    # Number of transactions, total time and log2 histogram of latencies [ns]
+    __slots__ = ('count', 'time', 'hist')
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0
+        self.hist = {}
+
+    def add(self, ns):
+        self.count += 1
+        self.time += ns
+        b = ns.bit_length()
+        self.hist[b] = self.hist.get(b, 0) + 1
+
+    def percentile(self, q):
+        # Upper bound of the histogram box where CDF reaches `q` [ns]
+        target = self.count * q / 100
+        cnt = 0
+        for b in sorted(self.hist):
+            cnt += self.hist[b]
+            if cnt >= target:
+                return 1 << b
+        return 0
+
+
+class ProfiledComp:
+    """
+    Component handle that forwards all calls to the original handle
+    and records MI transactions into `MIProfiler`
+    """
+
+    Ops = ('read32', 'write32', 'read64', 'write64', 'read', 'write', 'get_bit', 'set_bit', 'clr_bit', 'wait_for_bit')
+
+    def __init__(self, comp, profiler, name : str):
+        self._orig = comp
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(self._orig, attr)
+        if attr not in self.Ops or not callable(value):
+            return value
+
+        profiler = self._profiler
+        name = self._name
+
+        def call(addr, *args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return value(addr, *args, **kwargs)
+            finally:
+                profiler.record(name, attr, addr, time.perf_counter_ns() - start)
+        return call
+
+
+class MIProfiler:
+    """
+    Count MI transactions per operation, register and call site and histogram their latencies
+
+    - Instrumentation is opt-in: component handles are wrapped by `wrap`
+      or all `nfb.BaseComp` instances are wrapped after `install`
+      (or run any tool using `python3 -m data_logger.mi_profiler tool.py args`)
+    - Counts and times are exact, call sites are captured for every `sample`-th transaction
+      (capturing the call site is the most expensive part of the profiling)
+    - Bit operations (`get_bit`, `set_bit`, ...) are counted as single calls
+      (their read-modify-write is done by the nfb library)
+
+    Example:
+
+        ```
+        prof = MIProfiler()
+        logger = DataLogger(dev=dev, index=0)
+        prof.wrap(logger)
+
+        logger.stats_to_str()
+        print(prof.report())
+        ```
+    """
+
+    def __init__(self, sample : int = 1, top : int = 20):
+        """
+        Parameters
+        ----------
+            sample : int
+                Capture call site of every `sample`-th transaction
+            top : int
+                Number of reported registers and call sites
+        """
+
+        self.sample = max(1, sample)
+        self.top = top
+        self.clear()
+        self._installed = None
+
+    def clear(self):
+        self.ops = {}
+        self.regs = {}
+        self.sites = {}
+        self.total = _Entry()
+        self._cnt = 0
+
+    def wrap(self, obj, name : str = None):
+        """
+        Instrument component handle of `obj` (`_comp` of `nfb.BaseComp`, `comp` attribute or the handle itself)
+
+        Returns
+        -------
+            Instrumented object (the same object if attribute was replaced)
+        """
+
+        if name is None:
+            name = type(obj).__name__
+            node = getattr(obj, '_node', None)
+            if node is not None and hasattr(node, 'path'):
+                name += f"({node.path})"
+
+        for attr in ('_comp', 'comp'):
+            comp = getattr(obj, attr, None)
+            if comp is not None and any(hasattr(comp, op) for op in ProfiledComp.Ops):
+                if not isinstance(comp, ProfiledComp):
+                    setattr(obj, attr, ProfiledComp(comp, self, name))
+                return obj
+
+        if isinstance(obj, ProfiledComp):
+            return obj
+        return ProfiledComp(obj, self, name)
+
+    def record(self, name, op, addr, ns):
+        self.total.add(ns)
+
+        e = self.ops.get(op)
+        if e is None:
+            e = self.ops[op] = _Entry()
+        e.add(ns)
+
+        key = (name, addr, op)
+        e = self.regs.get(key)
+        if e is None:
+            e = self.regs[key] = _Entry()
+        e.add(ns)
+
+        self._cnt += 1
+        if self._cnt % self.sample == 0:
+            site = self._call_site()
+            e = self.sites.get(site)
+            if e is None:
+                e = self.sites[site] = _Entry()
+            e.add(ns)
+
+    @staticmethod
+    def _call_site():
+        # The first frame outside of this module
+        f = sys._getframe(2)
+        while f is not None and f.f_code.co_filename == __file__:
+            f = f.f_back
+        if f is None:
+            return '?'
+        return f"{os.path.basename(f.f_code.co_filename)}:{f.f_lineno} {f.f_code.co_name}"
+
+    def install(self):
+        """
+        Instrument all `nfb.BaseComp` instances created from now on
+        """
+
+        if self._installed is not None:
+            return
+
+        orig = nfb.BaseComp.__init__
+        profiler = self
+
+        def init(self, *args, **kwargs):
+            orig(self, *args, **kwargs)
+            profiler.wrap(self)
+
+        nfb.BaseComp.__init__ = init
+        self._installed = orig
+
+    def uninstall(self):
+        if self._installed is not None:
+            nfb.BaseComp.__init__ = self._installed
+            self._installed = None
+
+    def report(self) -> str:
+        """
+        Get report with transactions per operation, the most expensive registers and call sites
+        """
+
+        def us(ns):
+            return ns / 1000
+
+        def row(label, e, width):
+            return (
+                f"{label[:width]:<{width}} {e.count:>9} {us(e.time) / 1000:>10.3f} {us(e.time / e.count):>9.2f} "
+                f"{us(e.percentile(50)):>9.2f} {us(e.percentile(99)):>9.2f}\n"
+            )
+
+        def header(label, width):
+            return f"{label:<{width}} {'count':>9} {'time [ms]':>10} {'mean [us]':>9} {'p50 [us]':>9} {'p99 [us]':>9}\n"
+
+        res = f"MI profile: {self.total.count} transactions, {us(self.total.time) / 1000:.3f} ms"
+        res += f" (call sites sampled 1/{self.sample})\n" if self.sample > 1 else "\n"
+        if self.total.count == 0:
+            return res
+
+        res += "\n" + header('operation', 20)
+        for op, e in sorted(self.ops.items(), key=lambda i: -i[1].time):
+            res += row(op, e, 20)
+
+        res += f"\nTop {self.top} registers (by time):\n" + header('component / address / operation', 48)
+        for (name, addr, op), e in sorted(self.regs.items(), key=lambda i: -i[1].time)[:self.top]:
+            res += row(f"{name} 0x{addr:04x} {op}", e, 48)
+
+        if len(self.sites) > 0:
+            res += f"\nTop {self.top} call sites (by time):\n" + header('call site', 48)
+            for site, e in sorted(self.sites.items(), key=lambda i: -i[1].time)[:self.top]:
+                res += row(site, e, 48)
+
+        return res
+
+    def dump(self, file : str = None):
+        if file is None:
+            print(self.report(), file=sys.stderr)
+        else:
+            with open(file, 'w') as f:
+                f.write(self.report())
+
+
+def parseParams():
+    parser = argparse.ArgumentParser(
+        description="""Run python tool with profiling of MI transactions of all nfb.BaseComp components
+        (report is printed to stderr on exit)""",
+    )
+    parser.add_argument('-o', '--output', default=None, help="""report file (stderr by default)""")
+    parser.add_argument('-s', '--sample', type=int, default=1, help="""capture call site of every N-th transaction""")
+    parser.add_argument('-n', '--top', type=int, default=20, help="""number of reported registers and call sites""")
+    parser.add_argument('script', help="""profiled python script""")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="""arguments of the script""")
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == '__main__':
+    args = parseParams()
+
+    profiler = MIProfiler(sample=args.sample, top=args.top)
+    profiler.install()
+    atexit.register(profiler.dump, args.output)
+
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    runpy.run_path(args.script, run_name='__main__')
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Adaptive waiting for completion flags of FPGA components
+
+import time
+
+
+class WaitResult:
+    """
+    Result of waiting
+
+    Attributes
+    ----------
+        ok : bool
+            Condition was met before the deadline
+        elapsed : float
+            Time from the start of waiting to the first successful poll (or to the timeout) [s]
+        polls : int
+            Number of condition evaluations (MI reads)
+
+    Can be used directly as bool (`if not wait_bit(...): ...`).
+    """
+
+    def __init__(self, ok : bool, elapsed : float, polls : int):
+        self.ok = ok
+        self.elapsed = elapsed
+        self.polls = polls
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f"WaitResult(ok={self.ok}, elapsed={self.elapsed:.6f}, polls={self.polls})"
+
+
+def wait_until(
+        cond,
+        timeout : float = 5,
+        spin : float = 1e-3,
+        delay : float = 1e-4,
+        max_delay : float = 0.05,
+        backoff : float = 2.0
+) -> WaitResult:
+    """
+    Wait until condition is met
+
+    - The condition is polled without sleeping during the first `spin` seconds (short operations finish without any delay)
+    - Then the delay between polls grows exponentially from `delay` up to `max_delay`
+    - The condition is always evaluated once more after the deadline
+
+    Parameters
+    ----------
+        cond : Callable[[], bool]
+            Polled condition
+        timeout : float
+            Deadline [s]
+        spin : float
+            Busy-polling period [s]
+        delay : float
+            First delay after busy-polling [s]
+        max_delay : float
+            Maximal delay between polls [s]
+        backoff : float
+            Delay multiplier
+    """
+
+    start = time.monotonic()
+    polls = 0
+
+    while True:
+        polls += 1
+        if cond():
+            return WaitResult(True, time.monotonic() - start, polls)
+
+        elapsed = time.monotonic() - start
+        if elapsed >= timeout:
+            return WaitResult(False, elapsed, polls)
+        if elapsed < spin:
+            continue
+
+        time.sleep(min(delay, timeout - elapsed))
+        delay = min(delay * backoff, max_delay)
+
+
+def wait_bit(comp, addr : int, bit : int, level : bool = True, timeout : float = 5, **kwargs) -> WaitResult:
+    """
+    Wait until bit of MI register has given level (see `wait_until` for other arguments)
+
+    Parameters
+    ----------
+        comp : nfb component
+            Component with `read32` method
+        addr : int
+            Register address
+        bit : int
+            Bit index
+        level : bool
+            Expected level
+    """
+
+    return wait_until(lambda: bool((comp.read32(addr) >> bit) & 1) == level, timeout=timeout, **kwargs)
+
+
+def wait_value(comp, addr : int, value : int, mask : int = 0xFFFFFFFF, timeout : float = 5, **kwargs) -> WaitResult:
+    """
+    Wait until masked MI register has given value (see `wait_until` for other arguments)
+    """
+
+    return wait_until(lambda: (comp.read32(addr) & mask) == (value & mask), timeout=timeout, **kwargs)
+
+
+def test_deadline(cycles : float, freq : float, margin : float = 10, minimum : float = 1) -> float:
+    """
+    Deadline of hardware test with known length
+
+    Parameters
+    ----------
+        cycles : float
+            Expected number of clock cycles of the test
+        freq : float
+            Clock frequency [Hz]
+        margin : float
+            Multiple of the expected duration that is still considered as valid
+        minimum : float
+            Minimal deadline [s]
+    """
+
+    if freq <= 0:
+        return minimum
+    return max(minimum, margin * cycles / freq)
@@ -11,19 +11,40 @@ import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 import seaborn as sns
 
+from logger_stats.column_store import ColumnStore
+from logger_stats.lod import LODPyramid, reduce_axis
 
-def load_data(file_name : str):
+
+def load_data(file_name : str, columns=None):
     """
-    Load `*.npz` file created by logger_stats
+    Load `*.npz` file or `ColumnStore` directory created by logger_stats
 
     Parameters
     ----------
-       file_name (str): *.npz file with statistics
+       file_name (str): *.npz file or directory with statistics
+       columns (List[str]): load only selected statistics (names or name prefixes like `Values/latency`),
+           numeric columns are memory mapped (only for `ColumnStore`)
     """
 
+    if ColumnStore.is_store(file_name):
+        return ColumnStore(file_name).to_dict(columns)
+
     return np.load(file_name, allow_pickle=True)['arr_0'].item()
 
 
+def load_lod(file_name : str, column : str):
+    """
+    Load level-of-detail pyramid of histogram history from `ColumnStore` directory (pyramid is built if needed)
+
+    Parameters
+    ----------
+       file_name (str): directory with statistics
+       column (str): histogram column (for example `Values/latency/hist`)
+    """
+
+    return ColumnStore(file_name).lod(column)
+
+
 def plot_counter(data, x, y, title, log=False, diff=True):
     """
     Plot historical values of data_logger's counter
@@ -91,7 +112,11 @@ def plot_value(data, x : str, y : str, title : str, zoom : bool = True, log : bo
             Zoom only to non zero area of the histogram
     """
 
-    data = pd.DataFrame({'x': data['hist_x'], 'y': np.array(data['hist']).sum(axis=0)})
+    if isinstance(data['hist'], LODPyramid):
+        hist = data['hist'].query(width=1)[0][0]
+    else:
+        hist = np.array(data['hist']).sum(axis=0)
+    data = pd.DataFrame({'x': data['hist_x'], 'y': hist})
 
     plt.figure(figsize=(20, 6))
     sns.lineplot(data=data, x='x', y='y')
@@ -110,26 +135,25 @@ def plot_value(data, x : str, y : str, title : str, zoom : bool = True, log : bo
 
 
 def downsize(data, x, y, ticks):
-    orig_x, orig_y = data.shape
+    """
+    Reduce 2D histogram to `(x, y)` by summing tiles (shape does not have to be divisible)
 
-    if orig_x <= x or orig_y <= y:
-        return data, ticks
+    Ticks of the first axis are averaged over each tile.
+    """
 
-    tile_x = orig_x // x
-    tile_y = orig_y // y
+    orig_x, orig_y = data.shape
 
-    print(x, y, tile_x, tile_y)
+    if orig_x <= x and orig_y <= y:
+        return data, ticks
 
-    tiles = data.reshape(-1, tile_x, y, tile_y)
-    tiles = tiles.transpose(0, 2, 1, 3)
-    tiles = tiles.sum(axis=3).sum(axis=2)
+    data, groups = reduce_axis(data, x, axis=0)
+    data, _ = reduce_axis(data, y, axis=1)
 
-    #pad = tile_x - orig_x % x
-    #print(pad, tile_x, orig_x, x)
-    #ticks = np.pad(ticks, (0, pad), mode='constant', constant_values=0)
-    ticks = ticks.reshape(-1, y).mean(axis=1)
+    ticks = np.asarray(ticks, dtype=float)
+    counts = np.diff(np.append(groups, len(ticks)))
+    ticks = np.add.reduceat(ticks, groups) / counts
 
-    return (tiles, ticks)
+    return (data, ticks)
 
 
 def trim_zeros(data, ticks):
@@ -146,20 +170,7 @@ def trim_zeros(data, ticks):
 
 def downsize_ratio(data, max_x, max_y):
     x, y = data.shape
-
-    while x > max_x:
-        if x / 2 != x // 2:
-            break
-        else:
-            x //= 2
-
-    while y > max_y:
-        if y / 2 != y // 2:
-            break
-        else:
-            y //= 2
-
-    return (x, y)
+    return (min(x, max_x), min(y, max_y))
 
 
 def plot_value_2d(
@@ -170,7 +181,9 @@ def plot_value_2d(
         zoom : bool = True,
         log : bool = False,
         downsize_size=None,
-        ticks=None
+        ticks=None,
+        start : int = None,
+        stop : int = None
 ):
     """
     Plot 2D histogram of data_logger's value interface history
@@ -189,10 +202,24 @@ def plot_value_2d(
             Zoom only to non zero area of the histogram
         ticks : [float]
             Custom values for x axis
+        downsize_size : (int, int)
+            Maximal size of the plotted histogram (any size, does not have to divide data shape)
+        start, stop : int
+            Plot only selected range of samples (zoom)
+
+    `data['hist']` can be also `LODPyramid` (see `load_lod`), then only the tiles needed
+    for the selected range and resolution are read.
     """
 
     x_ticks = list(map(lambda x: round(x), data['hist_x']))
-    hist = np.array(data['hist']).transpose(1, 0)
+    if isinstance(data['hist'], LODPyramid):
+        width = downsize_size[1] if downsize_size is not None else 1024
+        hist, edges = data['hist'].query(start, stop, width=width)
+        hist = hist.transpose(1, 0)
+        if ticks is None:
+            ticks = [f'{i}' for i in edges[:-1]]
+    else:
+        hist = np.array(data['hist'][start:stop]).transpose(1, 0)
 
     if (hist == 0).all():
         print(f"Plot {title} contains all zeros")
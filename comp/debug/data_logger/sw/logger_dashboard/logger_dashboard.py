@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Live terminal view of any LoggerStats tree
+
+import sys
+import time
+import curses
+import argparse
+import threading
+import numpy as np
+
+import nfb
+import logger_stats.logger_stats as Stats
+from logger_stats.poller import LoggerPoller
+
+
+Spark = " ▁▂▃▄▅▆▇█"
+
+
+def sparkline(values, width : int) -> str:
+    """
+    Render the newest `width` values as a sparkline (scaled between their min and max)
+    """
+
+    values = [v for v in values[-width:] if v is not None and np.isfinite(v)]
+    if len(values) == 0:
+        return ''
+
+    lo, hi = min(values), max(values)
+    if hi == lo:
+        return Spark[1 if hi == 0 else 4] * len(values)
+    steps = len(Spark) - 1
+    return ''.join(Spark[1 + int((v - lo) / (hi - lo) * (steps - 1))] for v in values)
+
+
+class Row:
+    def __init__(self, indent : int, name : str, value : str = '', rate : str = '', spark=None, header : bool = False):
+        self.indent = indent
+        self.name = name
+        self.header = header
+        self.value = value
+        self.rate = rate
+        self.spark = spark if spark is not None else []
+
+
+class LoggerDashboard:
+    """
+    Live view of `LoggerStats` tree in terminal (curses)
+
+    - Statistics are loaded in a background thread (using `LoggerPoller`),
+      so the UI stays responsive even if some data_logger is slow to read
+    - Each statistic shows its latest value, rate per second (for incrementing counters)
+      and sparkline of its history (interval differences for counters, `avg` for values),
+      counter's wraparound is corrected based on data_logger's `CNTER_WIDTH`
+    - Derived statistics declared in the tree (for example `Ratio`) are shown as any other statistic
+    - Only cells whose content changed are redrawn
+
+    Keys: `q` quit, `p` pause sampling, arrows / PgUp / PgDn scroll
+
+    Example:
+
+        ```
+        stats = LoggerStats('Perf')
+        stats.add_stat(Counter(0, 'stall cnt', wrap=True))
+        stats.add_stat(Counter(5, 'beat cnt', wrap=True))
+        stats.add_stat(Ratio('stall cnt', 'beat cnt', 'stalls'))
+
+        LoggerDashboard(stats, interval=1.0).run()
+        ```
+    """
+
+    NameWidth = 40
+    ValueWidth = 36
+    RateWidth = 16
+    Refresh = 0.1
+
+    def __init__(self, stats : Stats.LoggerStats, interval : float = 1.0, history : int = 60, title : str = None):
+        """
+        Parameters
+        ----------
+            stats : LoggerStats
+                Displayed statistics tree
+            interval : float
+                Sampling interval [s]
+            history : int
+                Number of stored samples (width of sparklines)
+            title : str
+                Title of the view (root node name by default)
+        """
+
+        self.stats = stats
+        self.interval = interval
+        self.history = history
+        self.title = title if title is not None else stats.name
+
+        self.stats.set_streaming(history)
+        self.poller = LoggerPoller(stats)
+
+        self.rows = []
+        self.samples = 0
+        self.errors = 0
+        self.last_error = None
+        self.paused = False
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._cells = {}
+        self._layout = None
+        self._offset = 0
+
+    # Sampling #
+
+    def sample(self):
+        """
+        Load statistics and prepare rows for drawing
+        """
+
+        try:
+            self.poller.load(time=time.time())
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            return
+
+        rows = []
+        self._node_rows(rows, self.stats, 0, self._dt())
+        with self._lock:
+            self.rows = rows
+            self.samples += 1
+
+    def _dt(self):
+        t = self.stats.time.values()
+        if len(t) < 2:
+            return None
+        return t[-1] - t[-2]
+
+    def _node_rows(self, rows, node, indent, dt):
+        rows.append(Row(indent, node.name, header=True))
+        for s in node.stats:
+            if s is self.poller.sampling:
+                continue
+            if isinstance(s, Stats.LoggerStats):
+                self._node_rows(rows, s, indent + 2, dt)
+            else:
+                rows.append(self._stat_row(s, indent + 2, dt))
+
+    def _stat_row(self, s, indent, dt):
+        data = s.data()
+        try:
+            value = s.format(data).replace('\n', ' ')
+        except Exception:
+            value = '-'
+
+        rate = ''
+        spark = []
+        if isinstance(s, (Stats.ValueCMD, Stats.Constant, Stats.Custom)):
+            pass
+        elif isinstance(s, Stats.Value):
+            spark = _numeric(data.get('avg'))
+        elif isinstance(s, Stats.Counter):
+            spark = _counter_deltas(s, data)
+            if len(spark) > 0 and dt:
+                rate = f"{spark[-1] / dt:.1f} /s"
+        elif isinstance(s, Stats.CounterRate):
+            # Rate is already wrap corrected by the statistic
+            spark = _numeric(data)
+            if len(spark) > 0:
+                rate = f"{spark[-1]:.1f} /{s.units}"
+        else:
+            spark = _numeric(data)
+
+        return Row(indent, s.name, value, rate, spark)
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            if not self.paused:
+                self.sample()
+            self._stop.wait(max(0, self.interval - (time.monotonic() - start)))
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.poller.close()
+
+    # Drawing #
+
+    def _put(self, scr, y, x, text, width, attr=curses.A_NORMAL):
+        # Draw cell only if its content changed
+        text = text[:width].ljust(width)
+        if self._cells.get((y, x)) == (text, attr):
+            return
+        self._cells[(y, x)] = (text, attr)
+        try:
+            scr.addstr(y, x, text, attr)
+        except curses.error:
+            # Writing to the bottom right corner raises error
+            pass
+
+    def draw(self, scr):
+        h, w = scr.getmaxyx()
+        with self._lock:
+            rows = self.rows
+            samples = self.samples
+
+        status = f"{self.title} | samples: {samples} | interval: {self.interval} s"
+        duration = self.poller.sampling.stats[1].data()
+        if len(duration) > 0 and duration[-1] is not None:
+            status += f" | load: {duration[-1] * 1000:.1f} ms"
+        if self.errors > 0:
+            status += f" | errors: {self.errors} ({self.last_error})"
+        if self.paused:
+            status += " | PAUSED"
+        self._put(scr, 0, 0, status, w, curses.A_REVERSE)
+
+        name_w = min(self.NameWidth, max([r.indent + len(r.name) for r in rows] + [0]) + 1)
+        value_w = min(self.ValueWidth, max(0, w - name_w))
+        rate_w = min(self.RateWidth, max(0, w - name_w - value_w))
+        spark_w = max(0, w - name_w - value_w - rate_w - 1)
+        if self._layout != (h, w, name_w):
+            self._layout = (h, w, name_w)
+            self._cells = {}
+            scr.erase()
+
+        self._offset = max(0, min(self._offset, len(rows) - (h - 1)))
+        for y in range(1, h):
+            i = y - 1 + self._offset
+            if i >= len(rows):
+                # Cells of the row are overwritten by the empty line
+                for cell in [c for c in self._cells if c[0] == y and c[1] != 0]:
+                    del self._cells[cell]
+                self._put(scr, y, 0, '', w)
+                continue
+
+            r = rows[i]
+            self._put(scr, y, 0, ' ' * r.indent + r.name, name_w, curses.A_BOLD if r.header else curses.A_NORMAL)
+            self._put(scr, y, name_w, r.value, value_w)
+            self._put(scr, y, name_w + value_w, r.rate, rate_w)
+            if spark_w > 0:
+                self._put(scr, y, name_w + value_w + rate_w, sparkline(r.spark, spark_w), spark_w)
+
+        scr.refresh()
+
+    def _key(self, scr, key):
+        h, _ = scr.getmaxyx()
+        if key in (ord('q'), ord('Q')):
+            return False
+        elif key in (ord('p'), ord('P')):
+            self.paused = not self.paused
+        elif key == curses.KEY_UP:
+            self._offset -= 1
+        elif key == curses.KEY_DOWN:
+            self._offset += 1
+        elif key == curses.KEY_PPAGE:
+            self._offset -= h - 1
+        elif key == curses.KEY_NPAGE:
+            self._offset += h - 1
+        elif key == curses.KEY_RESIZE:
+            self._layout = None
+        self._offset = max(0, self._offset)
+        return True
+
+    def _main(self, scr):
+        curses.curs_set(0)
+        scr.timeout(int(self.Refresh * 1000))
+        scr.erase()
+
+        self.start()
+        try:
+            while True:
+                self.draw(scr)
+                key = scr.getch()
+                if key != -1 and not self._key(scr, key):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def run(self):
+        """
+        Show the dashboard (blocking until `q` is pressed)
+        """
+
+        curses.wrapper(self._main)
+
+
+def _numeric(data):
+    if data is None or np.isscalar(data):
+        return []
+    try:
+        return [float(v) for v in data]
+    except (TypeError, ValueError):
+        return []
+
+
+def _counter_deltas(s, data):
+    # Interval differences of counter, raw counter's wraparound is corrected based on data_logger's `CNTER_WIDTH`
+    if data is None or np.isscalar(data) or len(data) < 2:
+        return []
+    try:
+        deltas = [data[i] - data[i - 1] for i in range(1, len(data))]
+        if not s.wrap and s.logger is not None:
+            deltas = [d % (1 << s.logger.config['CNTER_WIDTH']) for d in deltas]
+        return [float(d) for d in deltas]
+    except (TypeError, ValueError):
+        return []
+
+
+def parseParams():
+    parser = argparse.ArgumentParser(
+        description="Live view of data_logger based components",
+    )
+
+    access = parser.add_argument_group('card access arguments')
+    access.add_argument(
+        '-d', '--device', default=nfb.libnfb.Nfb.default_dev_path,
+        metavar='device', help="""device with target FPGA card"""
+    )
+    access.add_argument(
+        '-c', '--compatible', action='append', default=[],
+        help="""show only components with given DT compatible (can be used multiple times, all supported components by default)"""
+    )
+
+    common = parser.add_argument_group('dashboard arguments')
+    common.add_argument(
+        '-t', '--interval', type=float, default=1.0,
+        help="""sampling interval [s]"""
+    )
+    common.add_argument(
+        '--history', type=int, default=60,
+        help="""number of stored samples (sparkline width)"""
+    )
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == '__main__':
+    from data_logger.data_logger import DataLogger
+    from logger_exporter.logger_exporter import Compatibles, default_stats
+
+    args = parseParams()
+
+    compatibles = dict(Compatibles)
+    if len(args.compatible) > 0:
+        compatibles = {c: compatibles.get(c, DataLogger) for c in args.compatible}
+
+    dev = nfb.open(args.device)
+    stats = Stats.LoggerStats(args.device)
+    for comp, cls in compatibles.items():
+        for i, node in enumerate(dev.fdt_get_compatible(comp)):
+            name = f"{comp}[{i}]"
+            try:
+                stats.add_stat(default_stats(cls(dev=args.device, node=node), name))
+            except Exception as e:
+                print(f"Warning: Could not open {name}: {e}", file=sys.stderr)
+
+    LoggerDashboard(stats, interval=args.interval, history=args.history).run()
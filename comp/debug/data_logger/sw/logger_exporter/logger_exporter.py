@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Long-running Prometheus exporter for data_logger based components
+
+import sys
+import math
+import time
+import argparse
+import threading
+import numpy as np
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import nfb
+from data_logger.data_logger import DataLogger
+from mem_logger.mem_logger import MemLogger
+import logger_stats.logger_stats as Stats
+from logger_stats.poller import LoggerPoller
+
+
+# Supported components (DT compatible -> class used for opening)
+Compatibles = {
+    "netcope,data_logger":                  DataLogger,
+    "netcope,mem_logger":                   MemLogger,
+    "cesnet,dma_calypte_rx_perf_cntrs":     DataLogger,
+}
+
+
+def default_stats(logger, name : str):
+    """
+    Create statistics of the component
+
+    - Components with own statistics (`logger.stats`, for example MemLogger) use them
+    - Generic data_loggers export all counters (with wraparound correction) and value interfaces
+    - Rates of all counters are added in both cases
+    """
+
+    stats = Stats.LoggerStats(name, logger=logger)
+
+    cnter_cnt = logger.config['CNTER_CNT']
+    if hasattr(logger, 'stats'):
+        stats.add_stat(logger.stats)
+    else:
+        stats.add_stats(
+            name='Counters',
+            names=[f"cnter_{i}" for i in range(cnter_cnt)],
+            indexes=list(range(cnter_cnt)),
+            constructor=lambda i, n: Stats.Counter(i, n, wrap=True)
+        )
+        value_cnt = logger.config['VALUE_CNT']
+        stats.add_stats(
+            name='Values',
+            names=[f"value_{i}" for i in range(value_cnt)],
+            indexes=list(range(value_cnt)),
+            constructor=lambda i, n: Stats.Value(i, n)
+        )
+
+    stats.add_stats(
+        name='Rates',
+        names=[f"cnter_{i}" for i in range(cnter_cnt)],
+        indexes=list(range(cnter_cnt)),
+        constructor=lambda i, n: Stats.CounterRate(i, n)
+    )
+
+    return stats
+
+
+class MetricsWriter:
+    """
+    Prometheus text exposition format (version 0.0.4) builder
+    """
+
+    def __init__(self, prefix : str = 'data_logger'):
+        self.prefix = prefix
+        self.families = {}
+
+    def add(self, name : str, labels : dict, value, type : str = 'gauge', help : str = ''):
+        if value is None:
+            return
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+
+        family = self.families.setdefault(f"{self.prefix}_{name}", {'type': type, 'help': help, 'samples': []})
+        family['samples'].append((f"{self.prefix}_{name}", labels, value))
+
+    def add_hist(self, name : str, labels : dict, edges, hist, sum=None, help : str = ''):
+        """
+        Add histogram (`edges` are upper bounds of histogram boxes, `sum` is the sum of all observed values)
+        """
+
+        name = f"{self.prefix}_{name}"
+        family = self.families.setdefault(name, {'type': 'histogram', 'help': help, 'samples': []})
+        cum = np.cumsum(hist)
+        for le, c in zip(edges, cum):
+            family['samples'].append((f"{name}_bucket", {**labels, 'le': _fmt(le)}, c))
+        family['samples'].append((f"{name}_bucket", {**labels, 'le': '+Inf'}, cum[-1] if len(cum) > 0 else 0))
+        if sum is not None:
+            family['samples'].append((f"{name}_sum", labels, sum))
+        family['samples'].append((f"{name}_count", labels, cum[-1] if len(cum) > 0 else 0))
+
+    def to_str(self):
+        res = []
+        for name, family in self.families.items():
+            if family['help']:
+                res.append(f"# HELP {name} {family['help']}")
+            res.append(f"# TYPE {name} {family['type']}")
+            for sample, labels, value in family['samples']:
+                labels = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                res.append(f"{sample}{{{labels}}} {_fmt(value)}")
+        return '\n'.join(res) + '\n'
+
+
+def _escape(v):
+    return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _fmt(v):
+    v = float(v)
+    if math.isnan(v):
+        return 'NaN'
+    if math.isinf(v):
+        return '+Inf' if v > 0 else '-Inf'
+    return repr(int(v)) if v.is_integer() and abs(v) < 2 ** 53 else repr(v)
+
+
+def _last(data):
+    if data is None:
+        return None
+    if np.isscalar(data):
+        return data
+    return data[-1] if len(data) > 0 else None
+
+
+def _hist_edges(hist_x):
+    # Upper bounds of histogram boxes (hist_x are middles of boxes)
+    hist_x = np.asarray(hist_x, dtype=float)
+    if len(hist_x) < 2:
+        return hist_x
+    return hist_x + np.diff(hist_x, append=2 * hist_x[-1] - hist_x[-2]) / 2
+
+
+class LoggerExporter:
+    """
+    Keep all data_logger based components of a card open and export their statistics
+
+    - Components are discovered from the device tree (see `Compatibles`)
+    - Statistics are polled periodically in the background thread (concurrently using `LoggerPoller`)
+    - Latest values are served in the Prometheus text format
+
+    Exported metrics (labels: `device`, `component`, `stat`):
+
+    - `data_logger_counter_total` - wrap-corrected counters (`Counter` with `wrap=True`, type counter)
+    - `data_logger_counter`     - other counters (`Counter`, `TimeCounter`)
+    - `data_logger_rate`        - rates and data flows (`CounterRate`, `FlowCounter`, `FlowRate`)
+    - `data_logger_constant`    - constants
+    - `data_logger_value`       - min / avg / max / percentiles of value interfaces (label `metric`)
+    - `data_logger_value_hist`  - histogram buckets of value interfaces
+      (`_sum` is estimated from the middle values of histogram boxes)
+    - `data_logger_custom`      - numeric custom statistics
+    - `data_logger_poll_*`      - polling duration and timestamp
+
+    Example:
+
+        ```
+        exporter = LoggerExporter('/dev/nfb0', interval=1.0)
+        exporter.start()
+        exporter.serve(port=9464)
+        ```
+    """
+
+    def __init__(self, dev : str = nfb.libnfb.Nfb.default_dev_path, interval : float = 1.0, compatibles=None):
+        """
+        Parameters
+        ----------
+            dev : str
+                Device path
+            interval : float
+                Polling interval [s]
+            compatibles : dict
+                DT compatible -> component class (default `Compatibles`)
+        """
+
+        self.dev = dev
+        self.interval = interval
+        self.compatibles = compatibles if compatibles is not None else Compatibles
+
+        self.loggers = self.discover()
+        self.stats = Stats.LoggerStats('Exporter')
+        for name, logger in self.loggers.items():
+            self.stats.add_stat(default_stats(logger, name))
+
+        # Only the newest sample is needed
+        self.stats.set_streaming(2)
+        self.poller = LoggerPoller(self.stats)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._metrics = ''
+        self._last_poll = None
+        self._poll_duration = None
+        self._poll_errors = 0
+
+    def discover(self):
+        """
+        Open all supported components found in the device tree
+        """
+
+        loggers = {}
+        dev = nfb.open(self.dev)
+        for comp, cls in self.compatibles.items():
+            for i, node in enumerate(dev.fdt_get_compatible(comp)):
+                name = f"{comp}[{i}]"
+                try:
+                    loggers[name] = cls(dev=self.dev, node=node)
+                except Exception as e:
+                    print(f"Warning: Could not open {name}: {e}", file=sys.stderr)
+        return loggers
+
+    def poll(self):
+        """
+        Load all statistics and render metrics
+        """
+
+        start = time.monotonic()
+        try:
+            self.poller.load()
+        except Exception as e:
+            self._poll_errors += 1
+            print(f"Error while polling statistics: {e}", file=sys.stderr)
+            return
+
+        self._poll_duration = time.monotonic() - start
+        self._last_poll = time.time()
+        metrics = self.render()
+        with self._lock:
+            self._metrics = metrics
+
+    def render(self) -> str:
+        w = MetricsWriter()
+        for node in self.stats.stats:
+            if isinstance(node, Stats.LoggerStats) and node is not self.poller.sampling:
+                self._render_node(w, node, {'device': self.dev, 'component': node.name}, ())
+
+        w.add('poll_duration_seconds', {'device': self.dev}, self._poll_duration, help='Duration of the last poll')
+        w.add('poll_timestamp_seconds', {'device': self.dev}, self._last_poll, help='Time of the last poll')
+        w.add('poll_errors_total', {'device': self.dev}, self._poll_errors, type='counter', help='Number of failed polls')
+        return w.to_str()
+
+    def _render_node(self, w, node, labels, path):
+        for s in node.stats:
+            p = (*path, s.name)
+            if isinstance(s, Stats.LoggerStats):
+                self._render_node(w, s, labels, p)
+            else:
+                self._render_stat(w, s, {**labels, 'stat': '/'.join(p)})
+
+    def _render_stat(self, w, s, labels):
+        data = s.data()
+        if isinstance(s, Stats.ValueCMD):
+            for cmd in s.cmds:
+                self._render_value(w, data[cmd], {**labels, 'cmd': cmd})
+        elif isinstance(s, Stats.Value):
+            self._render_value(w, data, labels)
+        elif isinstance(s, Stats.Constant):
+            w.add('constant', labels, data)
+        elif isinstance(s, Stats.Derived):
+            w.add('derived', {**labels, 'expr': s.expr}, _last(data), help='Statistics computed by LoggerStats.derived expressions')
+        elif isinstance(s, (Stats.CounterRate, Stats.FlowCounter)):
+            w.add('rate', labels, _last(data))
+        elif isinstance(s, Stats.Counter) and s.wrap:
+            w.add('counter_total', labels, _last(data), type='counter', help='Wrap-corrected data_logger counters')
+        elif isinstance(s, (Stats.Counter, Stats.TimeCounter)):
+            w.add('counter', labels, _last(data))
+        elif isinstance(s, Stats.Custom):
+            w.add('custom', labels, _last(data))
+
+    def _render_value(self, w, data, labels):
+        for k, v in data.items():
+            if k not in ('hist', 'hist_x'):
+                w.add('value', {**labels, 'metric': k}, _last(v))
+
+        hist = _last(data['hist'])
+        if hist is not None and data['hist_x'] is not None:
+            hist_sum = float(np.dot(hist, np.asarray(data['hist_x'], dtype=float)))
+            w.add_hist('value_hist', labels, _hist_edges(data['hist_x']), hist, sum=hist_sum)
+
+    def metrics(self) -> str:
+        with self._lock:
+            return self._metrics
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            self.poll()
+            self._stop.wait(max(0, self.interval - (time.monotonic() - start)))
+
+    def start(self):
+        """
+        Start polling in the background thread
+        """
+
+        self.poll()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.poller.close()
+
+    def serve(self, addr : str = '127.0.0.1', port : int = 9464):
+        """
+        Serve metrics over HTTP (blocking), metrics are available at `/metrics`
+        """
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = exporter.metrics().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, port), Handler)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+def parseParams():
+    parser = argparse.ArgumentParser(
+        description="Prometheus exporter for data_logger based components",
+    )
+
+    access = parser.add_argument_group('card access arguments')
+    access.add_argument(
+        '-d', '--device', default=nfb.libnfb.Nfb.default_dev_path,
+        metavar='device', help="""device with target FPGA card"""
+    )
+
+    common = parser.add_argument_group('exporter arguments')
+    common.add_argument(
+        '-a', '--addr', default='127.0.0.1',
+        help="""address of the HTTP endpoint"""
+    )
+    common.add_argument(
+        '-p', '--port', type=int, default=9464,
+        help="""port of the HTTP endpoint"""
+    )
+    common.add_argument(
+        '-t', '--interval', type=float, default=1.0,
+        help="""polling interval [s]"""
+    )
+    common.add_argument(
+        '-c', '--compatible', action='append', default=[],
+        help="""additional DT compatible of data_logger based component (can be used multiple times)"""
+    )
+    common.add_argument(
+        '--print', action='store_true',
+        help="""print metrics once and exit"""
+    )
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == '__main__':
+    args = parseParams()
+
+    compatibles = dict(Compatibles)
+    for c in args.compatible:
+        compatibles[c] = DataLogger
+
+    exporter = LoggerExporter(args.device, interval=args.interval, compatibles=compatibles)
+    if args.print:
+        exporter.poll()
+        print(exporter.metrics(), end='')
+    else:
+        exporter.start()
+        exporter.serve(args.addr, args.port)
+        exporter.stop()
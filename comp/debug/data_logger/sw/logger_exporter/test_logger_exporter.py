@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# Tests of the Prometheus exposition text of logger_exporter
+
+# python3 -m pytest -xs logger_exporter/test_logger_exporter.py (from the sw/ directory of data_logger)
+
+import pytest
+
+# Exporter needs nfb (python bindings of libnfb)
+LoggerExporter = pytest.importorskip("logger_exporter.logger_exporter").LoggerExporter
+MetricsWriter = pytest.importorskip("logger_exporter.logger_exporter").MetricsWriter
+
+
+class FakeLogger:
+    """
+    Data logger with 2 counters (8 bits wide) and 1 value interface (4 histogram boxes of width 4)
+    """
+
+    def __init__(self):
+        self.config = {
+            'CNTER_CNT': 2,
+            'VALUE_CNT': 1,
+            'CNTER_WIDTH': 8,
+            'VALUE_WIDTH': [4],
+            'VALUE_EN': [{'MIN': True, 'MAX': True, 'SUM': True, 'HIST': True}],
+            'SUM_EXTRA_WIDTH': [8],
+            'HIST_BOX_CNT': [4],
+            'HIST_BOX_WIDTH': [8],
+            'HIST_STEP': [4.0],
+        }
+        self.cnters = [[250, 4], [1, 2]]
+        self.load = 0
+
+    def load_cnter(self, index):
+        return self.cnters[index][self.load]
+
+    def load_value(self, index):
+        return {'cnt': 4, 'min': 2, 'max': 10, 'sum': 24, 'avg': 6, 'hist': [1, 2, 1, 0]}
+
+
+class FakeExporter(LoggerExporter):
+    def __init__(self, logger):
+        self.logger = logger
+        super().__init__('/dev/fake')
+
+    def discover(self):
+        return {'comp[0]': self.logger}
+
+
+def parse(text):
+    """
+    Exposition text -> (types of families, {(sample name, sorted labels): value})
+    """
+
+    types = {}
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, type = line.split(' ')
+            types[name] = type
+        elif not line.startswith('#'):
+            sample, value = line.rsplit(' ', 1)
+            name, labels = sample.split('{', 1)
+            labels = tuple(sorted(tuple(kv.split('=', 1)) for kv in labels.rstrip('}').split(',')))
+            samples[(name, labels)] = float(value)
+    return types, samples
+
+
+def labels(**kwargs):
+    return tuple(sorted((k, f'"{v}"') for k, v in {'device': '/dev/fake', 'component': 'comp[0]', **kwargs}.items()))
+
+
+def test_exposition():
+    logger = FakeLogger()
+    exporter = FakeExporter(logger)
+    for i in range(2):
+        logger.load = i
+        exporter.poll()
+    exporter.poller.close()
+
+    types, samples = parse(exporter.metrics())
+
+    assert types['data_logger_counter_total'] == 'counter'
+    assert types['data_logger_rate'] == 'gauge'
+    assert types['data_logger_value'] == 'gauge'
+    assert types['data_logger_value_hist'] == 'histogram'
+    assert types['data_logger_poll_errors_total'] == 'counter'
+
+    # Counter 0 wraps from 250 to 4
+    assert samples[('data_logger_counter_total', labels(stat='Counters/cnter_0'))] == 260
+    assert samples[('data_logger_counter_total', labels(stat='Counters/cnter_1'))] == 2
+    assert samples[('data_logger_value', labels(stat='Values/value_0', metric='max'))] == 10
+
+    hist = labels(stat='Values/value_0')
+    buckets = [samples[('data_logger_value_hist_bucket', labels(stat='Values/value_0', le=le))] for le in (4, 8, 12, 16, '+Inf')]
+    assert buckets == [1, 3, 4, 4, 4]
+    assert samples[('data_logger_value_hist_count', hist)] == 4
+    assert samples[('data_logger_value_hist_sum', hist)] == 2 + 2 * 6 + 10
+
+
+def test_writer_escaping():
+    w = MetricsWriter()
+    w.add('custom', {'stat': 'a "b"\\c\nd'}, 1.5)
+    w.add('custom', {'stat': 'none'}, None)
+    w.add('custom', {'stat': 'text'}, 'abc')
+
+    assert w.to_str() == '# TYPE data_logger_custom gauge\ndata_logger_custom{stat="a \\"b\\"\\\\c\\nd"} 1.5\n'
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Columnar on-disk storage for logger_stats data
+
+import os
+import re
+import json
+import shutil
+import numpy as np
+
+from logger_stats.lod import LODPyramid
+
+
+class ColumnStore:
+    """
+    Directory based columnar storage of `LoggerStats.data()`
+
+    Each leaf statistic is stored as a separate column, so it can be read selectively
+    and memory mapped without loading the whole capture.
+
+    Layout:
+
+        ```
+        <path>/schema.json      - description of all columns
+        <path>/c<i>.bin         - raw little-endian data of numeric column (memory mappable)
+        <path>/c<i>.jsonl       - one JSON item per line for non-numeric columns
+        <path>/lod/c<i>/        - optional level-of-detail pyramid of numeric column (see `LODPyramid`)
+        ```
+
+    Column kinds:
+
+    - `series` - numeric history, first axis is sample index (histograms have shape `(samples, boxes)`)
+    - `json`   - history of non-numeric values (for example `CustomJSON` statistics)
+    - `static` - single value stored directly inside schema (constants, `hist_x`)
+
+    Column names are statistics paths joined by `/` (for example `Values/latency/hist`).
+
+    Example:
+
+        ```
+        store = ColumnStore('capture', mode='w')
+        while True:
+            stats.load(time=time.time())
+            store.append(stats.data())
+
+        hist = ColumnStore('capture').read('Values/latency/hist')
+        ```
+    """
+
+    Schema = 'schema.json'
+    Lod = 'lod'
+    Version = 1
+    Sep = '/'
+
+    def __init__(self, path : str, mode : str = 'r'):
+        """
+        Parameters
+        ----------
+            path : str
+                Store directory
+            mode : str
+                'r' - read, 'w' - create new (existing store is replaced), 'a' - append to existing store
+        """
+
+        if mode not in ('r', 'w', 'a'):
+            raise Exception(f"Mode {mode} is not recognized")
+
+        self.path = path
+        self.mode = mode
+
+        if mode == 'w' or (mode == 'a' and not os.path.exists(self._schema_file())):
+            os.makedirs(path, exist_ok=True)
+            for f in os.listdir(path):
+                if f == self.Schema or re.fullmatch(r'c[0-9]+\.(bin|jsonl)', f):
+                    os.remove(os.path.join(path, f))
+            shutil.rmtree(os.path.join(path, self.Lod), ignore_errors=True)
+            self.columns = {}
+            self._flush_schema()
+        else:
+            with open(self._schema_file()) as f:
+                schema = json.load(f)
+            if schema.get('version') != self.Version:
+                raise Exception(f"Unsupported column store version {schema.get('version')}")
+            self.columns = {c['name']: c for c in schema['columns']}
+
+    @staticmethod
+    def is_store(path : str) -> bool:
+        return os.path.isdir(path) and os.path.exists(os.path.join(path, ColumnStore.Schema))
+
+    def _schema_file(self):
+        return os.path.join(self.path, self.Schema)
+
+    def _flush_schema(self):
+        # Replace schema atomically, so readers never see partially written file
+        tmp = self._schema_file() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': self.Version, 'columns': list(self.columns.values())}, f, indent=1)
+        os.replace(tmp, self._schema_file())
+
+    def _file(self, col):
+        return os.path.join(self.path, col['file'])
+
+    # Writing #
+
+    def write(self, data : dict):
+        """
+        Store the complete history of all statistics (for example `LoggerStats.data()`)
+        """
+
+        self._check_writable()
+        for name, v in self._leaves(data):
+            self._write_column(name, v, full=True)
+        self._flush_schema()
+
+    def append(self, data : dict, new : int = None):
+        """
+        Append items of each history that were not stored yet
+
+        Call after one or more `LoggerStats.load()` calls to store a running capture.
+
+        Parameters
+        ----------
+            data : dict
+                Statistics data (for example `LoggerStats.data()`)
+            new : int
+                Number of the newest items of each history to append.
+                By default histories are expected to grow (no streaming) and the items added
+                since the previous append are stored (the whole history if it got shorter).
+                Streaming histories have limited length, so their number of new items has to be given
+                (see `LoggerStats.save_columns`).
+        """
+
+        self._check_writable()
+        for name, v in self._leaves(data):
+            self._write_column(name, v, full=False, new=new)
+        self._flush_schema()
+
+    def _check_writable(self):
+        if self.mode == 'r':
+            raise Exception("Column store is opened for reading")
+
+    def _leaves(self, data, prefix=()):
+        for k, v in data.items():
+            path = (*prefix, str(k))
+            if isinstance(v, dict):
+                yield from self._leaves(v, path)
+            elif v is not None:
+                yield self.Sep.join(path), v
+
+    def _classify(self, name, v):
+        if name.split(self.Sep)[-1] == 'hist_x' or np.isscalar(v):
+            return 'static', None
+
+        try:
+            arr = np.asarray(v)
+        except ValueError:
+            return 'json', None
+
+        if arr.ndim >= 1 and arr.dtype.kind in 'biuf':
+            return 'series', arr
+        return 'json', None
+
+    def _new_column(self, name, kind, arr):
+        # `seen` is the history length at the previous write (see `append`)
+        col = {'name': name, 'kind': kind, 'rows': 0, 'seen': 0}
+        i = len(self.columns)
+        if kind == 'series':
+            col['dtype'] = _column_dtype(arr).str
+            col['shape'] = list(arr.shape[1:])
+            col['file'] = f"c{i}.bin"
+        elif kind == 'json':
+            col['file'] = f"c{i}.jsonl"
+        self.columns[name] = col
+        return col
+
+    def _new_rows(self, col, items, full, new):
+        # Slice of the history which is not stored yet
+        n = len(items)
+        seen = col.get('seen', 0)
+        col['seen'] = n
+        if full:
+            return items
+        if new is None:
+            new = n - seen if n >= seen else n
+        return items[n - min(max(new, 0), n):]
+
+    def _write_column(self, name, v, full, new=None):
+        kind, arr = self._classify(name, v)
+        col = self.columns.get(name)
+
+        if kind == 'static':
+            if col is None:
+                col = self._new_column(name, kind, None)
+            col['value'] = _to_json(v)
+            return
+
+        if col is None:
+            col = self._new_column(name, kind, arr)
+        elif full:
+            col['rows'] = 0
+            open(self._file(col), 'w').close()
+            if kind == 'series':
+                col['dtype'] = _column_dtype(arr).str
+
+        if col['kind'] == 'series' and kind == 'series':
+            rows = self._new_rows(col, arr, full, new)
+            if len(rows) > 0 and not np.can_cast(rows.dtype, np.dtype(col['dtype'])):
+                self._widen_column(col)
+            rows = np.ascontiguousarray(rows, dtype=np.dtype(col['dtype']))
+            if list(rows.shape[1:]) != col['shape']:
+                raise Exception(f"Column {name} changed item shape from {col['shape']} to {list(rows.shape[1:])}")
+            with open(self._file(col), 'ab') as f:
+                f.write(rows.tobytes())
+            col['rows'] += len(rows)
+        else:
+            if col['kind'] != 'json':
+                raise Exception(f"Column {name} is numeric, but non-numeric data were provided")
+            rows = self._new_rows(col, list(v), full, new)
+            with open(self._file(col), 'a') as f:
+                for r in rows:
+                    f.write(json.dumps(_to_json(r)) + '\n')
+            col['rows'] += len(rows)
+
+    def _widen_column(self, col):
+        # Integer column received non-integer data (for example int 0 followed by floats), store it as float
+        data = np.array(self.read(col['name']), dtype=np.dtype('<f8'))
+        col['dtype'] = np.dtype('<f8').str
+        with open(self._file(col), 'wb') as f:
+            f.write(data.tobytes())
+
+    # Reading #
+
+    def names(self):
+        """
+        Get names of all columns
+        """
+
+        return list(self.columns.keys())
+
+    def select(self, columns=None):
+        """
+        Get names of columns matching given names or name prefixes (whole subtrees)
+        """
+
+        if columns is None:
+            return self.names()
+        if isinstance(columns, str):
+            columns = [columns]
+
+        res = []
+        for name in self.columns:
+            for c in columns:
+                c = c.strip(self.Sep)
+                if name == c or name.startswith(c + self.Sep):
+                    res.append(name)
+                    break
+        return res
+
+    def rows(self, name : str) -> int:
+        return self.columns[name]['rows']
+
+    def read(self, name : str, start : int = None, stop : int = None):
+        """
+        Read single column
+
+        Numeric columns are returned as read-only memory mapped array,
+        so only the accessed part is loaded from the disk.
+
+        Parameters
+        ----------
+            name : str
+                Column name
+            start, stop : int
+                Optional range of samples
+        """
+
+        col = self.columns[name]
+        if col['kind'] == 'static':
+            return col['value']
+
+        if col['kind'] == 'json':
+            with open(self._file(col)) as f:
+                items = [json.loads(line) for line in f]
+            return items[:col['rows']][start:stop]
+
+        if col['rows'] == 0:
+            return np.zeros((0, *col['shape']), dtype=np.dtype(col['dtype']))
+
+        data = np.memmap(
+            self._file(col), mode='r', dtype=np.dtype(col['dtype']),
+            shape=(col['rows'], *col['shape'])
+        )
+        return data[start:stop]
+
+    def to_dict(self, columns=None, start : int = None, stop : int = None):
+        """
+        Read selected columns into nested dictionary in the `LoggerStats.data()` format
+
+        Parameters
+        ----------
+            columns : List[str]
+                Column names or name prefixes (by default all columns are read)
+            start, stop : int
+                Optional range of samples
+        """
+
+        res = {}
+        for name in self.select(columns):
+            path = name.split(self.Sep)
+            handle = res
+            for k in path[:-1]:
+                handle = handle.setdefault(k, {})
+            handle[path[-1]] = self.read(name, start, stop)
+        return res
+
+    # Level of detail #
+
+    def _lod_path(self, col):
+        return os.path.join(self.path, self.Lod, os.path.splitext(col['file'])[0])
+
+    def lod(self, name : str, build : bool = True):
+        """
+        Get level-of-detail pyramid of numeric column
+
+        Parameters
+        ----------
+            name : str
+                Column name
+            build : bool
+                Build the pyramid if it does not exist or it is outdated (column was appended)
+        """
+
+        col = self.columns[name]
+        if col['kind'] != 'series':
+            raise Exception(f"Column {name} is not numeric")
+
+        path = self._lod_path(col)
+        source = self.read(name)
+        if LODPyramid.is_valid(path, col['rows']):
+            return LODPyramid(path, source=source)
+        if not build:
+            return None
+        return LODPyramid.build(source, path)
+
+    def build_lod(self, columns=None):
+        """
+        Precompute level-of-detail pyramids of all 2D numeric columns (histogram histories)
+
+        Parameters
+        ----------
+            columns : List[str]
+                Column names or name prefixes (by default all columns)
+        """
+
+        for name in self.select(columns):
+            col = self.columns[name]
+            if col['kind'] == 'series' and len(col['shape']) > 0:
+                self.lod(name)
+
+
+def _column_dtype(arr):
+    # Little-endian dtype of numeric column (integers keep their type, everything else is float)
+    dtype = arr.dtype if arr.dtype.kind in 'iu' else np.dtype(float)
+    return dtype.newbyteorder('<')
+
+
+def _to_json(v):
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    if isinstance(v, np.generic):
+        return v.item()
+    if isinstance(v, (list, tuple)):
+        return [_to_json(i) for i in v]
+    if isinstance(v, dict):
+        return {str(k): _to_json(i) for k, i in v.items()}
+    return v
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Level-of-detail pyramid for long statistics histories
+
+import os
+import json
+import numpy as np
+
+
+class LODPyramid:
+    """
+    Level-of-detail pyramid of a numeric history (for example histogram history with shape `(samples, boxes)`)
+
+    - Level `k` contains tiles of `2 ** k` consecutive samples reduced by `sum`, `min` and `max`
+    - Level 0 is the original data, higher levels are stored as memory mapped `.npy` files
+    - Number of samples does not have to be a power of two (the last tile of each level can be partial)
+
+    Queries read only the tiles covering the requested range from the coarsest level
+    that still provides the requested resolution, so plotting and zooming does not need the whole history in RAM.
+
+    Example:
+
+        ```
+        lod = LODPyramid.build(store.read('Values/latency/hist'), 'capture/lod/c3')
+        tiles, edges = lod.query(start=0, stop=10**6, width=1000)
+        ```
+    """
+
+    Meta = 'lod.json'
+    Reductions = {
+        'sum': np.add,
+        'min': np.minimum,
+        'max': np.maximum,
+    }
+
+    def __init__(self, path : str, source=None):
+        """
+        Open existing pyramid
+
+        Parameters
+        ----------
+            path : str
+                Pyramid directory
+            source : np.ndarray
+                Original data (level 0), optional
+        """
+
+        self.path = path
+        self.source = source
+
+        with open(os.path.join(path, self.Meta)) as f:
+            self.meta = json.load(f)
+
+        self.rows = self.meta['rows']
+        self.levels = [None]
+        for k in range(1, self.meta['levels'] + 1):
+            self.levels.append({
+                r: np.load(self._file(path, k, r), mmap_mode='r') for r in self.Reductions
+            })
+
+    @staticmethod
+    def _file(path, level, reduce):
+        return os.path.join(path, f"L{level}_{reduce}.npy")
+
+    @classmethod
+    def is_valid(cls, path : str, rows : int) -> bool:
+        """
+        Check that the pyramid exists and was built from `rows` samples
+        """
+
+        try:
+            with open(os.path.join(path, cls.Meta)) as f:
+                return json.load(f)['rows'] == rows
+        except (OSError, ValueError, KeyError):
+            return False
+
+    @classmethod
+    def build(cls, data, path : str, chunk : int = 2 ** 16):
+        """
+        Build pyramid from data and store it into directory
+
+        Data are processed in chunks, so memory mapped data larger than RAM are supported.
+
+        Parameters
+        ----------
+            data : np.ndarray
+                History with samples in the first axis
+            path : str
+                Pyramid directory
+            chunk : int
+                Number of rows processed at once
+        """
+
+        os.makedirs(path, exist_ok=True)
+        chunk = max(2, chunk - chunk % 2)
+
+        rows = len(data)
+        prev = {r: data for r in cls.Reductions}
+        level = 0
+        while len(prev['sum']) > 1:
+            level += 1
+            n = len(prev['sum'])
+            out = {}
+            for r, f in cls.Reductions.items():
+                dtype = np.dtype(float) if r == 'sum' else np.asarray(prev[r][:1]).dtype
+                out[r] = np.lib.format.open_memmap(
+                    cls._file(path, level, r), mode='w+', dtype=dtype, shape=((n + 1) // 2, *data.shape[1:])
+                )
+                for i in range(0, n, chunk):
+                    part = np.asarray(prev[r][i:i + chunk], dtype=dtype)
+                    out[r][i // 2:(i + len(part) + 1) // 2] = _reduce_pairs(f, part)
+                out[r].flush()
+            prev = out
+
+        # Remove levels of a previous (longer) capture
+        k = level + 1
+        while os.path.exists(cls._file(path, k, 'sum')):
+            for r in cls.Reductions:
+                os.remove(cls._file(path, k, r))
+            k += 1
+
+        with open(os.path.join(path, cls.Meta), 'w') as f:
+            json.dump({'rows': rows, 'levels': level}, f)
+
+        return cls(path, source=data)
+
+    def level(self, k : int, reduce : str = 'sum'):
+        """
+        Get tiles of level `k` (level 0 is the source data)
+        """
+
+        if k == 0:
+            if self.source is None:
+                raise Exception("Source data of the pyramid are not available")
+            return self.source
+        return self.levels[k][reduce]
+
+    def query(self, start : int = None, stop : int = None, width : int = 1024, reduce : str = 'sum'):
+        """
+        Get range of samples reduced to at most `width` rows
+
+        Parameters
+        ----------
+            start, stop : int
+                Range of samples (whole history by default)
+            width : int
+                Maximal number of returned rows (any value, does not have to divide number of samples)
+            reduce : str
+                'sum', 'min' or 'max'
+
+        Returns
+        -------
+            (tiles, edges)
+                Reduced rows and sample indexes of their boundaries (`len(edges) == len(tiles) + 1`).
+                The range is aligned to tiles of the used level, so it can be extended
+                by less than one returned row on each side.
+        """
+
+        if reduce not in self.Reductions:
+            raise Exception(f"Reduction {reduce} is not recognized")
+
+        start = 0 if start is None else max(0, start)
+        stop = self.rows if stop is None else min(self.rows, stop)
+        if stop <= start:
+            return np.zeros((0, *self.level(len(self.levels) - 1).shape[1:])), np.array([start])
+
+        # Coarsest level with enough tiles in the range
+        k = 0
+        while k + 1 < len(self.levels) and (stop - start) >> (k + 1) >= width:
+            k += 1
+        if k == 0 and self.source is None and len(self.levels) > 1:
+            k = 1
+
+        a = start >> k
+        b = -(-stop // (1 << k))
+        tiles = np.asarray(self.level(k, reduce)[a:b], dtype=float if reduce == 'sum' else None)
+
+        groups = np.unique(np.linspace(0, len(tiles), min(width, len(tiles)) + 1).astype(int))
+        tiles = self.Reductions[reduce].reduceat(tiles, groups[:-1], axis=0)
+        edges = np.minimum((groups + a) << k, self.rows)
+
+        return tiles, edges
+
+
+def _reduce_pairs(f, data):
+    # Reduce pairs of consecutive rows (the last odd row is kept as it is)
+    even = len(data) - len(data) % 2
+    res = f(data[0:even:2], data[1:even:2])
+    if even < len(data):
+        res = np.concatenate((res, data[even:]))
+    return res
+
+
+def reduce_axis(data, size : int, axis : int = 0, reduce : str = 'sum'):
+    """
+    Reduce axis of array to `size` items (groups of consecutive items are reduced, size does not have to divide shape)
+
+    Returns
+    -------
+        (data, groups)
+            Reduced data and start indexes of groups
+    """
+
+    n = data.shape[axis]
+    if n <= size:
+        return data, np.arange(n)
+
+    groups = np.unique(np.linspace(0, n, size + 1).astype(int))[:-1]
+    return LODPyramid.Reductions[reduce].reduceat(data, groups, axis=axis), groups
@@ -4,11 +4,17 @@
 #
 # Package for structured loading and saving statistics from data_logger
 
+import os
+import re
+import ast
+import sys
 import json
 import numpy as np
-import pandas as pd
+from time import monotonic
 from typing import List, Callable, Any, Optional
 
+from logger_stats.column_store import ColumnStore
+
 
 # Common conversion functions #
 
@@ -88,6 +94,13 @@ def ConvertStates(states : List[Any]) -> Callable[[float], Any]:
     return res
 
 
+def _is_series(v):
+    # pandas is not imported just for this check (slow startup),
+    # if it was not imported yet, `v` cannot be a Series
+    pd = sys.modules.get('pandas')
+    return pd is not None and isinstance(v, pd.Series)
+
+
 # Common format functions #
 
 def FormatDefault(
@@ -117,7 +130,7 @@ def FormatDefault(
         if v is None:
             return "-"
 
-        if isinstance(v, (list, pd.core.series.Series, np.ndarray)):
+        if isinstance(v, (list, np.ndarray)) or _is_series(v):
             if only_last or not isinstance(v, (int, float)):
                 v = v[-1]
             else:
@@ -154,7 +167,237 @@ def FormatDefaultValue(
             Conversion function
     """
 
-    return lambda data: f"<{format(data['min'])} / {format(data['avg'])} / {format(data['max'])}> {units}"
+    def res(data):
+        res = f"<{format(data['min'])} / {format(data['avg'])} / {format(data['max'])}> {units}"
+
+        # Percentiles computed from histogram
+        percentiles = [k for k in data if re.fullmatch(r'p[0-9.]+', k) and len(data[k]) > 0]
+        if len(percentiles) > 0:
+            res += f" ({' / '.join(percentiles)}: "
+            res += f"{' / '.join(format(data[k]) for k in percentiles)})"
+
+        return res
+
+    return res
+
+
+class RingBuffer:
+    """
+    Fixed-size history of numeric samples stored in a preallocated numpy array
+
+    - Only the newest `depth` items are kept
+    - Optionally `bucket` consecutive samples are reduced ('min', 'max' or 'mean') into one item
+    - Aggregates over all appended samples (`count`, `total`, `min`, `max`, `mean`) are updated incrementally
+
+    Samples can be scalars or arrays (for example histogram rows), item shape is taken from the first sample.
+    Integer samples are stored as integers (counters wider than float64 mantissa stay exact),
+    the buffer is widened to float on the first non-integer item.
+    """
+
+    Reductions = {
+        'min': lambda a: a.min(axis=0),
+        'max': lambda a: a.max(axis=0),
+        'mean': lambda a: a.mean(axis=0),
+    }
+
+    def __init__(self, depth : int, bucket : int = 1, reduce : str = 'mean'):
+        """
+        Parameters
+        ----------
+            depth : int
+                Number of stored items
+            bucket : int
+                Number of samples reduced into one stored item (downsampling)
+            reduce : str
+                Reduction of one bucket ('min', 'max', 'mean')
+        """
+
+        assert depth > 0, "Ring buffer depth has to be positive"
+        assert bucket > 0, "Ring buffer bucket has to be positive"
+        if reduce not in self.Reductions:
+            raise Exception(f"Reduction {reduce} is not recognized")
+
+        self.depth = depth
+        self.bucket = bucket
+        self.reduce = reduce
+        self.clear()
+
+    def clear(self):
+        self._buff = None
+        self._pos = 0
+        self._len = 0
+        self._pending = []
+
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def _array(v):
+        v = np.asarray(v)
+        if v.dtype.kind == 'b':
+            return v.astype(np.int64)
+        if v.dtype.kind not in 'iuf':
+            return v.astype(float)
+        return v
+
+    def append(self, v):
+        v = self._array(v)
+
+        self.count += 1
+        # Scalar sums are kept as Python numbers (exact for integers)
+        self.total = self.total + (v.item() if v.ndim == 0 else v)
+        self.min = v if self.min is None else np.minimum(self.min, v)
+        self.max = v if self.max is None else np.maximum(self.max, v)
+
+        if self.bucket > 1:
+            self._pending.append(v)
+            if len(self._pending) < self.bucket:
+                return
+            v = self.Reductions[self.reduce](np.array(self._pending))
+            self._pending = []
+
+        if self._buff is None:
+            self._buff = np.zeros((self.depth, *v.shape), dtype=v.dtype)
+        elif not np.can_cast(v.dtype, self._buff.dtype):
+            self._buff = self._buff.astype(np.result_type(self._buff.dtype, v.dtype, float))
+        self._buff[self._pos] = v
+        self._pos = (self._pos + 1) % self.depth
+        self._len = min(self._len + 1, self.depth)
+
+    def set_values(self, values):
+        """
+        Replace the content with given items (aggregates are recomputed from them)
+
+        Items are stored directly, they are not downsampled again.
+        """
+
+        values = self._array(values)
+        if len(values) == len(self) and np.array_equal(values, self.values()):
+            return
+
+        bucket = self.bucket
+        self.clear()
+        self.bucket = 1
+        for v in values[-self.depth:]:
+            self.append(v)
+        self.bucket = bucket
+
+    def values(self):
+        """
+        Get stored items in chronological order
+        """
+
+        if self._buff is None:
+            return np.zeros(0)
+        if self._len < self.depth:
+            return self._buff[:self._len]
+        return np.concatenate((self._buff[self._pos:], self._buff[:self._pos]))
+
+    def last(self):
+        if self._len == 0:
+            return None
+        return self._buff[self._pos - 1]
+
+    def mean(self):
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def __len__(self):
+        return self._len
+
+
+def _ring_values(data):
+    if isinstance(data, RingBuffer):
+        return data.values()
+    if isinstance(data, dict):
+        return {k: _ring_values(v) for k, v in data.items()}
+    return data
+
+
+def _ring_set(data, values):
+    # Returns new data container with updated values
+    if isinstance(data, RingBuffer):
+        data.set_values([] if values is None else values)
+        return data
+    if isinstance(data, dict) and isinstance(values, dict):
+        for k, v in values.items():
+            data[k] = _ring_set(data[k], v) if k in data else v
+        return data
+    return values
+
+
+class CounterDelta:
+    """
+    Interval differences of an absolute hardware counter with wraparound correction
+
+    Data logger's counters are `width` bits wide and silently wrap around.
+    The difference between two consecutive reads is computed modulo `2 ** width`,
+    so it is correct as long as the counter wraps at most once between two reads.
+
+    - `total` holds wrap-corrected value accumulated since the first read
+    - `absolute` holds wrap-corrected counter value (`first + total`)
+    - `ewma` holds exponentially weighted moving average of the rate (when `alpha` is set)
+    """
+
+    def __init__(self, width : int, alpha : Optional[float] = None):
+        """
+        Parameters
+        ----------
+            width : int
+                Counter width in bits (data_logger's `CNTER_WIDTH`)
+            alpha : float
+                Optional EWMA smoothing factor (0, 1], 1 means no smoothing
+        """
+
+        if alpha is not None and not 0 < alpha <= 1:
+            raise Exception(f"EWMA alpha {alpha} is out of range (0, 1]")
+
+        self.width = width
+        self.alpha = alpha
+        self.clear()
+
+    def clear(self):
+        self.first = None
+        self.prev = None
+        self.total = 0
+        self.wraps = 0
+        self.ewma = None
+
+    def update(self, raw : int) -> int:
+        """
+        Process new absolute value and return difference against the previous one (0 for the first value)
+        """
+
+        if self.prev is None:
+            self.first = raw
+            self.prev = raw
+            return 0
+
+        delta = (raw - self.prev) % (1 << self.width)
+        if raw < self.prev:
+            self.wraps += 1
+
+        self.prev = raw
+        self.total += delta
+        return delta
+
+    @property
+    def absolute(self) -> int:
+        return 0 if self.first is None else self.first + self.total
+
+    def smooth(self, rate : float) -> float:
+        """
+        Update EWMA by the new rate and return the smoothed value
+        """
+
+        if self.alpha is None or self.ewma is None:
+            self.ewma = rate
+        else:
+            self.ewma = self.alpha * rate + (1 - self.alpha) * self.ewma
+        return self.ewma
 
 
 class LoggerStats:
@@ -167,13 +410,17 @@ class LoggerStats:
 
     Default statistics types:
     - `Constant(index, name)`
-    - `Counter(index, name)`
+    - `Counter(index, name)` - optionally with wraparound correction (`wrap=True`)
     - `TimeCounter(index, freq, name)` - counter measuring time / latency
     - `FlowTimeCounter(index_words, index_ticks, freq, word_bits, name)` - 2 counters measuring data flow
+    - `CounterRate(index, name)` - counter's rate between load calls (with wraparound correction)
+    - `FlowRate(index_words, index_ticks, freq, word_bits, name)` - data flow between load calls
     - `Value(index, name)`
     - `ValueCMD(index, name, cmd_width, cmds)` - same as Value, but histogram is split to `2**cmd_width` types specified by MSB bits
     - `Custom(name, data)` - statistic's value will be specified during creation or during loading
     - `CustomJSON(name)` - statistic's value will be specified externally by JSON string
+    - `Derived(expr, name)` - statistic computed from other statistics by an expression (for example `{wr flow} + {rd flow}`)
+    - `Ratio(num, den, name)` - ratio of two other statistics from the same node (for example stall percentage)
 
     Providing data_logger classes:
 
@@ -207,6 +454,12 @@ class LoggerStats:
         print(stats.to_str())
         stats.save('stats.npz')
         ```
+
+    Streaming mode:
+
+    - `set_streaming(depth)` keeps only the newest `depth` samples of each statistic (see `RingBuffer`)
+    - Samples can be downsampled by reducing `bucket` consecutive samples (min / max / mean)
+    - This is useful for long monitoring sessions where the full history is not needed
     """
 
     StrOffset = 2
@@ -228,11 +481,16 @@ class LoggerStats:
 
         self.stats = []
         self.time = []
+        self.streaming = None
 
-        def calc_stats(data):
-            return data
+        self.calc_stats = self._no_calc
+        self._derived = None
+        self._loads = 0
+        self._saved_loads = {}
 
-        self.calc_stats = calc_stats
+    @staticmethod
+    def _no_calc(data):
+        return data
 
     def add_stat(self, stat):
         """
@@ -241,7 +499,10 @@ class LoggerStats:
         """
 
         stat.set_logger(self.logger)
+        if self.streaming is not None:
+            stat.set_streaming(**self.streaming)
         self.stats.append(stat)
+        self._derived = None
 
     def add_stats(
             self,
@@ -276,6 +537,39 @@ class LoggerStats:
         for i, name in zip(indexes, names):
             group.add_stat(constructor(i, name))
 
+    def add_derived(self, definitions : dict, **kwargs):
+        """
+        Add derived statistics (see `Derived`)
+
+        Parameters
+        ----------
+            definitions : dict
+                Statistic name -> expression (for example output of `derived` or a JSON file)
+            kwargs
+                Other `Derived` parameters (format, default, ...)
+        """
+
+        for name, expr in definitions.items():
+            self.add_stat(Derived(expr, name, **kwargs))
+
+    def derived(self, prefix : str = ''):
+        """
+        Get definitions of all derived statistics in this node and sub-nodes
+
+        Returns
+        -------
+            dict
+                Statistic path -> expression (paths in the expressions are relative to the statistic's node)
+        """
+
+        res = {}
+        for s in self.stats:
+            if isinstance(s, LoggerStats):
+                res.update(s.derived(f"{prefix}{s.name}/"))
+            elif isinstance(s, Derived):
+                res[f"{prefix}{s.name}"] = s.expr
+        return res
+
     def add_calc_stats(self, calc_stats):
         """
         Add callback that will transform statistics after each logging
@@ -299,6 +593,26 @@ class LoggerStats:
         for s in self.stats:
             s.set_logger(logger)
 
+    def set_streaming(self, depth : int, bucket : int = 1, reduce : str = 'mean'):
+        """
+        Keep only limited history of all statistics in this node (see `RingBuffer`)
+
+        Parameters
+        ----------
+            depth : int
+                Number of stored samples
+            bucket : int
+                Number of consecutive samples reduced into one stored sample
+            reduce : str
+                Reduction of one bucket ('min', 'max', 'mean')
+        """
+
+        self.streaming = {'depth': depth, 'bucket': bucket, 'reduce': reduce}
+        self.time = RingBuffer(**self.streaming)
+
+        for s in self.stats:
+            s.set_streaming(**self.streaming)
+
     def load(self, time : Optional[float] = None):
         """
         Load statistics
@@ -317,7 +631,59 @@ class LoggerStats:
         for s in self.stats:
             s.load()
 
-        self.set_data(self.calc_stats(self.data()))
+        self._calc()
+
+    def reset(self, logger=None):
+        """
+        Forget state computed from the previous counter values of all statistics in this node and sub-nodes
+        (wraparound correction, accumulated aggregates), call after data_logger's reset
+
+        Loaded history is kept.
+
+        Parameters
+        ----------
+            logger : DataLogger
+                Reset only statistics of this data_logger (all statistics by default)
+        """
+
+        for s in self.stats:
+            if isinstance(s, LoggerStats):
+                s.reset(logger)
+            elif logger is None or s.logger is logger:
+                s.reset()
+
+    def leaves(self):
+        """
+        Iterate over all statistics in this node and sub-nodes (except nested LoggerStats nodes)
+        """
+
+        for s in self.stats:
+            if isinstance(s, LoggerStats):
+                yield from s.leaves()
+            else:
+                yield s
+
+    def calc(self):
+        """
+        Apply `calc_stats` callbacks of all sub-nodes and this node
+        (used when leaf statistics were loaded externally, see `LoggerPoller`)
+        """
+
+        for s in self.stats:
+            if isinstance(s, LoggerStats):
+                s.calc()
+
+        self._calc()
+
+    def _calc(self):
+        self._loads += 1
+        if self._derived is None:
+            self._derived = _derived_order(self)
+        for s in self._derived:
+            s.derive(self)
+
+        if self.calc_stats is not self._no_calc:
+            self.set_data(self.calc_stats(self.data()))
 
     def data(self):
         """
@@ -328,7 +694,7 @@ class LoggerStats:
 
         res = {s.name: s.data() for s in self.stats}
         if len(self.time) > 0:
-            res['Log time'] = self.time
+            res['Log time'] = _ring_values(self.time)
         return res
 
     def set_data(self, data):
@@ -340,13 +706,28 @@ class LoggerStats:
             s.set_data(data[s.name])
 
         # Add new statistics
-        stat_names = map(lambda s: s.name, self.stats)
+        stat_names = [s.name for s in self.stats]
         for key in data:
-            if key not in stat_names:
-                self.add_stat(Custom(name=key, data=data[key]))
+            if key not in stat_names and key != 'Log time':
+                stat = Custom(name=key)
+                self.add_stat(stat)
+                stat.set_data(data[key])
 
         if 'Log time' in data:
-            self.time = data['Log time']
+            self.time = _ring_set(self.time, data['Log time'])
+
+    def get_stat(self, path : str):
+        """
+        Get statistic (or sub-node) by its name or path relative to this node (for example `Requests/rd req cnt`)
+        """
+
+        node = self
+        for name in path.split('/'):
+            sub = [s for s in getattr(node, 'stats', []) if s.name == name]
+            if len(sub) == 0:
+                raise Exception(f"Statistic {path} not found in {self.name}")
+            node = sub[0]
+        return node
 
     def __getitem__(self, key):
         return self.data()[key]
@@ -382,12 +763,53 @@ class LoggerStats:
         data = self.data()
         np.savez_compressed(file, np.array(data, dtype=object))
 
-    def load_file(self, file):
+    def save_columns(self, path : str, append : bool = False, lod : bool = False):
+        """
+        Save all statistics into columnar store (see `ColumnStore`)
+
+        Parameters
+        ----------
+            path : str
+                Store directory
+            append : bool
+                Append only samples loaded since the previous save to the same store
+                (call after one or more `load` calls during running capture), else the whole history is written.
+                Streaming history has to be deep enough to hold all samples loaded between two saves.
+            lod : bool
+                Precompute level-of-detail pyramids of histogram histories (see `LODPyramid`)
+        """
+
+        if append:
+            # Number of new history items (streaming history stores one item per `bucket` loads)
+            bucket = 1 if self.streaming is None else self.streaming['bucket']
+            saved = self._saved_loads.get(os.path.abspath(path), 0)
+            self._saved_loads[os.path.abspath(path)] = self._loads
+
+            store = ColumnStore(path, mode='a')
+            store.append(self.data(), new=self._loads // bucket - saved // bucket)
+        else:
+            store = ColumnStore(path, mode='w')
+            store.write(self.data())
+
+        if lod:
+            store.build_lod()
+
+    def load_file(self, file, columns : Optional[List[str]] = None):
         """
-        Load all statistics from .npz file
+        Load all statistics from .npz file or from columnar store directory
+
+        Parameters
+        ----------
+            file : str
+                .npz file or `ColumnStore` directory
+            columns : List[str]
+                Load only selected statistics (names or name prefixes), only for `ColumnStore`
         """
 
-        data = np.load(file, allow_pickle=True)['arr_0'].item()
+        if os.path.isdir(file):
+            data = ColumnStore(file).to_dict(columns)
+        else:
+            data = np.load(file, allow_pickle=True)['arr_0'].item()
         self.set_data(data)
 
 
@@ -426,15 +848,37 @@ class DefaultStat:
         if self.logger is None:
             self.logger = logger
 
+    def set_streaming(self, depth : int, bucket : int = 1, reduce : str = 'mean'):
+        """
+        Store history in `RingBuffer` instead of unbounded list
+        """
+
+        self._data = RingBuffer(depth, bucket, reduce)
+
     def data(self):
-        return self._data
+        return _ring_values(self._data)
 
     def set_data(self, data):
-        self._data = data
+        self._data = _ring_set(self._data, data)
+
+    def aggregate(self):
+        """
+        Get aggregates over all loaded samples: `{'count', 'min', 'max', 'mean'}`
+
+        In streaming mode aggregates are updated incrementally
+        and also cover samples that were already dropped from the history.
+        """
+
+        data = self._data
+        if not isinstance(data, RingBuffer):
+            data = RingBuffer(max(1, len(data)))
+            data.set_values(self._data)
+
+        return {'count': data.count, 'min': data.min, 'max': data.max, 'mean': data.mean()}
 
     def to_str(self, prefix=40, offset=0):
         spaces = prefix - len(self.name) - offset
-        return f"{' ' * offset}{self.name}{' ' * spaces}: {self.format(self._data)}\n"
+        return f"{' ' * offset}{self.name}{' ' * spaces}: {self.format(self.data())}\n"
 
     def _prefix_len(self):
         return len(self.name)
@@ -442,6 +886,13 @@ class DefaultStat:
     def load(self):
         assert self.logger is not None, f"Data Logger needs to be specified for stat {self.name}"
 
+    def reset(self):
+        """
+        Forget state computed from the previous counter values (call after data_logger's reset)
+        """
+
+        pass
+
 
 class Constant(DefaultStat):
     """
@@ -476,10 +927,17 @@ class Constant(DefaultStat):
         self._raw_data = None
         self._data = None
 
+    def set_streaming(self, *args, **kwargs):
+        # Constant does not keep history
+        pass
+
+    def aggregate(self):
+        return {'count': 1, 'min': self._data, 'max': self._data, 'mean': self._data}
+
     def load(self):
         super().load()
 
-        ctrli = self.logger.load_ctrl(0)
+        ctrli = self.logger.load_constants()
         data = self.logger.get_bits(ctrli, self.logger.mi_width, self.logger.mi_width * self.index)
 
         self._raw_data = data
@@ -493,9 +951,11 @@ class Counter(DefaultStat):
     Data format: `[x, y, ...]`
 
     - Data contains counter's value from each load call
+    - With `wrap=True` the counter's wraparound is corrected based on data_logger's `CNTER_WIDTH`
+      (value keeps incrementing after the counter wraps, see `CounterDelta`)
     """
 
-    def __init__(self, index : int, *args, **kwargs):
+    def __init__(self, index : int, *args, wrap : bool = False, **kwargs):
         """
         Parameters
         ----------
@@ -503,6 +963,8 @@ class Counter(DefaultStat):
                 Counter index inside data_logger
             name : str
                 Statistics name
+            wrap : bool
+                Correct counter wraparound
             logger : DataLogger class
                 DataLogger class
             convert : Callable[[float], float]
@@ -513,13 +975,29 @@ class Counter(DefaultStat):
 
         super().__init__(*args, **kwargs)
         self.index = index
+        self.wrap = wrap
+
+        self._delta = None
 
     def load(self):
         super().load()
 
         self._raw_data = self.logger.load_cnter(self.index)
+        if self.wrap:
+            if self._delta is None:
+                self._delta = CounterDelta(self.logger.config["CNTER_WIDTH"])
+            self._delta.update(self._raw_data)
+            self._raw_data = self._delta.absolute
+
         self._data.append(self.convert(self._raw_data))
 
+    def reset(self):
+        """
+        Forget the previous counter value (call after data_logger's reset)
+        """
+
+        self._delta = None
+
 
 class TimeCounter(DefaultStat):
     """
@@ -617,15 +1095,52 @@ class FlowCounter(DefaultStat):
         self.word_bits = word_bits
         self.units = units
 
+        self._words = None
+        self._ticks = None
+
+    def _update_counters(self, alpha : Optional[float] = None):
+        # Returns wrap-corrected differences of both counters since the previous load
+        if self._words is None:
+            width = self.logger.config["CNTER_WIDTH"]
+            self._words = CounterDelta(width, alpha)
+            self._ticks = CounterDelta(width)
+
+        words = self._words.update(self.logger.load_cnter(self.index_words))
+        ticks = self._ticks.update(self.logger.load_cnter(self.index_ticks))
+        return words, ticks
+
     def load(self):
         super().load()
 
-        words = self.logger.load_cnter(self.index_words)
-        ticks = self.logger.load_cnter(self.index_ticks)
+        self._update_counters()
 
-        self._raw_data = self._convert(words, ticks)
+        self._raw_data = self._convert(self._words.prev, self._ticks.prev)
         self._data.append(self.convert(self._raw_data))
 
+    def _flow(self):
+        # Flow over all loaded samples from the accumulated counters
+        return self._convert(self._words.absolute, self._ticks.absolute)
+
+    def aggregate(self):
+        """
+        Get aggregates over all loaded samples: `{'count', 'min', 'max', 'mean', 'flow'}`
+
+        `flow` is computed from wrap-corrected counter values accumulated incrementally by each load
+        (not as a mean of the stored samples).
+        """
+
+        res = super().aggregate()
+        res['flow'] = None if self._words is None else self.convert(self._flow())
+        return res
+
+    def reset(self):
+        """
+        Forget the previous counter values (call after data_logger's reset)
+        """
+
+        self._words = None
+        self._ticks = None
+
     def _convert(self, words, ticks):
         DataUnits = {
             'b': self.word_bits,        # Bits
@@ -655,6 +1170,134 @@ class FlowCounter(DefaultStat):
         return words * data / time / mult
 
 
+class CounterRate(DefaultStat):
+    """
+    Rate of data logger's counter (events per time unit) computed between consecutive load calls
+
+    - Counter wraparound is corrected based on data_logger's `CNTER_WIDTH`
+    - Time interval is measured by host clock (`clock`)
+    - Optional EWMA smoothing (`alpha`), smoothed value is stored instead of the raw rate
+
+    Data format: `[x, y, ...]`
+
+    - Data contains rate of each interval (first load call produces 0)
+    """
+
+    def __init__(
+            self,
+            index : int,
+            *args,
+            units : str = 's',
+            alpha : Optional[float] = None,
+            clock : Callable[[], float] = monotonic,
+            **kwargs
+    ):
+        """
+        Parameters
+        ----------
+            index : int
+                Counter index inside data_logger
+            name : str
+                Statistics name
+            units : str
+                Time units of the rate ('h', 'min', 's', 'ms', 'us', 'ns')
+            alpha : float
+                Optional EWMA smoothing factor (0, 1]
+            clock : Callable[[], float]
+                Time source [s]
+            logger : DataLogger class
+                DataLogger class
+            convert : Callable[[float], float]
+                Optional conversion function
+            format : Callable[[float], str]
+                Optional format function
+        """
+
+        if units not in TimeUnits:
+            raise Exception(f"Unit {units} is not recognized")
+        if 'format' not in kwargs:
+            kwargs['format'] = FormatDefault(units=f'/{units}', decimal=3)
+        super().__init__(*args, **kwargs)
+        self.index = index
+        self.units = units
+        self.alpha = alpha
+        self.clock = clock
+
+        self._delta = None
+        self._time = None
+
+    def load(self):
+        super().load()
+
+        if self._delta is None:
+            self._delta = CounterDelta(self.logger.config["CNTER_WIDTH"], self.alpha)
+
+        now = self.clock()
+        delta = self._delta.update(self.logger.load_cnter(self.index))
+        if self._time is None:
+            self._time = now
+            self._raw_data = 0
+            self._data.append(self.convert(0))
+            return
+
+        dt = (now - self._time) / TimeUnits[self.units]
+        self._time = now
+
+        self._raw_data = delta / dt if dt > 0 else 0
+        self._data.append(self.convert(self._delta.smooth(self._raw_data)))
+
+    def reset(self):
+        """
+        Forget the previous counter value (call after data_logger's reset)
+        """
+
+        self._delta = None
+        self._time = None
+
+
+class FlowRate(FlowCounter):
+    """
+    Data flow (see `FlowCounter`) of each interval between consecutive load calls
+
+    `FlowCounter` divides absolute counter values, so it reports average flow since the last reset.
+    `FlowRate` divides interval differences of both counters (with wraparound correction),
+    so long-running measurements report current throughput without resetting the hardware.
+
+    Data format: `[x, y, ...]`
+
+    - Data contains flow of each interval (first load call produces 0)
+    """
+
+    def __init__(self, *args, alpha : Optional[float] = None, **kwargs):
+        """
+        Parameters
+        ----------
+            Same as `FlowCounter` and:
+
+            alpha : float
+                Optional EWMA smoothing factor (0, 1], smoothed value is stored instead of the raw flow
+        """
+
+        super().__init__(*args, **kwargs)
+        self.alpha = alpha
+
+    def load(self):
+        DefaultStat.load(self)
+
+        first = self._words is None
+        words, ticks = self._update_counters(self.alpha)
+
+        self._raw_data = self._convert(words, ticks)
+        if first:
+            self._data.append(self.convert(self._raw_data))
+            return
+
+        self._data.append(self.convert(self._words.smooth(self._raw_data)))
+
+    def _flow(self):
+        return self._convert(self._words.total, self._ticks.total)
+
+
 class Value(DefaultStat):
     """
     Data logger's value statistics
@@ -666,13 +1309,18 @@ class Value(DefaultStat):
             'min': [x, y, ...],
             'max': [x, y, ...],
             'avg': [x, y, ...],
+            'p50': [x, y, ...],     # percentiles computed from the histogram (see `percentiles`)
+            'p99': [x, y, ...],
+            'p99.9': [x, y, ...],
             'hist': "np.array with shape: (time, boxes)",
-            'hist_x': "list with values corresponding to the middles of each histogram box"
+            'hist_x': "np.array with values corresponding to the middles of each histogram box"
         }
         ```
     """
 
-    def __init__(self, index : int, *args, format=FormatDefaultValue(), **kwargs):
+    Percentiles = (50, 99, 99.9)
+
+    def __init__(self, index : int, *args, format=FormatDefaultValue(), percentiles=Percentiles, **kwargs):
         """
         Parameters
         ----------
@@ -686,23 +1334,19 @@ class Value(DefaultStat):
                 Optional conversion function
             format : Callable[[float], str]
                 Optional format function
+            percentiles : List[float]
+                Percentiles [%] computed from the histogram after each load
         """
 
         super().__init__(*args, format=format, **kwargs)
         self.index = index
-        self._data = {
-            'min': [],
-            'avg': [],
-            'max': [],
-            'hist': None,
-            'hist_x': None
-        }
-
-    def load(self):
-        super().load()
+        self.percentiles = percentiles
+        self._data = _value_data(percentiles)
 
-        self._raw_data          = self.logger.load_value(self.index)
+        self._cnt = None
+        self._sum = None
 
+    def _load_config(self):
         self.width              = self.logger.config["VALUE_WIDTH"][self.index]
         self.value_en           = self.logger.config["VALUE_EN"][self.index]
         self.sum_extra_width    = self.logger.config["SUM_EXTRA_WIDTH"][self.index]
@@ -710,27 +1354,92 @@ class Value(DefaultStat):
         self.hist_box_width     = self.logger.config["HIST_BOX_WIDTH"][self.index]
         self.hist_step          = self.logger.config["HIST_STEP"][self.index]
 
-        metrics = ['min', 'avg', 'max', 'hist']
-        ens = ['MIN', 'SUM', 'MAX', 'HIST']
-        for m, en in zip(metrics, ens):
-            if not self.value_en[en]:
-                continue
+    def _hist_x(self, box_cnt):
+        x = (np.arange(0, box_cnt) + 0.5) * self.hist_step
+        try:
+            res = np.asarray(self.convert(x), dtype=float)
+            if res.shape == x.shape:
+                return res
+        except Exception:
+            pass
+        # Conversion function does not support numpy arrays
+        # (box values must still be numeric, they are cast to float for percentiles and averages)
+        return np.array([float(self.convert(i)) for i in x])
 
-            if m == 'hist':
-                x = [self.convert((i + 0.5) * self.hist_step) for i in range(0, self.hist_box_cnt)]
-                y = np.array([self._raw_data['hist']])
+    def load(self):
+        super().load()
 
-                self._data['hist_x'] = x
+        self._raw_data = self.logger.load_value(self.index)
+        self._load_config()
 
-                if self._data['hist'] is None:
-                    self._data['hist'] = y
-                else:
-                    self._data['hist'] = np.append(self._data['hist'], y, axis=0)
-            else:
+        metrics = ['min', 'avg', 'max']
+        ens = ['MIN', 'SUM', 'MAX']
+        for m, en in zip(metrics, ens):
+            if self.value_en[en]:
                 self._data[m].append(self.convert(self._raw_data[m]))
 
+        if self.value_en['SUM']:
+            if self._cnt is None:
+                self._cnt = CounterDelta(self.logger.config["CNTER_WIDTH"])
+                self._sum = CounterDelta(self.width + self.sum_extra_width)
+            self._cnt.update(self._raw_data['cnt'])
+            self._sum.update(self._raw_data['sum'])
+
+        if self.value_en['HIST']:
+            x = self._hist_x(self.hist_box_cnt)
+            y = np.asarray(self._raw_data['hist'])
+            _append_hist(self._data, x, y[np.newaxis, :], self.percentiles)
+
+    def set_streaming(self, depth : int, bucket : int = 1, reduce : str = 'mean'):
+        for m in _value_metrics(self.percentiles):
+            self._data[m] = RingBuffer(depth, bucket, reduce)
+
+    def hist(self, delta : bool = False):
+        """
+        Get the latest histogram (or difference between the two latest histograms when `delta` is set)
+        """
+
+        return _last_hist(self._data, delta)
+
+    def percentile(self, q, delta : bool = False):
+        """
+        Get percentile(s) `q` [%] of the latest histogram (or of the latest histograms difference)
+        """
+
+        return hist_percentile(self._data['hist_x'], self.hist(delta), q)
+
+    def cdf(self, delta : bool = False):
+        """
+        Get cumulative distribution function of the latest histogram: `(hist_x, cdf)`
+        """
+
+        return (self._data['hist_x'], hist_cdf(self.hist(delta)))
+
+    def aggregate(self):
+        """
+        Get aggregates over all loaded samples: `{'min', 'avg', 'max', 'hist'}`
+
+        - `avg` is computed from the value's sum and count accumulated incrementally by each load
+          (wrap-corrected, so it is weighted by the number of measured values, not by the number of loads)
+        - `hist` is a sum of all loaded histograms
+        """
+
+        res = _value_aggregate(self._data)
+        if self._cnt is not None and self._cnt.absolute > 0:
+            res['avg'] = self.convert(self._sum.absolute / self._cnt.absolute)
+
+        return res
+
+    def reset(self):
+        """
+        Forget the accumulated sum and count (call after data_logger's reset)
+        """
+
+        self._cnt = None
+        self._sum = None
+
 
-class ValueCMD(DefaultStat):
+class ValueCMD(Value):
     """
     Same as value statistics, but splits each histogram box to `2 ** cmd_width` measurements (commands).
 
@@ -771,23 +1480,18 @@ class ValueCMD(DefaultStat):
                 Optional conversion function
             format : Callable[[float], str]
                 Optional format function
+            percentiles : List[float]
+                Percentiles [%] computed from the histogram after each load
         """
 
-        super().__init__(*args, format=format, **kwargs)
-        self.index = index
+        super().__init__(index, *args, format=format, **kwargs)
 
         self.cmd_width = cmd_width
         self.cmds = cmds
 
         self._data = {}
         for cmd in self.cmds:
-            self._data[cmd] = {
-                'min': [],
-                'avg': [],
-                'max': [],
-                'hist': None,
-                'hist_x': None
-            }
+            self._data[cmd] = _value_data(self.percentiles)
 
     def to_str(self, prefix=40, offset=0):
         spaces = prefix - len(self.name) - offset
@@ -796,59 +1500,465 @@ class ValueCMD(DefaultStat):
         for cmd in self.cmds:
             spaces = prefix - len(cmd) - offset - LoggerStats.StrOffset
             res += f"{' ' * (offset + LoggerStats.StrOffset)}{cmd}{' ' * (spaces)}: "
-            res += f"{self.format(self._data[cmd])}\n"
+            res += f"{self.format(_ring_values(self._data[cmd]))}\n"
 
         return res
 
     def _prefix_len(self):
         return max(len(self.name), *list(map(lambda x: len(x), self.cmds))) + LoggerStats.StrOffset
 
+    def set_streaming(self, depth : int, bucket : int = 1, reduce : str = 'mean'):
+        for cmd in self.cmds:
+            for m in _value_metrics(self.percentiles):
+                self._data[cmd][m] = RingBuffer(depth, bucket, reduce)
+
     def load(self):
-        super().load()
+        DefaultStat.load(self)
 
         self._raw_data = self.logger.load_value(self.index)
-
-        self.width              = self.logger.config["VALUE_WIDTH"][self.index]
-        self.value_en           = self.logger.config["VALUE_EN"][self.index]
-        self.sum_extra_width    = self.logger.config["SUM_EXTRA_WIDTH"][self.index]
-        self.hist_box_cnt       = self.logger.config["HIST_BOX_CNT"][self.index]
-        self.hist_box_width     = self.logger.config["HIST_BOX_WIDTH"][self.index]
-        self.hist_step          = self.logger.config["HIST_STEP"][self.index]
+        self._load_config()
 
         self.hist_box_cnt       //= 2 ** self.cmd_width
 
-        x = [self.convert((i + 0.5) * self.hist_step) for i in range(0, self.hist_box_cnt)]
+        if not self.value_en['HIST']:
+            return
+
+        x = self._hist_x(self.hist_box_cnt)
+        cmds = len(self.cmds)
+        y = np.asarray(self._raw_data['hist'])[:cmds * self.hist_box_cnt].reshape(cmds, self.hist_box_cnt)
+
+        # Min / max are the first / last non zero boxes
+        non_zero = y > 0
+        valid = non_zero.any(axis=1)
+        first = np.argmax(non_zero, axis=1)
+        last = self.hist_box_cnt - 1 - np.argmax(non_zero[:, ::-1], axis=1)
+        total = y.sum(axis=1)
+        avg = np.divide(y @ x, total, out=np.zeros(cmds), where=total > 0)
 
         for i, cmd in enumerate(self.cmds):
-            if not self.value_en['HIST']:
-                continue
+            data = self._data[cmd]
+            _append_hist(data, x, y[i:i + 1], self.percentiles)
 
-            y = self._raw_data['hist'][i * self.hist_box_cnt : (i + 1) * self.hist_box_cnt]
-            y = np.array(y)
+            data['min'].append(x[first[i]] if valid[i] else 0)
+            data['max'].append(x[last[i]] if valid[i] else 0)
+            data['avg'].append(avg[i])
 
-            if self._data[cmd]['hist'] is None:
-                self._data[cmd]['hist'] = y
-            else:
-                self._data[cmd]['hist'] = np.append(self._data[cmd]['hist'], y, axis=0)
+    def hist(self, cmd : str, delta : bool = False):
+        """
+        Get the latest histogram of the command (or difference between the two latest histograms when `delta` is set)
+        """
 
-            self._data[cmd]['hist_x'] = x
+        return _last_hist(self._data[cmd], delta)
 
-            y = np.array(y)
-            # Indexes of the non zero items
-            non_zero = np.nonzero(y)[0]
+    def percentile(self, q, cmd : str, delta : bool = False):
+        """
+        Get percentile(s) `q` [%] of the latest histogram of the command
+        """
 
-            if len(non_zero) == 0:
-                min = 0
-                max = 0
-                avg = 0
-            else:
-                min = x[non_zero[0]]
-                max = x[non_zero[-1]]
-                avg = np.dot(x, y) / np.sum(y)
+        return hist_percentile(self._data[cmd]['hist_x'], self.hist(cmd, delta), q)
+
+    def cdf(self, cmd : str, delta : bool = False):
+        """
+        Get cumulative distribution function of the latest histogram of the command: `(hist_x, cdf)`
+        """
+
+        return (self._data[cmd]['hist_x'], hist_cdf(self.hist(cmd, delta)))
+
+    def aggregate(self):
+        """
+        Get aggregates over all loaded samples of each command: `{cmd: {'min', 'avg', 'max', 'hist'}}`
+
+        Metrics of each command are computed from its histogram, see `Value.aggregate`.
+        """
+
+        return {cmd: _value_aggregate(self._data[cmd]) for cmd in self.cmds}
+
+
+def _percentile_name(q):
+    return f"p{q:g}"
+
+
+def _value_metrics(percentiles):
+    return ['min', 'avg', 'max', *map(_percentile_name, percentiles), 'hist']
+
+
+def _value_data(percentiles):
+    data = {m: [] for m in _value_metrics(percentiles)}
+    data['hist'] = None
+    data['hist_x'] = None
+    return data
+
+
+def _value_aggregate(data):
+    res = {}
+    for m, f in (('min', np.min), ('avg', np.mean), ('max', np.max)):
+        d = data[m]
+        if isinstance(d, RingBuffer):
+            res[m] = {'min': d.min, 'avg': d.mean(), 'max': d.max}[m]
+        else:
+            res[m] = f(d) if len(d) > 0 else None
+
+    hist = data['hist']
+    if isinstance(hist, RingBuffer):
+        res['hist'] = hist.total if hist.count > 0 else None
+    else:
+        res['hist'] = None if hist is None else np.array(hist).sum(axis=0)
+
+    return res
+
+
+def _append_hist(data, x, y, percentiles):
+    # y is a histogram with shape (1, boxes)
+    data['hist_x'] = x
+
+    if isinstance(data['hist'], RingBuffer):
+        data['hist'].append(y[0])
+    elif data['hist'] is None:
+        data['hist'] = y
+    else:
+        data['hist'] = np.append(data['hist'], y, axis=0)
+
+    if len(percentiles) > 0:
+        for q, v in zip(percentiles, hist_percentile(x, y[0], percentiles)):
+            data[_percentile_name(q)].append(v)
+
+
+def _last_hist(data, delta):
+    hist = _ring_values(data['hist'])
+    if hist is None or len(hist) == 0:
+        return None
+    if delta:
+        return hist_delta(hist)
+    return hist[-1]
+
+
+# Histogram functions #
+
+def hist_cdf(hist):
+    """
+    Cumulative distribution function of histogram
+
+    Parameters
+    ----------
+        hist : np.ndarray
+            Histogram with boxes in the last axis (multiple histograms can be passed, for example `(time, boxes)`)
+
+    Returns
+    -------
+        np.ndarray
+            CDF with the same shape as `hist` (zeros for empty histogram)
+    """
+
+    cum = np.cumsum(np.asarray(hist, dtype=float), axis=-1)
+    total = cum[..., -1:]
+    return np.divide(cum, total, out=np.zeros_like(cum), where=total > 0)
+
+
+def hist_percentile(hist_x, hist, q):
+    """
+    Compute percentiles from histogram
+
+    Parameters
+    ----------
+        hist_x : np.ndarray
+            Values corresponding to the histogram boxes (cast to float)
+        hist : np.ndarray
+            Histogram with boxes in the last axis (multiple histograms can be passed, for example `(time, boxes)`)
+        q : float or List[float]
+            Percentile(s) [%]
+
+    Returns
+    -------
+        Value of the first box where CDF reaches `q` (0 for empty histogram).
+        Shape is `hist.shape[:-1] + np.shape(q)`.
+    """
+
+    if hist is None:
+        return None
+
+    hist_x = np.asarray(hist_x, dtype=float)
+    cdf = hist_cdf(hist)
+    qs = np.atleast_1d(np.asarray(q, dtype=float)) / 100
+
+    # Number of boxes with CDF below each percentile = index of the percentile box
+    idx = (cdf[..., np.newaxis, :] < qs[:, np.newaxis]).sum(axis=-1)
+    idx = np.minimum(idx, len(hist_x) - 1)
+    res = np.where(cdf[..., -1:] > 0, hist_x[idx], 0)
+
+    return res if np.ndim(q) > 0 else res[..., 0]
+
+
+def hist_delta(hist, a : int = -2, b : int = -1):
+    """
+    Difference between two snapshots of cumulative histogram
+
+    Parameters
+    ----------
+        hist : np.ndarray
+            Histogram history with shape (time, boxes)
+        a, b : int
+            Indexes of the older and newer snapshot
+
+    Returns
+    -------
+        np.ndarray
+            `hist[b] - hist[a]` (or `hist[b]` if there is only one snapshot or data_logger was reset in between)
+    """
+
+    hist = np.asarray(hist)
+    if len(hist) < 2:
+        return hist[b]
+
+    delta = hist[b].astype(float) - hist[a]
+    if (delta < 0).any():
+        return hist[b]
+    return delta
+
+
+class Derived(DefaultStat):
+    """
+    Statistic computed from other statistics by an expression
+
+    Other statistics are referenced by their names or paths relative to the node in curly brackets,
+    for example `{wr flow} + {rd flow}` or `{Values/latency/avg} / 1000`
+    (items of dictionary statistics like `Value` are selected by the last part of the path).
+
+    - Operators: `+ - * / // % **` and unary `-`
+    - Functions: `min`, `max`, `abs` and `delta({x})` - difference between the two newest samples of `x`
+      (the newest sample if there is no previous one or if the counter was reset,
+      counters should use `wrap=True`, else their wraparound is taken as a reset)
+    - Expression is compiled once, after each load only the newest sample is computed
+    - Derived statistics of one node are evaluated in order of their dependencies
+      (they can reference each other, see `LoggerStats.derived`)
+
+    Data format: `[x, y, ...]`
+
+    Example:
+
+        ```
+        stats.add_stat(Derived('{wr flow} + {rd flow}', 'total flow'))
+        stats.add_stat(Derived('delta({Counters/stall cnt}) / delta({Counters/beat cnt}) * 100', 'stalls'))
+        ```
+    """
 
-            self._data[cmd]['min'].append(min)
-            self._data[cmd]['max'].append(max)
-            self._data[cmd]['avg'].append(avg)
+    Functions = {'min': min, 'max': max, 'abs': abs}
+
+    def __init__(self, expr : str, *args, default : float = float('nan'), **kwargs):
+        """
+        Parameters
+        ----------
+            expr : str
+                Expression
+            name : str
+                Statistics name
+            default : float
+                Value used when the expression cannot be computed (division by zero, missing data)
+            convert : Callable[[float], float]
+                Optional conversion function
+            format : Callable[[float], str]
+                Optional format function
+        """
+
+        super().__init__(*args, **kwargs)
+        self.expr = expr
+        self.default = default
+        self.refs, self._deltas, self._code = _compile_expr(expr, self.Functions)
+        self._getters = None
+
+    def load(self):
+        # Computed from other statistics in `derive`
+        pass
+
+    def derive(self, node):
+        """
+        Compute the newest sample (called by `node` after its statistics are loaded)
+        """
+
+        if self._getters is None:
+            self._getters = [_ref_getter(node, path) for path in self.refs]
+
+        env = {}
+        for i, getter in enumerate(self._getters):
+            samples = _last_samples(getter())
+            if samples is None:
+                self._data.append(self.default)
+                return
+
+            env[f'_v{i}'] = samples[-1]
+            if i in self._deltas:
+                d = samples[-1] - samples[-2] if len(samples) > 1 else samples[-1]
+                env[f'_d{i}'] = d if d >= 0 else samples[-1]
+
+        try:
+            v = self.convert(eval(self._code, {'__builtins__': {}, **self.Functions}, env))
+        except ZeroDivisionError:
+            v = self.default
+        self._data.append(v)
+
+
+FormatRatio = FormatDefault(units='%', decimal=2, only_last=True)
+
+
+class Ratio(Derived):
+    """
+    Ratio of two statistics from the same node (see `Derived`)
+
+    Data format: `[x, y, ...]`
+
+    Example:
+
+        ```
+        stats.add_stat(Counter(0, 'stall cnt', wrap=True))
+        stats.add_stat(Counter(5, 'beat cnt', wrap=True))
+        stats.add_stat(Ratio('stall cnt', 'beat cnt', 'stalls'))
+        ```
+    """
+
+    def __init__(
+            self,
+            num : str,
+            den : str,
+            *args,
+            scale : float = 100,
+            interval : bool = True,
+            format=FormatRatio,
+            **kwargs
+    ):
+        """
+        Parameters
+        ----------
+            num : str
+                Numerator statistic
+            den : str
+                Denominator statistic
+            name : str
+                Statistics name
+            scale : float
+                Multiplier of the ratio (100 for percents)
+            interval : bool
+                Ratio of differences between the two latest samples (for incrementing counters),
+                else ratio of the latest samples
+            convert : Callable[[float], float]
+                Optional conversion function
+            format : Callable[[float], str]
+                Optional format function
+        """
+
+        if interval:
+            expr = f"delta({{{num}}}) / delta({{{den}}}) * {scale}"
+        else:
+            expr = f"{{{num}}} / {{{den}}} * {scale}"
+
+        super().__init__(expr, *args, default=0.0, format=format, **kwargs)
+        self.num = num
+        self.den = den
+        self.scale = scale
+        self.interval = interval
+
+
+def _compile_expr(expr, functions):
+    # Returns (referenced paths, indexes of references used in delta, code object)
+    refs = []
+
+    def ref(m):
+        path = m.group(1).strip()
+        if path not in refs:
+            refs.append(path)
+        return f"_v{refs.index(path)}"
+
+    try:
+        tree = ast.parse(re.sub(r'\{([^{}]+)\}', ref, expr), mode='eval')
+    except SyntaxError as e:
+        raise Exception(f"Invalid expression '{expr}': {e.msg}")
+
+    deltas = set()
+
+    class Delta(ast.NodeTransformer):
+        def visit_Call(self, node):
+            self.generic_visit(node)
+            if not isinstance(node.func, ast.Name) or node.func.id != 'delta':
+                return node
+            if len(node.args) != 1 or not isinstance(node.args[0], ast.Name) or not node.args[0].id.startswith('_v'):
+                raise Exception(f"Invalid expression '{expr}': delta() accepts only one statistic")
+            i = int(node.args[0].id[2:])
+            deltas.add(i)
+            return ast.copy_location(ast.Name(id=f'_d{i}', ctx=ast.Load()), node)
+
+    tree = ast.fix_missing_locations(Delta().visit(tree))
+
+    allowed = (
+        ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+        ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    )
+    for node in ast.walk(tree):
+        if not isinstance(node, allowed):
+            raise Exception(f"Invalid expression '{expr}': {type(node).__name__} is not supported")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise Exception(f"Invalid expression '{expr}': only numeric constants are supported")
+        if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.func.id not in functions):
+            raise Exception(f"Invalid expression '{expr}': unknown function")
+        if isinstance(node, ast.Name) and node.id not in functions and not re.fullmatch(r'_[vd]\d+', node.id):
+            raise Exception(f"Invalid expression '{expr}': unknown name {node.id} (use {{name}} for statistics)")
+
+    return refs, deltas, compile(tree, f"<derived {expr}>", 'eval')
+
+
+def _ref_getter(node, path):
+    # Function returning raw data of referenced statistic (or of its dictionary item)
+    parts = path.split('/')
+    for i in range(len(parts), 0, -1):
+        try:
+            stat = node.get_stat('/'.join(parts[:i]))
+        except Exception:
+            continue
+        if isinstance(stat, LoggerStats):
+            break
+        keys = parts[i:]
+
+        def getter(stat=stat, keys=keys):
+            data = stat._data
+            for k in keys:
+                data = data[k]
+            return data
+        return getter
+
+    raise Exception(f"Statistic {path} not found in {node.name}")
+
+
+def _derived_order(node):
+    # Derived statistics of the node sorted by their dependencies
+    derived = {s.name: s for s in node.stats if isinstance(s, Derived)}
+    deps = {n: {r.split('/')[0] for r in s.refs} & (derived.keys() - {n}) for n, s in derived.items()}
+
+    res = []
+    while len(deps) > 0:
+        ready = [n for n, d in deps.items() if len(d) == 0]
+        if len(ready) == 0:
+            raise Exception(f"Derived statistics {list(deps)} in {node.name} have cyclic dependencies")
+        for n in ready:
+            res.append(derived[n])
+            del deps[n]
+        for d in deps.values():
+            d.difference_update(ready)
+    return res
+
+
+def _last_samples(data):
+    # Two latest numeric samples of statistic history
+    # (numpy scalars of streaming history are converted to python ones, so division by zero raises)
+    if data is None:
+        return None
+    if np.isscalar(data):
+        return [_python_scalar(data)]
+    if isinstance(data, RingBuffer):
+        data = data.values()
+    if len(data) == 0:
+        return None
+    return [_python_scalar(v) for v in data[-2:]]
+
+
+def _python_scalar(v):
+    return v.item() if isinstance(v, np.generic) else v
 
 
 class Custom(DefaultStat):
@@ -878,10 +1988,23 @@ class Custom(DefaultStat):
             kwargs['format'] = FormatDefault(only_last=True)
         super().__init__(*args, **kwargs)
         self._data = [data]
+        self._depth = None
+
+    def set_streaming(self, depth : int, *args, **kwargs):
+        # Custom data are not necessarily numeric, only the history length is limited
+        self._depth = depth
+        self._data = self._data[-depth:]
+
+    def set_data(self, data):
+        self._data = data
+        if self._depth is not None and isinstance(data, list):
+            self._data = data[-self._depth:]
 
     def load(self, data=None):
         if data is not None:
             self._data.append(data)
+            if self._depth is not None and len(self._data) > self._depth:
+                del self._data[0]
 
 
 class CustomJSON(Custom):
@@ -915,5 +2038,4 @@ class CustomJSON(Custom):
 
     def load(self, data=None):
         if data is not None:
-            data = json.loads(data)
-            self._data.append(data)
+            super().load(json.loads(data))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Concurrent loading of LoggerStats trees spanning multiple data_loggers
+
+import time as tm
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from logger_stats.logger_stats import LoggerStats, Custom, FormatDefault
+
+
+class LoggerPoller:
+    """
+    Load `LoggerStats` tree with all data_loggers read concurrently
+
+    - Leaf statistics are grouped by their data_logger (or by device when `group='device'`)
+    - Each group is loaded in its own thread, so the sampling interval is given
+      by the slowest data_logger instead of the sum of all of them
+    - Start and end time of each group is measured and stored in the `Sampling` node:
+        - `skew [s]`        - difference between the first and the last group start
+        - `duration [s]`    - time between the first group start and the last group end
+        - `offsets [s]`     - start of each group relative to the first one
+
+    Example:
+
+        ```
+        stats = LoggerStats('Root')
+        stats.add_stat(logger_a.stats)
+        stats.add_stat(logger_b.stats)
+
+        poller = LoggerPoller(stats)
+        while True:
+            poller.load(time=time.time())
+        ```
+    """
+
+    def __init__(self, stats : LoggerStats, workers : Optional[int] = None, group : str = 'logger'):
+        """
+        Parameters
+        ----------
+            stats : LoggerStats
+                Root of the statistics tree
+            workers : int
+                Number of threads (by default one thread per group)
+            group : str
+                'logger' - each data_logger is read concurrently,
+                'device' - data_loggers on the same device are read sequentially in one thread
+        """
+
+        if group not in ('logger', 'device'):
+            raise Exception(f"Group {group} is not recognized")
+
+        self.stats = stats
+        self.workers = workers
+        self.group = group
+        self._pool = None
+        self._pool_workers = None
+
+        self.sampling = LoggerStats('Sampling')
+        self.sampling.add_stat(Custom(name='skew [s]', format=FormatDefault(decimal=6, only_last=True)))
+        self.sampling.add_stat(Custom(name='duration [s]', format=FormatDefault(decimal=6, only_last=True)))
+        self.sampling.add_stat(Custom(name='offsets [s]'))
+        for s in self.sampling.stats:
+            s.set_data([])
+        stats.add_stat(self.sampling)
+
+    def _group_key(self, logger):
+        if self.group == 'device':
+            return id(getattr(logger, '_dev', logger))
+        return id(logger)
+
+    def groups(self):
+        """
+        Get leaf statistics grouped by their data_logger (statistics without logger are not included)
+        """
+
+        groups = {}
+        for s in self.stats.leaves():
+            if s.logger is None:
+                continue
+            groups.setdefault(self._group_key(s.logger), []).append(s)
+        return list(groups.values())
+
+    @staticmethod
+    def _load_group(stats):
+        start = tm.monotonic()
+        for s in stats:
+            s.load()
+        return start, tm.monotonic()
+
+    def load(self, time : Optional[float] = None):
+        """
+        Load all statistics (same as `LoggerStats.load`)
+
+        Parameters
+        ----------
+            time : float
+                If specified, new statistic with logging time will be added ('Log time')
+        """
+
+        if time is not None:
+            self.stats.time.append(time)
+
+        groups = self.groups()
+        workers = self.workers if self.workers is not None else max(1, len(groups))
+        if self._pool is None or self._pool_workers != workers:
+            self.close()
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+            self._pool_workers = workers
+
+        futures = [self._pool.submit(self._load_group, g) for g in groups]
+        times = [f.result() for f in futures]
+
+        if len(times) > 0:
+            first = min(t[0] for t in times)
+            self.sampling.stats[0].load(max(t[0] for t in times) - first)
+            self.sampling.stats[1].load(max(t[1] for t in times) - first)
+            self.sampling.stats[2].load([t[0] - first for t in times])
+
+        self.stats.calc()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# Tests of columnar on-disk storage for logger_stats data
+
+# python3 -m pytest -xs test_column_store.py (from the sw/ directory of data_logger)
+
+import numpy as np
+import pytest
+
+from logger_stats.column_store import ColumnStore
+from logger_stats.logger_stats import LoggerStats, Counter
+
+
+def append_all(path, samples):
+    store = ColumnStore(path, mode='w')
+    history = []
+    for s in samples:
+        history.append(s)
+        store.append({'Stats': {'flow': history}})
+    return ColumnStore(path)
+
+
+def test_append_int_then_float(tmp_path):
+    # FlowCounter returns int 0 before the first tick, later samples are floats
+    store = append_all(tmp_path / 'capture', [0, 12.75, 3.5])
+
+    data = store.read('Stats/flow')
+    assert data.dtype.kind == 'f'
+    assert data.tolist() == [0, 12.75, 3.5]
+
+
+def test_append_int_keeps_int(tmp_path):
+    big = 2 ** 60 + 1
+    store = append_all(tmp_path / 'capture', [big, big + 1])
+
+    data = store.read('Stats/flow')
+    assert data.dtype.kind == 'i'
+    assert data.tolist() == [big, big + 1]
+
+
+def test_write_replaces_dtype(tmp_path):
+    store = ColumnStore(tmp_path / 'capture', mode='w')
+    store.write({'flow': np.array([1, 2])})
+    store.write({'flow': np.array([0.5, 1.5])})
+
+    assert ColumnStore(tmp_path / 'capture').read('flow').tolist() == [0.5, 1.5]
+
+
+def test_append_new_items(tmp_path):
+    # Several samples loaded between appends, repeated append stores nothing
+    store = ColumnStore(tmp_path / 'capture', mode='w')
+    store.append({'flow': [1, 2]})
+    store.append({'flow': [1, 2, 3, 4, 5]})
+    store.append({'flow': [1, 2, 3, 4, 5]})
+    store.append({'flow': [1, 2, 3, 4, 5, 6]})
+
+    assert ColumnStore(tmp_path / 'capture').read('flow').tolist() == [1, 2, 3, 4, 5, 6]
+
+
+class CounterLogger:
+    config = {'CNTER_WIDTH': 32}
+
+    def __init__(self):
+        self.value = 0
+
+    def load_cnter(self, index):
+        self.value += 1
+        return self.value
+
+
+@pytest.mark.parametrize("bucket", [1, 3])
+def test_save_columns_streaming(tmp_path, bucket):
+    stats = LoggerStats('Stats', logger=CounterLogger())
+    stats.add_stat(Counter(0, 'cnt'))
+    stats.set_streaming(10, bucket, 'max')
+
+    path = tmp_path / 'capture'
+    for loads in (2, 5, 0, 10):
+        for _ in range(loads):
+            stats.load()
+        stats.save_columns(path, append=True)
+
+    cnt = ColumnStore(path).read('cnt').tolist()
+    assert cnt == list(range(bucket, 17 + 1, bucket))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# Tests of logger_stats statistics computed from data_logger counters
+
+# python3 -m pytest -xs test_logger_stats.py (from the sw/ directory of data_logger)
+
+import warnings
+
+import pytest
+
+import logger_stats.logger_stats as Stats
+
+
+class FakeLogger:
+    """
+    Data logger returning predefined counter values, `values[i]` is the list of successive values of counter `i`
+    """
+
+    def __init__(self, values, width=32):
+        self.config = {'CNTER_WIDTH': width}
+        self.values = values
+        self.load = 0
+
+    def load_cnter(self, index):
+        return self.values[index][self.load]
+
+
+def load_all(stats, logger):
+    for i in range(len(logger.values[0])):
+        logger.load = i
+        stats.load()
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_ratio_of_zero_counters(streaming):
+    logger = FakeLogger([[0, 0, 0], [0, 0, 0]])
+    stats = Stats.LoggerStats('Perf', logger=logger)
+    stats.add_stat(Stats.Counter(0, 'stall cnt', wrap=True))
+    stats.add_stat(Stats.Counter(1, 'beat cnt', wrap=True))
+    stats.add_stat(Stats.Ratio('stall cnt', 'beat cnt', 'stalls'))
+    stats.add_stat(Stats.Ratio('stall cnt', 'beat cnt', 'stalls (absolute)', interval=False))
+    if streaming:
+        stats.set_streaming(8)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        load_all(stats, logger)
+
+    data = stats.data()
+    assert list(data['stalls']) == [0.0, 0.0, 0.0]
+    assert list(data['stalls (absolute)']) == [0.0, 0.0, 0.0]
+
+
+def test_reset_before_load():
+    # Counters are reset by data_logger after the second load
+    logger = FakeLogger([[1000, 1500, 10], [100, 200, 50]], width=32)
+    stats = Stats.LoggerStats('Perf', logger=logger)
+    stats.add_stat(Stats.Counter(0, 'words', wrap=True))
+    stats.add_stat(Stats.FlowCounter(0, 1, freq=1.0, word_bits=1, name='flow'))
+
+    for i in range(3):
+        logger.load = i
+        if i == 2:
+            stats.reset(logger)
+        stats.load()
+
+    assert list(stats['words']) == [1000, 1500, 10]
+    assert stats.get_stat('flow').aggregate()['flow'] == pytest.approx(10 / 50 / 1e9)
+
+
+def test_reset_other_logger():
+    logger = FakeLogger([[1000, 10]], width=32)
+    stats = Stats.LoggerStats('Perf', logger=logger)
+    stats.add_stat(Stats.Counter(0, 'words', wrap=True))
+
+    logger.load = 0
+    stats.load()
+    stats.reset(FakeLogger([[0]]))
+    logger.load = 1
+    stats.load()
+
+    assert list(stats['words']) == [1000, 10 + 2 ** 32]
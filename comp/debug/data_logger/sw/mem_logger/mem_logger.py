@@ -5,7 +5,6 @@
 # Package for loading statistics from mem_logger component
 
 import argparse
-import numpy as np
 import nfb
 from data_logger.data_logger import DataLogger
 import logger_stats.logger_stats as Stats
@@ -23,6 +22,10 @@ class MemLogger(DataLogger):
 
         self.stats = self.init_stats()
 
+    def rst(self):
+        super().rst()
+        self.stats.reset(self)
+
     def set_config(self, latency_to_first):
         self.set_ctrlo(latency_to_first & 1)
 
@@ -93,6 +96,10 @@ class MemLogger(DataLogger):
             index_words=counter_i('rd resp words'), index_ticks=counter_i('rd ticks'),
             freq=freq, word_bits=word_b, name='rd flow'
         ))
+        stats_flow.add_stat(Stats.Derived(
+            '{wr flow} + {rd flow}', name='total flow',
+            format=Stats.FormatDefault(units='Gb/s', decimal=3)
+        ))
 
         # Values #
 
@@ -152,15 +159,8 @@ class MemLogger(DataLogger):
         latency_to_first = (ctrlo >> BIT_LATENCY_TO_FIRST) & 1
         stats.add_stat(Stats.Custom(name='latency to first word', data=latency_to_first))
 
-        stats.add_calc_stats(self.calc_stats)
-
         return stats
 
-    def calc_stats(self, data):
-        data['Data flow']['total flow'] = np.array(data['Data flow']['wr flow']) + np.array(data['Data flow']['rd flow'])
-
-        return data
-
 
 def parseParams():
     parser = argparse.ArgumentParser(
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Regression comparison of saved mem_tester / hbm_tester results
+
+import os
+import re
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+from results import ResultTable, select_step
+
+
+# Metric column pattern -> better direction (1 = higher is better, -1 = lower is better)
+Metrics = [
+    (r'flow|speed',         1),
+    (r'latency',            -1),
+    (r'err',                -1),
+]
+
+# Metrics where any increase is a regression (no threshold)
+Strict = r'err'
+
+Key = ['channel', 'test']
+
+
+def load_results(file : str) -> pd.DataFrame:
+    """
+    Load saved results as table with one row per (channel, test, parameter value)
+
+    Supported files:
+
+    - `ResultTable` (`*.csv`, `*.parquet`) - `report_gen.py`, `matrix.py`, `hbm_tester.py -o`
+    - `ReportGen.data` (`data.npz`)
+    - `LoggerStats.save` (`*.npz`) - each loaded sample is one row (test is the root name, step is the sample index)
+    """
+
+    ext = os.path.splitext(file)[1]
+    if ext in ResultTable.Formats:
+        df = ResultTable.load(file)
+    elif ext == '.npz':
+        data = np.load(file, allow_pickle=True)['arr_0'].item()
+        if 'info' in data:
+            df = ResultTable.from_report(data).to_frame()
+        else:
+            df = _stats_table(data).to_frame()
+    else:
+        raise Exception(f"Result file {file} is not supported")
+
+    # Number of failed tests is compared as any other metric
+    if 'errs' in df:
+        df['errors'] = (df['errs'].fillna('').astype(str) != '').astype(int)
+    return df
+
+
+def _stats_table(data):
+    steps = _history_len(data)
+    table = ResultTable()
+    for step in range(steps):
+        table.add(0, 'stats', step, stats=select_step(data, step))
+    return table
+
+
+def _history_len(data):
+    if isinstance(data, dict):
+        return max([_history_len(v) for k, v in data.items() if k not in ('hist', 'hist_x')] + [0])
+    if isinstance(data, (list, tuple, np.ndarray)):
+        return len(data)
+    return 0
+
+
+def metric_direction(column : str):
+    for pattern, direction in Metrics:
+        if re.search(pattern, column):
+            return direction
+    return None
+
+
+class Comparison:
+    """
+    Compare metrics of candidate results against baseline results
+
+    Results are aligned by channel, test and all configuration columns (`config.*`, `step` for LoggerStats).
+    Multiple files of one side are treated as repeated runs (their mean is compared
+    and their spread is added to the standard error).
+
+    Change of a metric in one test (over all aligned points, for example all burst sizes) is significant when:
+
+    - mean relative change is larger than `threshold` and
+    - it is larger than `sigma` times its standard error (paired differences over points),
+      so consistent change over the whole sweep is reported while single noisy points are not
+    - strict metrics (errors) are regressions after any increase
+
+    Example:
+
+        ```
+        cmp = Comparison([load_results('old.csv')], [load_results('new.csv')])
+        print(cmp.to_str())
+        sys.exit(1 if len(cmp.regressions()) > 0 else 0)
+        ```
+    """
+
+    def __init__(self, baseline, candidate, threshold : float = 0.05, sigma : float = 3.0, metrics=None):
+        """
+        Parameters
+        ----------
+            baseline, candidate : List[pandas.DataFrame]
+                Runs of both result sets (see `load_results`)
+            threshold : float
+                Minimal relative change [-]
+            sigma : float
+                Minimal change in multiples of its standard error
+            metrics : List[str]
+                Compared columns (all throughput, latency and error columns by default)
+        """
+
+        self.threshold = threshold
+        self.sigma = sigma
+
+        a = self._merge_runs(baseline)
+        b = self._merge_runs(candidate)
+
+        if metrics is None:
+            metrics = [c for c in a.columns if c in b.columns and c not in Key and not c.endswith('.std')]
+            metrics = [c for c in metrics if not c.startswith('config.') and metric_direction(c) is not None]
+            metrics = [c for c in metrics if pd.api.types.is_numeric_dtype(a[c]) and pd.api.types.is_numeric_dtype(b[c])]
+        self.metrics = metrics
+
+        keys = Key + sorted(c for c in a.columns if c in b.columns and (c.startswith('config.') or c == 'step'))
+        if 'step' in keys and any(c.startswith('config.') for c in keys):
+            # Sweeps are aligned by their parameters, not by order
+            keys.remove('step')
+        self.keys = keys
+
+        self.points = a.merge(b, on=keys, suffixes=('.a', '.b'))
+        self.summary = self._summary()
+
+    @staticmethod
+    def _merge_runs(runs):
+        # Mean and standard error of the mean over runs for each point
+        df = pd.concat([r.assign(run=i) for i, r in enumerate(runs)], ignore_index=True)
+        keys = [c for c in df.columns if c in Key or c.startswith('config.') or c == 'step']
+        for k in keys:
+            df[k] = df[k].astype(str)
+        numeric = [c for c in df.columns if c not in keys and pd.api.types.is_numeric_dtype(df[c]) and c != 'run']
+        group = df.groupby(keys)[numeric]
+        res = pd.concat([group.mean(), (group.std() / np.sqrt(group.count())).add_suffix('.std')], axis=1)
+        return res.reset_index()
+
+    def _summary(self):
+        rows = []
+        for (test, channel), g in self.points.groupby(['test', 'channel']):
+            for m in self.metrics:
+                a = g[f'{m}.a'].to_numpy(dtype=float)
+                b = g[f'{m}.b'].to_numpy(dtype=float)
+                noise = np.hypot(g[f'{m}.std.a'].fillna(0).to_numpy(), g[f'{m}.std.b'].fillna(0).to_numpy())
+                valid = np.isfinite(a) & np.isfinite(b)
+                a, b, noise = a[valid], b[valid], noise[valid]
+                if len(a) == 0:
+                    continue
+                rows.append({'test': test, 'channel': channel, 'metric': m, **self._compare(m, a, b, noise)})
+        return pd.DataFrame(rows)
+
+    def _compare(self, metric, a, b, noise):
+        direction = metric_direction(metric)
+        # Relative change of each point (positive = better)
+        scale = np.where(np.abs(a) > 0, np.abs(a), 1)
+        rel = direction * (b - a) / scale
+        change = rel.mean()
+
+        # Spread over points and spread of repeated runs
+        n = len(rel)
+        var = rel.var(ddof=1) / n if n > 1 else 0.0
+        var += np.sum((noise / scale) ** 2) / n ** 2
+        stderr = np.sqrt(var)
+
+        if re.search(Strict, metric):
+            significant = b.sum() != a.sum()
+            change = direction * (b.sum() - a.sum())
+        else:
+            significant = abs(change) > self.threshold and abs(change) > self.sigma * stderr
+
+        if not significant:
+            verdict = 'ok'
+        elif change < 0:
+            verdict = 'REGRESSION'
+        else:
+            verdict = 'improved'
+
+        return {
+            'points':   len(a),
+            'baseline': a.mean(),
+            'candidate': b.mean(),
+            'change':   change,
+            'stderr':   stderr,
+            'verdict':  verdict,
+        }
+
+    def regressions(self):
+        if len(self.summary) == 0:
+            return self.summary
+        return self.summary[self.summary['verdict'] == 'REGRESSION']
+
+    def to_str(self, all : bool = False) -> str:
+        if len(self.summary) == 0:
+            return "No comparable results found\n"
+
+        df = self.summary if all else self.summary[self.summary['verdict'] != 'ok']
+        res = f"Compared {len(self.points)} points, {len(self.summary)} metrics: "
+        res += f"{(self.summary['verdict'] == 'REGRESSION').sum()} regressions, "
+        res += f"{(self.summary['verdict'] == 'improved').sum()} improvements\n"
+        if len(df) == 0:
+            return res
+
+        lines = [f"{'test':<24} {'ch':>3} {'metric':<36} {'baseline':>12} {'candidate':>12} {'change':>9}  verdict"]
+        for _, r in df.iterrows():
+            strict = re.search(Strict, r['metric'])
+            change = f"{r['change']:+.0f}" if strict else f"{r['change'] * 100:+.1f}%"
+            metric = r['metric'].removeprefix('stats.').removeprefix('status.')
+            lines.append(
+                f"{str(r['test'])[:24]:<24} {str(r['channel']):>3} {metric[:36]:<36} "
+                f"{r['baseline']:>12.3f} {r['candidate']:>12.3f} {change:>9}  {r['verdict']}"
+            )
+        return res + '\n'.join(lines) + '\n'
+
+
+def parseParams():
+    parser = argparse.ArgumentParser(
+        description="""Compare saved mem_tester / hbm_tester results and report regressions
+        (exit code: 0 - no regression, 1 - regression found, 2 - results could not be compared)""",
+    )
+    parser.add_argument(
+        'candidate', nargs='+',
+        help="""Candidate result files (multiple files are repeated runs)"""
+    )
+    parser.add_argument(
+        '-b', '--baseline', action='append', required=True,
+        help="""Baseline result file (can be used multiple times for repeated runs)"""
+    )
+    parser.add_argument(
+        '-t', '--threshold', type=float, default=5.0,
+        help="""Minimal relative change [%%]"""
+    )
+    parser.add_argument(
+        '-s', '--sigma', type=float, default=3.0,
+        help="""Minimal change in multiples of its standard error"""
+    )
+    parser.add_argument(
+        '-m', '--metric', action='append', default=None,
+        help="""Compared column (can be used multiple times, all throughput, latency and error columns by default)"""
+    )
+    parser.add_argument(
+        '-a', '--all', action='store_true',
+        help="""Print all compared metrics (only significant changes by default)"""
+    )
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == '__main__':
+    args = parseParams()
+
+    try:
+        baseline = [load_results(f) for f in args.baseline]
+        candidate = [load_results(f) for f in args.candidate]
+        cmp = Comparison(baseline, candidate, threshold=args.threshold / 100, sigma=args.sigma, metrics=args.metric)
+    except Exception as e:
+        print(f"Results could not be compared: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    print(cmp.to_str(all=args.all), end='')
+    if len(cmp.summary) == 0:
+        sys.exit(2)
+    sys.exit(1 if len(cmp.regressions()) > 0 else 0)
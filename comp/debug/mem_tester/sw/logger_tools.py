@@ -19,33 +19,45 @@ class LoggerTools:
                 yield from self.nested_dict_keys(value, new_keys)
 
     def parse_dict_list(self, d_list):
-        # Get all keys
+        """
+        Merge list of nested dictionaries into single dictionary with lists of values
+
+        Missing values are replaced by 0.
+        Each dictionary is flattened only once, so the cost is linear in the total number of values.
+        """
+
+        flat = [self.flatten_dict(i) for i in d_list]
+
+        # Leaf key paths in order of appearance
+        # (key that is a dictionary in some item is not a leaf)
+        paths = {}
+        for f in flat:
+            paths.update(dict.fromkeys(f))
+        prefixes = {p[:i] for p in paths for i in range(1, len(p))}
+
         res = {}
-        for i in d_list:
-            for keys in self.nested_dict_keys(i):
-                handle = res
-                for k in keys[:-1]:
-                    if k not in handle or isinstance(handle[k], list):
-                        handle[k] = {}
-                    handle = handle[k]
-
-                if keys[-1] not in handle:
-                    handle[keys[-1]] = []
-
-        for i in d_list:
-            for keys in self.nested_dict_keys(res):
-                orig   = i
-                handle = res
-                for k in keys:
-                    handle  = handle[k]
-                    if k not in orig:
-                        orig = 0    # Default value
-                        break
-                    orig    = orig[k]
-
-                if isinstance(handle, list):
-                    handle.append(orig)
+        for p in paths:
+            if p in prefixes:
+                continue
+            handle = res
+            for k in p[:-1]:
+                handle = handle.setdefault(k, {})
+            handle[p[-1]] = [f.get(p, 0) for f in flat]
+
+        return res
+
+    def flatten_dict(self, d, prefix=()):
+        """
+        Convert nested dictionary to dictionary with key paths (tuples)
+        """
 
+        res = {}
+        for key, value in d.items():
+            path = (*prefix, key)
+            if isinstance(value, dict):
+                res.update(self.flatten_dict(value, path))
+            else:
+                res[path] = value
         return res
 
     def dict_to_numpy(self, d):
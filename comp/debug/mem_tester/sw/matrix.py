@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Matrix benchmark of mem_tester access patterns
+
+import ast
+import argparse
+import numpy as np
+
+import nfb
+from sweep import SweepScheduler
+from results import ResultTable, select_step
+
+
+class MatrixBenchmark:
+    """
+    Run tests for the cartesian product of `MemTester.config_test` parameters
+
+    Dimensions are swept in the given order (the last dimension is the innermost one).
+    A dimension saturates when the best data flow of the remaining sub-matrix
+    did not improve by more than `saturation` (relative) for `patience` consecutive values
+    on all mem_testers. Remaining values of a saturated dimension are not tested
+    (values should be ordered so that the data flow is expected to grow, for example burst counts).
+
+    All mem_testers are tested at the same time (see `SweepScheduler.run_step`).
+
+    Example:
+
+        ```
+        bench = MatrixBenchmark(scheduler, {
+            'rand_addr':        [False, True],
+            'addr_lim_scale':   [0.05, 0.25],
+            'burst_cnt':        [1, 2, 4, 8, 16, 32],
+        })
+        table = bench.run()
+        bench.heatmap(graph_gen, table, 0, 'burst_cnt', 'addr_lim_scale', 'stats.Data flow.rd flow')
+        ```
+    """
+
+    Metric = ('Data flow', 'total flow')
+    Heatmaps = {
+        'stats.Data flow.rd flow':          ('read flow [Gbps]', 'max'),
+        'stats.Data flow.wr flow':          ('write flow [Gbps]', 'max'),
+        'stats.Values.latency.avg':         ('avg read latency [ns]', 'min'),
+        'stats.Values.latency.p99':         ('p99 read latency [ns]', 'min'),
+    }
+
+    def __init__(
+            self,
+            scheduler : SweepScheduler,
+            dims : dict,
+            params : dict = None,
+            saturation : float = 0.02,
+            patience : int = 2,
+            meta : dict = None
+    ):
+        """
+        Parameters
+        ----------
+            scheduler : SweepScheduler
+                Scheduler with tested mem_testers
+            dims : dict
+                Parameter name -> list of tested values
+            params : dict
+                Common parameters of `MemTester.config_test`
+            saturation : float
+                Minimal relative improvement of data flow (pruning is disabled if None)
+            patience : int
+                Number of values without improvement before the dimension is saturated
+            meta : dict
+                Common information stored into the results (see `ResultTable`)
+        """
+
+        self.scheduler = scheduler
+        self.dims = dict(dims)
+        self.params = params if params is not None else {}
+        self.saturation = saturation
+        self.patience = patience
+        self.meta = meta
+
+        self.testers = None
+        self.table = None
+        self.steps = {}
+        self.pruned = []
+
+    def size(self):
+        return int(np.prod([len(v) for v in self.dims.values()]))
+
+    def run(self) -> ResultTable:
+        """
+        Run the benchmark
+
+        Returns
+        -------
+            ResultTable
+                One row per mem_tester and tested point (`test` is 'matrix', pruned points are not included)
+        """
+
+        self.testers = {i: self.scheduler.open_tester(i) for i in self.scheduler.indexes}
+        self.table = ResultTable(self.meta)
+        self.steps = {i: 0 for i in self.testers}
+        self.pruned = []
+
+        self._sweep(list(self.dims.keys()), {})
+        return self.table
+
+    def _sweep(self, names, point):
+        # Returns best metric of each tester in the sub-matrix
+        if len(names) == 0:
+            return self._run_point(point)
+
+        name = names[0]
+        values = self.dims[name]
+        best = {}
+        stale = 0
+
+        for k, v in enumerate(values):
+            res = self._sweep(names[1:], {**point, name: v})
+
+            improved = False
+            for i, m in res.items():
+                if i not in best or m > best[i] * (1 + (self.saturation or 0)):
+                    improved = True
+                best[i] = max(best.get(i, m), m)
+
+            stale = 0 if improved else stale + 1
+            if self.saturation is not None and stale >= self.patience and k + 1 < len(values):
+                self.pruned.append(({**point}, name, values[k + 1:]))
+                break
+
+        return best
+
+    def _run_point(self, point):
+        configs = {i: {**self.params, **point} for i in self.testers}
+        res = {}
+        for i, (_config, status, stats, errs) in self.scheduler.run_step(self.testers, configs).items():
+            step = self.steps[i]
+            self.steps[i] += 1
+            self.table.add(
+                i, 'matrix', step,
+                config=configs[i],
+                status=status,
+                stats=select_step(stats, step),
+                errs=errs,
+            )
+
+            metric = stats
+            for k in self.Metric:
+                metric = metric[k]
+            res[i] = float(metric[step]) if len(errs) == 0 else 0.0
+        return res
+
+    def pruned_to_str(self):
+        res = ""
+        for point, name, values in self.pruned:
+            where = ", ".join(f"{k}={v}" for k, v in point.items())
+            res += f"{name} saturated{' at ' + where if where != '' else ''}, skipped {values}\n"
+        return res
+
+    @staticmethod
+    def best(table : ResultTable, column : str = 'stats.Data flow.total flow', reduce : str = 'max'):
+        """
+        Get the best tested point of each mem_tester
+
+        Returns
+        -------
+            pandas.DataFrame
+                One row per mem_tester
+        """
+
+        df = table.to_frame()
+        df = df[df['errs'].fillna('') == '']
+        idx = df.groupby('channel')[column].agg('idxmax' if reduce == 'max' else 'idxmin')
+        return df.loc[idx]
+
+    def heatmap(self, graph_gen, table : ResultTable, channel : int, x : str, y : str, column : str, file : str = None):
+        """
+        Plot heatmap of given result column over two dimensions
+
+        Remaining dimensions are reduced to the best value (see `Heatmaps`),
+        pruned points are left empty.
+
+        Parameters
+        ----------
+            graph_gen : GraphGen
+                Graph generator
+            table : ResultTable
+                Results of `run`
+            channel : int
+                mem_tester index
+            x, y : str
+                Dimensions on the axes
+            column : str
+                Result column (for example `stats.Data flow.rd flow`)
+            file : str
+                Output file name (without extension)
+        """
+
+        label, reduce = self.Heatmaps.get(column, (column, 'max'))
+        df = table.to_frame()
+        df = df[df['channel'] == channel]
+        grid = df.pivot_table(index=f'config.{y}', columns=f'config.{x}', values=column, aggfunc=reduce)
+        grid = grid.reindex(index=self.dims[y], columns=self.dims[x])
+
+        graph_gen.init_plots(title=f"{label} (mem_tester {channel})")
+        graph_gen.plot_2d(grid.to_numpy(dtype=float), cmap='viridis')
+        ax = graph_gen.axis()
+        ax.set_xticks(range(len(grid.columns)), [str(v) for v in grid.columns])
+        ax.set_yticks(range(len(grid.index)), [str(v) for v in grid.index])
+        graph_gen.set_xlabel(x)
+        graph_gen.set_ylabel(y)
+        if file is not None:
+            graph_gen.plot_save(file)
+
+
+def parse_dim(txt):
+    """
+    Parse dimension in format `name=v1,v2,...` (values are Python literals)
+    """
+
+    name, values = txt.split('=', 1)
+    values = ast.literal_eval(f"[{values}]")
+    return name.strip(), values
+
+
+def parseParams():
+    parser = argparse.ArgumentParser(description="""Matrix benchmark of mem_tester access patterns""")
+    parser.add_argument(
+        '-d', '--device', default=nfb.default_dev_path,
+        metavar='device', help="""device with target FPGA card."""
+    )
+    parser.add_argument(
+        '--logger-offset', type=int, default=0,
+        help="""Offset for mem_logger compatible (if there is more loggers then testers)"""
+    )
+    parser.add_argument(
+        '-i', '--index', type=int, default=None,
+        help="""Test only one mem_tester (all mem_testers are tested by default)"""
+    )
+    parser.add_argument(
+        '--dim', action='append', type=parse_dim, default=[],
+        help="""Tested dimension `name=v1,v2,...` (replaces default values of the dimension, for example `burst_cnt=1,2,4`)"""
+    )
+    parser.add_argument(
+        '--bursts', type=int, default=12,
+        help="""Number of tested burst counts (if burst_cnt dimension is not specified)"""
+    )
+    parser.add_argument(
+        '--saturation', type=float, default=0.02,
+        help="""Minimal relative improvement of data flow before dimension is saturated"""
+    )
+    parser.add_argument(
+        '--patience', type=int, default=2,
+        help="""Number of values without improvement before dimension is saturated"""
+    )
+    parser.add_argument(
+        '--no-prune', action='store_true',
+        help="""Test all points of the matrix"""
+    )
+    parser.add_argument(
+        '-x', default='burst_cnt',
+        help="""Heatmap x axis dimension"""
+    )
+    parser.add_argument(
+        '-y', default='addr_lim_scale',
+        help="""Heatmap y axis dimension"""
+    )
+    parser.add_argument(
+        '-o', '--output', default='mem_tester_matrix',
+        help="""Output file name of results (without extension)"""
+    )
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == '__main__':
+    from report_gen import ReportGen, run_cmd
+    from graph_gen import GraphGen
+
+    args        = parseParams()
+    img_path    = 'fig/'
+
+    graph_gen   = GraphGen(folder=img_path, ratio=(13, 6), output=[".png"])
+    gen         = ReportGen(graph_gen, dev=args.device, logger_offset=args.logger_offset)
+    indexes     = [args.index] if args.index is not None else list(range(0, gen.tester_cnt))
+
+    # Refresh period (default and doubled) and boolean knobs first,
+    # burst count is the innermost dimension (usually saturates)
+    refresh = gen.open_tester(indexes[0]).load_status()['def_refr_period_ticks']
+    dims = {
+        'refresh_period':       [refresh, refresh * 2],
+        'rand_addr':            [False, True],
+        'only_one_simult_read': [False, True],
+        'auto_precharge':       [False, True],
+        'addr_lim_scale':       [0.01, 0.05, 0.25],
+        'burst_cnt':            sorted(set(gen.get_burst_seq(0, args.bursts, burst_scale=0.25))),
+    }
+    for name, values in args.dim:
+        dims[name] = values
+
+    scheduler = SweepScheduler(gen.open_tester, indexes)
+    bench = MatrixBenchmark(
+        scheduler, dims,
+        saturation=None if args.no_prune else args.saturation,
+        patience=args.patience,
+        meta={
+            'dev':      args.device,
+            'card':     run_cmd(f'nfb-info -q card    -d {args.device}'),
+            'project':  run_cmd(f'nfb-info -q project -d {args.device}'),
+            'build':    run_cmd(f'nfb-info -q build   -d {args.device}'),
+        },
+    )
+
+    print(f"Testing up to {bench.size()} points on {len(indexes)} mem_testers")
+    table = bench.run()
+    print(bench.pruned_to_str(), end='')
+    table.save(f'{args.output}.csv')
+
+    for index in indexes:
+        for column in MatrixBenchmark.Heatmaps:
+            name = column.split('.')[-2:]
+            bench.heatmap(graph_gen, table, index, args.x, args.y, column, file=f"matrix_{index}_{'_'.join(name).replace(' ', '_')}")
+
+    best = MatrixBenchmark.best(table)
+    columns = ['channel'] + [f'config.{d}' for d in dims] + list(MatrixBenchmark.Heatmaps)
+    print("Best access pattern (maximal total data flow):")
+    print(best[columns].to_string(index=False))
@@ -3,12 +3,13 @@
 # Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
 
 import nfb
-import time
 import sys
 import math
 import argparse
 
 from mem_logger.mem_logger import MemLogger
+from data_logger import bits
+from data_logger.wait import wait_bit, test_deadline
 
 
 class MemTester(nfb.BaseComp):
@@ -55,11 +56,16 @@ class MemTester(nfb.BaseComp):
     _BIT_BUFF_VLD            = 2
     _BIT_AMM_READY           = 3
 
+    # Minimal test deadline [s] and multiple of the expected test duration that is still valid
+    TestTimeout              = 60
+    TestTimeoutMargin        = 20
+
     def __init__(self, mem_logger, **kwargs):
         super().__init__(**kwargs)
 
         self.mem_logger = mem_logger
         self.last_test_config = None
+        self.last_test_time = None
 
     @staticmethod
     def compatible_cnt(dev=nfb.libnfb.Nfb.default_dev_path, comp=None):
@@ -71,17 +77,8 @@ class MemTester(nfb.BaseComp):
         self._comp.set_bit(addr, bit)
         self._comp.clr_bit(addr, bit)
 
-    def mi_wait_bit(self, addr, bit, timeout=5, delay=0.01):
-        t = 0
-        while t < timeout:
-            data = self._comp.read32(addr)
-            if (data >> bit) & 1:
-                return True
-            else:
-                t += delay
-                time.sleep(delay)
-
-        return False
+    def mi_wait_bit(self, addr, bit, timeout=5, delay=1e-4):
+        return wait_bit(self._comp, addr, bit, timeout=timeout, delay=delay)
 
     def load_status(self):
         status = {}
@@ -143,15 +140,37 @@ class MemTester(nfb.BaseComp):
         if emif:
             self.mi_toggle(self._REG_CTRL_IN, self._BIT_RESET_EMIF)
 
-        if not self._comp.wait_for_bit(self._REG_CTRL_OUT, self._BIT_MAIN_AMM_READY):
+        if not self.mi_wait_bit(self._REG_CTRL_OUT, self._BIT_MAIN_AMM_READY):
             print("Reset failed (MEM_READY was not set)", file=sys.stderr)
             return False
         return True
 
-    def execute_test(self):
+    def start_test(self):
         self.mi_toggle(self._REG_CTRL_IN, self._BIT_RUN_TEST)
-        if not self._comp.wait_for_bit(self._REG_CTRL_OUT, self._BIT_TEST_DONE, timeout=60):
+
+    def test_done(self):
+        return ((self._comp.read32(self._REG_CTRL_OUT) >> self._BIT_TEST_DONE) & 1) == 1
+
+    def test_timeout(self):
+        """
+        Deadline of the configured test [s]
+
+        Test writes and reads the whole tested address range, each word takes at least one clock cycle.
+        """
+
+        if self.last_test_config is None:
+            return self.TestTimeout
+        cycles = 2 * self._comp.read32(self._REG_ADDR_LIM)
+        freq = self.mem_logger.stats['Constants']["MEM_FREQ_KHZ"] * 1000.0
+        return test_deadline(cycles, freq, margin=self.TestTimeoutMargin, minimum=self.TestTimeout)
+
+    def execute_test(self):
+        self.start_test()
+        res = self.mi_wait_bit(self._REG_CTRL_OUT, self._BIT_TEST_DONE, timeout=self.test_timeout())
+        self.last_test_time = res.elapsed
+        if not res:
             print("Test timeout (TEST_DONE was not set)", file=sys.stderr)
+        return res
 
     def config_test(
         self,
@@ -219,6 +238,7 @@ class MemTester(nfb.BaseComp):
     def get_test_result(self):
         config = self.last_test_config
         status = self.load_status()
+        status["test_time"] = self.last_test_time
         self.mem_logger.stats.load()
         stats = self.mem_logger.stats.data()
         errs = self.check_test_result(config, status, stats)
@@ -240,37 +260,55 @@ class MemTester(nfb.BaseComp):
         res += self.mem_logger.stats.to_str()
         return res
 
+    def _amm_gen_slices(self):
+        mi_width  = self.mem_logger.mi_width
+        slices    = math.ceil(self.mem_logger.stats['Constants']["MEM_DATA_WIDTH"] / mi_width)
+        return mi_width, slices
+
     def amm_gen_set_buff(self, burst, data):
+        self.amm_gen_set_buffs([data], start=burst)
+
+    def amm_gen_set_buffs(self, data, start=0):
+        """
+        Set multiple consecutive bursts of amm_gen buffer
+
+        All words are split into MI slices in a single pass.
+
+        Parameters
+        ----------
+            data : List[int]
+                Memory words
+            start : int
+                Burst index of the first word
+        """
+
         prev_addr = self._comp.read32(self._REG_AMM_GEN_ADDR)
-        mi_width  = self.mem_logger.stats['Constants']["MI_DATA_WIDTH"]
-        slices    = math.ceil(self.mem_logger.stats['Constants']["MEM_DATA_WIDTH"] / mi_width)
+        mi_width, slices = self._amm_gen_slices()
 
-        for s in range(0, slices):
-            slice = self.mem_logger.get_bits(data, mi_width, mi_width * s)
-            self._comp.write32(self._REG_AMM_GEN_ADDR, burst)
-            self._comp.write32(self._REG_AMM_GEN_SLICE, s)
-            self._comp.write32(self._REG_AMM_GEN_DATA, slice)
+        for b, word in enumerate(bits.split_array(data, mi_width, slices).tolist()):
+            self._comp.write32(self._REG_AMM_GEN_ADDR, start + b)
+            for s, slice in enumerate(word):
+                self._comp.write32(self._REG_AMM_GEN_SLICE, s)
+                self._comp.write32(self._REG_AMM_GEN_DATA, slice)
 
         self._comp.write32(self._REG_AMM_GEN_ADDR, prev_addr)
 
     def amm_gen_get_buff(self):
-        mi_width  = self.mem_logger.stats['Constants']["MI_DATA_WIDTH"]
-        slices    = math.ceil(self.mem_logger.stats['Constants']["MEM_DATA_WIDTH"] / mi_width)
+        mi_width, slices = self._amm_gen_slices()
         prev_addr = self._comp.read32(self._REG_AMM_GEN_ADDR)
         burst     = self._comp.read32(self._REG_AMM_GEN_BURST)
 
         data = []
         for b in range(0, burst):
-            val = 0
+            self._comp.write32(self._REG_AMM_GEN_ADDR, b)
+            word = []
             for s in range(0, slices):
-                self._comp.write32(self._REG_AMM_GEN_ADDR, b)
                 self._comp.write32(self._REG_AMM_GEN_SLICE, s)
-                slice = self._comp.read32(self._REG_AMM_GEN_DATA)
-                val += slice << (s * mi_width)
-            data.append(val)
+                word.append(self._comp.read32(self._REG_AMM_GEN_DATA))
+            data.append(word)
 
         self._comp.write32(self._REG_AMM_GEN_ADDR, prev_addr)
-        return data
+        return bits.join_array(data, mi_width)
 
     def amm_gen_set_burst(self, burst):
         self._comp.write32(self._REG_AMM_GEN_BURST, burst)
@@ -7,6 +7,7 @@
 # sudo yum install texlive
 # pandoc mem_tester_report.md -o mem_tester_report.pdf -V geometry:a4paper -V geometry:margin=2cm -f markdown-implicit_figures
 
+import sys
 import subprocess
 import argparse
 import numpy as np
@@ -15,8 +16,7 @@ import nfb
 from mem_tester import MemTester
 from mem_logger.mem_logger import MemLogger
 from logger_tools import LoggerTools
-from graph_gen import GraphGen
-from pdf_gen import PDFGen
+from sweep import SweepScheduler
 
 
 class ReportGen:
@@ -53,8 +53,31 @@ class ReportGen:
         }
 
     def open(self, index):
+        self.mem_tester = self.open_tester(index)
+
+    def open_tester(self, index):
         logger = MemLogger(dev=self.dev, index=(index + self.logger_offset))
-        self.mem_tester = MemTester(logger, dev=self.dev, index=index)
+        return MemTester(logger, dev=self.dev, index=index)
+
+    def test_all(self, key, descript, params, test_param=None, param_values=None, scheduler=None):
+        """
+        Run the same test on all mem_testers at the same time (see `SweepScheduler`)
+        """
+
+        if scheduler is None:
+            scheduler = SweepScheduler(self.open_tester, range(0, self.tester_cnt))
+
+        res = scheduler.sweep(key, params, test_param, param_values)
+        if key not in self.data:
+            self.data[key] = {}
+        for index, r in res.items():
+            self.data[key][index] = {
+                'descript':     descript,
+                'params':       params,
+                'test_param':   test_param,
+                'param_values': param_values,
+                **r,
+            }
 
     def test(self, key, descript, index, params, test_param=None, param_values=None):
         data = {
@@ -154,6 +177,22 @@ def parseParams():
         '--logger-offset', type=int, default=0,
         help="""Offset for mem_logger compatible (if there is more loggers then testers)"""
     )
+    parser.add_argument(
+        '-i', '--index', type=int, default=None,
+        help="""Test only one mem_tester (all mem_testers are tested by default)"""
+    )
+    parser.add_argument(
+        '--serial', action='store_true',
+        help="""Run mem_testers one after another instead of at the same time"""
+    )
+    parser.add_argument(
+        '--checkpoint', default='checkpoint.npz',
+        help="""File with progress of the tests"""
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help="""Resume interrupted tests from the checkpoint"""
+    )
     args = parser.parse_args()
     return args
 
@@ -182,8 +221,14 @@ def latency_table(pdf, bursts, data):
 if __name__ == '__main__':
     args        = parseParams()
 
+    # Plotting and reporting stack is imported only when the report is generated (slow import)
+    from results import ResultTable
+    from graph_gen import GraphGen
+    from pdf_gen import PDFGen
+
     data_file   = 'data.npz'
     report_file = 'mem_tester_report'
+    result_file = 'mem_tester_results'
     img_path    = 'fig/'
 
     tools       = LoggerTools()
@@ -193,30 +238,47 @@ if __name__ == '__main__':
 
     burst_seq   = gen.get_burst_seq(0, 50, burst_scale=0.25, max_burst=args.max_burst)
     test_params = {'burst_cnt': burst_seq[0]}
-    progress    = [0, 12 * gen.tester_cnt, False]
+    indexes     = [args.index] if args.index is not None else list(range(0, gen.tester_cnt))
+    progress    = [0, 5 + 6 * len(indexes) + 2, False]
     addr_scale  = 0.05
 
-    for index in range(0, gen.tester_cnt):
-        ## Run tests ##
-        print_progress(progress, 'full memory test')
-        gen.test('indexing', 'Test different types of indexing', index, test_params, 'rand_addr', [False, True])
+    if not args.resume:
+        SweepScheduler(None, [], checkpoint=args.checkpoint).clear()
+    scheduler   = SweepScheduler(gen.open_tester, indexes, checkpoint=args.checkpoint, parallel=not args.serial)
+
+    ## Run tests (all mem_testers at the same time) ##
+    print_progress(progress, 'full memory test')
+    gen.test_all('indexing', 'Test different types of indexing', test_params, 'rand_addr', [False, True], scheduler)
+
+    print_progress(progress, 'different burst counts')
+    test_params = {'rand_addr': False, 'addr_lim_scale': addr_scale}
+    gen.test_all('seq-burst', 'Test different burst lengths', test_params, 'burst_cnt', burst_seq, scheduler)
+
+    print_progress(progress, 'different burst counts')
+    test_params = {'rand_addr': True, 'addr_lim_scale': addr_scale}
+    gen.test_all('rand-burst', 'Test different burst lengths', test_params, 'burst_cnt', burst_seq, scheduler)
 
-        print_progress(progress, 'different burst counts')
-        test_params = {'rand_addr': False, 'addr_lim_scale': addr_scale}
-        gen.test('seq-burst', 'Test different burst lengths', index, test_params, 'burst_cnt', burst_seq)
+    print_progress(progress, 'different burst counts')
+    test_params = {'rand_addr': False, 'addr_lim_scale': addr_scale, 'only_one_simult_read': True}
+    gen.test_all('seq-burst-one-simult', 'Test different burst lengths', test_params, 'burst_cnt', burst_seq, scheduler)
 
-        print_progress(progress, 'different burst counts')
-        test_params = {'rand_addr': True, 'addr_lim_scale': addr_scale}
-        gen.test('rand-burst', 'Test different burst lengths', index, test_params, 'burst_cnt', burst_seq)
+    print_progress(progress, 'different burst counts')
+    test_params = {'rand_addr': True, 'addr_lim_scale': addr_scale, 'only_one_simult_read': True}
+    gen.test_all('rand-burst-one-simult', 'Test different burst lengths', test_params, 'burst_cnt', burst_seq, scheduler)
 
-        print_progress(progress, 'different burst counts')
-        test_params = {'rand_addr': False, 'addr_lim_scale': addr_scale, 'only_one_simult_read': True}
-        gen.test('seq-burst-one-simult', 'Test different burst lengths', index, test_params, 'burst_cnt', burst_seq)
+    ## Save results table ##
+    card  = run_cmd(f'nfb-info -q card    -d {args.device}')
+    proj  = run_cmd(f'nfb-info -q project -d {args.device}')
+    build = run_cmd(f'nfb-info -q build   -d {args.device}')
 
-        print_progress(progress, 'different burst counts')
-        test_params = {'rand_addr': True, 'addr_lim_scale': addr_scale, 'only_one_simult_read': True}
-        gen.test('rand-burst-one-simult', 'Test different burst lengths', index, test_params, 'burst_cnt', burst_seq)
+    results = ResultTable.from_report(gen.data, meta={'dev': args.device, 'card': card, 'project': proj, 'build': build})
+    results.save(f'{result_file}.csv')
+    try:
+        results.save(f'{result_file}.parquet')
+    except ImportError:
+        print("\nResults are not saved as Parquet (pyarrow or fastparquet is required)", file=sys.stderr)
 
+    for index in indexes:
         ## Get data ##
 
         print_progress(progress, 'processing data')
@@ -231,7 +293,7 @@ if __name__ == '__main__':
 
         ## Plot ##
 
-        mem_width = gen.mem_tester.mem_logger.stats['Constants']["MEM_DATA_WIDTH"] / 8
+        mem_width = gen.logger_config[index]["MEM_DATA_WIDTH"] / 8
         burst_seq_b = [i * mem_width for i in burst_seq]
 
         # Plot data flow
@@ -310,9 +372,6 @@ if __name__ == '__main__':
     )
 
     info  = gen.data['info']
-    card  = run_cmd(f'nfb-info -q card    -d {args.device}')
-    proj  = run_cmd(f'nfb-info -q project -d {args.device}')
-    build = run_cmd(f'nfb-info -q build   -d {args.device}')
 
     pdf.heading(2, "Test conditions")
     header  = ['Parameter', 'Value']
@@ -337,10 +396,10 @@ if __name__ == '__main__':
         ])
     pdf.table(header, data)
 
-    for index in range(0, gen.tester_cnt):
+    for index in indexes:
         pdf.heading(1, f"Test result on interface {index}")
         pdf.text(f"*test was performed on the whole memory address space with burst count {burst_seq[0]} ({burst_seq_b[0]} B)")
-        full_data = gen.data['indexing'][0]
+        full_data = gen.data['indexing'][index]
         if len(full_data['errs'][0]) == 0:
             pdf.heading(2, "Test was SUCCESSFUL!")
         else:
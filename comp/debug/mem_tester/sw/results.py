@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Tabular model of mem_tester test results
+
+import os
+import numpy as np
+
+
+class ResultTable:
+    """
+    Results of mem_tester tests with one row per (channel, test, parameter value)
+
+    Columns:
+
+    - `channel`, `test`, `descript`, `param`, `param_value`, `step` - test identification
+    - `meta.*`      - common information (device, card, project, build, ...)
+    - `config.*`    - test configuration (`MemTester.config_test` parameters)
+    - `status.*`    - mem_tester status after the test (including `test_time`)
+    - `stats.*`     - mem_logger statistics (path joined by `.`, histograms are not included)
+    - `errs`        - error description (empty if the test was successful)
+
+    Table can be stored as CSV or Parquet, so results of different bitstreams
+    or cards can be compared without running the hardware tests again.
+
+    Example:
+
+        ```
+        table = ResultTable.from_report(gen.data, meta={'card': card})
+        table.save('mem_tester_results.csv')
+
+        df = ResultTable.load('mem_tester_results.csv')
+        df.groupby(['channel', 'test'])['stats.Data flow.rd flow'].max()
+        ```
+    """
+
+    Sep = '.'
+    Formats = ('.csv', '.parquet')
+
+    def __init__(self, meta : dict = None):
+        """
+        Parameters
+        ----------
+            meta : dict
+                Information added to all rows (`meta.*` columns)
+        """
+
+        self.meta = meta if meta is not None else {}
+        self.rows = []
+
+    def add(self, channel : int, test : str, step : int, config=None, status=None, stats=None, errs='', **kwargs):
+        """
+        Add single result
+
+        Parameters
+        ----------
+            channel : int
+                mem_tester index
+            test : str
+                Test name
+            step : int
+                Step of the parameter sweep
+            config, status, stats : dict
+                Nested dictionaries with scalar values
+            errs : str
+                Error description
+            kwargs
+                Additional identification columns (`descript`, `param`, `param_value`, ...)
+        """
+
+        row = {'channel': channel, 'test': test, 'step': step, **kwargs}
+        row.update(_flatten(self.meta, 'meta'))
+        row.update(_flatten(config, 'config'))
+        row.update(_flatten(status, 'status'))
+        row.update(_flatten(stats, 'stats'))
+        row['errs'] = errs
+        self.rows.append(row)
+
+    @classmethod
+    def from_report(cls, data : dict, meta : dict = None):
+        """
+        Create table from `ReportGen.data`
+
+        Each test contains history of all steps (one item per parameter value),
+        so the history is split into rows.
+        """
+
+        table = cls(meta if meta is not None else {})
+        for test, channels in data.items():
+            if test == 'info':
+                continue
+            for channel, res in channels.items():
+                values = res['param_values'] if res['test_param'] is not None else [None]
+                for step, value in enumerate(values):
+                    config = dict(res['params'])
+                    if res['test_param'] is not None:
+                        config[res['test_param']] = value
+                    table.add(
+                        channel, test, step,
+                        config=config,
+                        status=select_step(res['status'], step),
+                        stats=select_step(res['stats'], step),
+                        errs=res['errs'][step] if step < len(res['errs']) else '',
+                        descript=res['descript'],
+                        param=res['test_param'],
+                        param_value=value,
+                    )
+        return table
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.rows)
+
+    def save(self, file : str):
+        """
+        Save table as CSV or Parquet (based on file extension, Parquet requires pyarrow or fastparquet)
+        """
+
+        ext = os.path.splitext(file)[1]
+        df = self.to_frame()
+        if ext == '.csv':
+            df.to_csv(file, index=False)
+        elif ext == '.parquet':
+            df.to_parquet(file, index=False)
+        else:
+            raise Exception(f"Result format {ext} is not supported (use one of {self.Formats})")
+
+    @staticmethod
+    def load(file : str):
+        import pandas as pd
+        ext = os.path.splitext(file)[1]
+        if ext == '.csv':
+            return pd.read_csv(file)
+        elif ext == '.parquet':
+            return pd.read_parquet(file)
+        raise Exception(f"Result format {ext} is not supported (use one of {ResultTable.Formats})")
+
+
+def _flatten(d, prefix):
+    res = {}
+    if d is None:
+        return res
+
+    stack = [(prefix, d)]
+    while len(stack) > 0:
+        path, v = stack.pop()
+        if isinstance(v, dict):
+            stack.extend((f"{path}{ResultTable.Sep}{k}", i) for k, i in reversed(list(v.items())))
+        elif v is None or np.isscalar(v):
+            res[path] = v.item() if isinstance(v, np.generic) else v
+    return res
+
+
+def select_step(data, step):
+    """
+    Select item of given step from each history of nested dictionary
+
+    Constants are kept, histograms and non-scalar items are skipped.
+    """
+
+    if isinstance(data, dict):
+        res = {}
+        for k, v in data.items():
+            v = select_step(v, step) if k not in ('hist', 'hist_x') else _SKIP
+            if v is not _SKIP:
+                res[k] = v
+        return res
+    if isinstance(data, (list, tuple, np.ndarray)):
+        if step < len(data) and np.isscalar(data[step]):
+            return data[step]
+        return _SKIP
+    return data
+
+
+_SKIP = object()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Parallel parameter sweeps over multiple mem_tester instances
+
+import os
+import sys
+import time
+import numpy as np
+
+from data_logger.wait import wait_until
+
+from logger_tools import LoggerTools
+
+
+class SweepScheduler:
+    """
+    Run the same parameter sweep on multiple independent mem_testers at the same time
+
+    Each step of the sweep configures all testers, triggers all of them
+    and then polls their TEST_DONE bits together, so the duration of the step
+    is given by the slowest tester instead of the sum of all testers.
+    Completion time of each test is stored in its status (`test_time`).
+
+    Progress is stored into the checkpoint file after each step,
+    so interrupted sweep can be resumed (finished steps are not repeated).
+
+    Example:
+
+        ```
+        sched = SweepScheduler(gen.open_tester, range(gen.tester_cnt), checkpoint='checkpoint.npz')
+        res = sched.sweep('seq-burst', {'rand_addr': False}, 'burst_cnt', [1, 2, 4, 8])
+        ```
+    """
+
+    def __init__(
+            self,
+            open_tester,
+            indexes,
+            checkpoint : str = None,
+            timeout : float = None,
+            delay : float = 0.05,
+            parallel : bool = True,
+            outlier : float = 3.0
+    ):
+        """
+        Parameters
+        ----------
+            open_tester : Callable[[int], MemTester]
+                Open new mem_tester (with a new mem_logger) with given index
+            indexes : List[int]
+                Indexes of tested mem_testers
+            checkpoint : str
+                Checkpoint file (progress is not stored if None)
+            timeout : float
+                Timeout of a single step [s] (by default the longest `MemTester.test_timeout()`)
+            delay : float
+                Maximal delay between polls of TEST_DONE bits [s] (see `wait_until`)
+            parallel : bool
+                Run testers at the same time (else testers are run one after another)
+            outlier : float
+                Report tests that took more than `outlier` times the median duration of the step
+        """
+
+        self.open_tester = open_tester
+        self.indexes = list(indexes)
+        self.checkpoint = checkpoint
+        self.timeout = timeout
+        self.delay = delay
+        self.parallel = parallel
+        self.outlier = outlier
+
+        self.tools = LoggerTools()
+        self.state = self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return {}
+        try:
+            return np.load(self.checkpoint, allow_pickle=True)['arr_0'].item()
+        except Exception as e:
+            print(f"Checkpoint {self.checkpoint} could not be loaded: {e}", file=sys.stderr)
+            return {}
+
+    def _save_checkpoint(self):
+        if self.checkpoint is None:
+            return
+        # Replace file atomically, so interruption during saving does not corrupt the checkpoint
+        tmp = self.checkpoint + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, np.array(self.state, dtype=object))
+        os.replace(tmp, self.checkpoint)
+
+    def clear(self):
+        """
+        Forget all stored progress
+        """
+
+        self.state = {}
+        if self.checkpoint is not None and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+    def run_step(self, testers, configs):
+        """
+        Run one test on each tester at the same time
+
+        Parameters
+        ----------
+            testers : dict
+                index -> MemTester
+            configs : dict
+                index -> parameters of `MemTester.config_test`
+
+        Returns
+        -------
+            dict
+                index -> (config, status, stats, errs) (same as `MemTester.get_test_result`)
+        """
+
+        for i, tester in testers.items():
+            tester.config_test(**configs[i])
+        for tester in testers.values():
+            tester.start_test()
+
+        pending = set(testers.keys())
+        times = {}
+        start = time.monotonic()
+
+        def all_done():
+            for i in list(pending):
+                if testers[i].test_done():
+                    times[i] = time.monotonic() - start
+                    pending.discard(i)
+            return len(pending) == 0
+
+        timeout = self.timeout
+        if timeout is None:
+            timeout = max(t.test_timeout() for t in testers.values())
+        if not wait_until(all_done, timeout=timeout, max_delay=self.delay):
+            for i in sorted(pending):
+                print(f"Test timeout on mem_tester {i} (TEST_DONE was not set)", file=sys.stderr)
+
+        for i, tester in testers.items():
+            tester.last_test_time = times.get(i)
+        for i in self.outliers(times):
+            print(f"Test on mem_tester {i} took {times[i]:.3f} s (outlier)", file=sys.stderr)
+
+        return {i: tester.get_test_result() for i, tester in testers.items()}
+
+    def outliers(self, times : dict):
+        """
+        Get indexes of tests that took more than `outlier` times the median duration
+
+        Parameters
+        ----------
+            times : dict
+                index -> test duration [s]
+        """
+
+        if len(times) < 3:
+            return []
+        median = np.median(list(times.values()))
+        return [i for i, t in times.items() if t > self.outlier * median]
+
+    def sweep(self, key : str, params : dict, test_param : str = None, param_values=None):
+        """
+        Run parameter sweep on all testers
+
+        Parameters
+        ----------
+            key : str
+                Sweep name (used for checkpointing)
+            params : dict
+                Common parameters of `MemTester.config_test`
+            test_param : str
+                Swept parameter (single test is run if None)
+            param_values : list
+                Values of the swept parameter
+
+        Returns
+        -------
+            dict
+                index -> `{'stats', 'status', 'errs'}` (stats contain history of all steps)
+        """
+
+        cnt = len(param_values) if test_param is not None else 1
+        sweep_id = {'params': params, 'test_param': test_param, 'param_values': param_values}
+
+        state = self.state.get(key)
+        if state is None or state['id'] != sweep_id:
+            state = {'id': sweep_id, 'results': {}}
+            self.state[key] = state
+        results = state['results']
+
+        groups = [self.indexes] if self.parallel else [[i] for i in self.indexes]
+        for group in groups:
+            todo = [i for i in group if results.get(i, {}).get('done', 0) < cnt]
+            if len(todo) == 0:
+                continue
+
+            # Testers with restored statistics history from checkpoint
+            testers = {}
+            for i in todo:
+                testers[i] = self.open_tester(i)
+                res = results.setdefault(i, {'done': 0, 'stats': None, 'status': [], 'errs': []})
+                if res['stats'] is not None:
+                    testers[i].mem_logger.stats.set_data(res['stats'])
+
+            for step in range(min(results[i]['done'] for i in todo), cnt):
+                active = {i: testers[i] for i in todo if results[i]['done'] == step}
+                configs = {}
+                for i in active:
+                    configs[i] = dict(params)
+                    if test_param is not None:
+                        configs[i][test_param] = param_values[step]
+
+                for i, (_config, status, stats, errs) in self.run_step(active, configs).items():
+                    res = results[i]
+                    res['stats'] = stats
+                    res['status'].append(status)
+                    res['errs'].append(errs)
+                    res['done'] = step + 1
+
+                self._save_checkpoint()
+
+        return {
+            i: {
+                'stats':  results[i]['stats'],
+                'status': self.tools.parse_dict_list(results[i]['status']),
+                'errs':   results[i]['errs'],
+            } for i in self.indexes
+        }
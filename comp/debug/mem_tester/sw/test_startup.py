@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 CESNET z. s. p. o.
+# Author(s): Lukas Nevrkla <xnevrk03@stud.fit.vutbr.cz>
+#
+# Startup time of mem_tester scripts (status and reset calls should not load plotting / reporting stack)
+
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+# python3 -m pytest -sv test_startup.py
+# Budget [s] can be changed using MEM_TESTER_STARTUP_BUDGET environment variable
+
+pytest.importorskip("nfb")
+
+folder = os.path.dirname(os.path.abspath(__file__))
+budget = float(os.environ.get("MEM_TESTER_STARTUP_BUDGET", 0.5))
+repeat = 3
+
+heavy_modules = ['matplotlib', 'pandas', 'seaborn', 'graph_gen', 'pdf_gen']
+
+
+def run(code):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([folder] + sys.path)
+
+    res = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', code], cwd=folder, env=env, capture_output=True, text=True)
+        duration = time.perf_counter() - start
+        assert out.returncode == 0, out.stderr
+        res = duration if res is None else min(res, duration)
+    return res, out.stdout
+
+
+def startup_time(module):
+    # Time of the import without the interpreter startup
+    base, _ = run('pass')
+    duration, loaded = run(
+        f"import sys, {module}; "
+        f"print(' '.join(m for m in {heavy_modules} if m in sys.modules))"
+    )
+    return duration - base, loaded.split()
+
+
+@pytest.mark.parametrize("module", ['mem_tester', 'report_gen', 'sweep', 'results'])
+def test_no_heavy_imports(module):
+    _, loaded = startup_time(module)
+    assert loaded == [], f"{module} imports {loaded} at startup"
+
+
+@pytest.mark.parametrize("module", ['mem_tester', 'report_gen'])
+def test_startup_budget(module):
+    duration, _ = startup_time(module)
+    print(f"{module} startup: {duration * 1000:.0f} ms")
+    assert duration < budget, f"{module} startup took {duration:.3f} s (budget {budget:.3f} s)"
@@ -5,9 +5,8 @@
 import nfb
 import argparse
 from data_logger.data_logger import DataLogger
-from time import sleep
-
-import curses
+import logger_stats.logger_stats as Stats
+from logger_dashboard.logger_dashboard import LoggerDashboard
 
 
 class RxDmaPerfCounters(DataLogger):
@@ -44,44 +43,29 @@ class RxDmaPerfCounters(DataLogger):
 
         return cntr_storage
 
-    def measure_blocking(self, stdscr):
-        stdscr.clear()
-
-        try:
-            while True:
-                cntr_storage = self.load_cntrs_all()
-
-                if (cntr_storage[5] != 0):
-                    pcie_mfb_stall = (cntr_storage[0] / cntr_storage[5]) * 100
-                else:
-                    pcie_mfb_stall = 0.0
-
-                stdscr.addstr(0, 0, "PCIE IP stalls:         {:.2}% (absolute {})".format(pcie_mfb_stall, cntr_storage[0]))
-
-                if (cntr_storage[4] != 0):
-                    data_addr_stall = (cntr_storage[2] / cntr_storage[4]) * 100
-                else:
-                    data_addr_stall = 0.0
-
-                stdscr.addstr(1, 0, "Wait for data address:  {:.2}% (absolute {})".format(data_addr_stall, cntr_storage[2]))
-
-                if (cntr_storage[3] != 0):
-                    dma_hdr_addr_stall = (cntr_storage[1] / cntr_storage[3]) * 100
-                else:
-                    dma_hdr_addr_stall = 0.0
-
-                stdscr.addstr(2, 0, "Wait for DMA address:   {:.2}% (absolute {})".format(dma_hdr_addr_stall, cntr_storage[1]))
+    def measure_blocking(self, interval=1.0):
+        # Live view of counters and stall ratios (see `perf_stats`)
+        LoggerDashboard(self.perf_stats(), interval=interval).run()
 
-                stdscr.addstr(3, 0, "Total data address req: {}".format(cntr_storage[4]))
-                stdscr.addstr(4, 0, "Total DMA addr req:     {}".format(cntr_storage[3]))
-                stdscr.addstr(5, 0, "Total DMA PCIE beats:   {}".format(cntr_storage[5]))
+    def perf_stats(self):
+        stats = Stats.LoggerStats('RX DMA performance counters', logger=self)
+        stats.add_stats(
+            name='Counters',
+            names=[self.counter_names[i] for i in range(self.cntr_num)],
+            indexes=list(range(self.cntr_num)),
+            constructor=lambda i, n: Stats.Counter(i, n, wrap=True)
+        )
 
-                stdscr.refresh()
-                sleep(1)
-                stdscr.clear()
+        stalls = [
+            ("PCIE IP stalls",          "PCIE_MFB_STALL_CNTR",      "PCIE_MFB_BEATS_CNTR"),
+            ("Wait for data address",   "DATA_ADDR_STALL_CNTR",     "DATA_ADDR_REQ_CNTR"),
+            ("Wait for DMA address",    "DMA_HDR_ADDR_STALL_CNTR",  "DMA_HDR_ADDR_REQ_CNTR"),
+        ]
+        for n, num, den in stalls:
+            stats.add_stat(Stats.Ratio(f"Counters/{num}", f"Counters/{den}", n))
+            stats.add_stat(Stats.Ratio(f"Counters/{num}", f"Counters/{den}", f"{n} (absolute)", interval=False))
 
-        except KeyboardInterrupt:
-            print("Interrupt caught, terminating...")
+        return stats
 
 
 def parseParams():
@@ -115,6 +99,6 @@ if __name__ == '__main__':
         print(perf_cntrs.stats_to_str(hist=True))
     elif args.measure:
         perf_cntrs.rst()
-        curses.wrapper(perf_cntrs.measure_blocking)
+        perf_cntrs.measure_blocking()
     else:
         perf_cntrs.show_cntrs()
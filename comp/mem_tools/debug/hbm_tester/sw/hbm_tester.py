@@ -5,9 +5,14 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 import nfb
+import csv
 import time
 import math
 import argparse
+import numpy as np
+
+# Adaptive waiting is shared with data_logger based tools (comp/debug/data_logger/sw has to be installed)
+from data_logger.wait import wait_value, test_deadline
 
 
 class hbm_tester:
@@ -40,6 +45,8 @@ class hbm_tester:
         self.ports = 32 # TODO register
         self.width = 256 # TODO register
         self.clk_period = (1 / 450000000) * 1e9 # TODO register
+        self.test_length = 0
+        self.last_test_time = None
 
     def reset_all_counters(self):
         self.comp.write32(self._REG_RESET, self.get_ports_vector(self.ports))
@@ -49,6 +56,7 @@ class hbm_tester:
     def set_test_length(self, test_length):
         #print("REG_TIME: %s" % hex(test_length))
         self.comp.write32(self._REG_TIME, test_length)
+        self.test_length = test_length
 
     def set_config_reg(self, test_type, test_phase, rand_addr):
         if rand_addr is True:
@@ -119,26 +127,27 @@ class hbm_tester:
         #print("speed:     %.2f Gbps" % speed)
         return speed
 
+    def get_speed_result(self, test_length, hbm_ports):
+        # Read and write speed [Gbps] of each port
+        test_time = test_length * self.clk_period
+        rd_speed = [self.get_speed(0, ii, test_time) for ii in range(0, hbm_ports)]
+        wr_speed = [self.get_speed(1, ii, test_time) for ii in range(0, hbm_ports)]
+        return rd_speed, wr_speed
+
     def print_speed_result(self, test_length, hbm_ports):
         #print("test_length: %d" % test_length)
         #print("clk_period:  %f" % self.clk_period)
-        test_time = test_length * self.clk_period
-        rd_speed_total = 0
-        wr_speed_total = 0
+        rd_speed, wr_speed = self.get_speed_result(test_length, hbm_ports)
 
         for ii in range(0, hbm_ports):
             print("HBM PORT: %d" % ii)
             print("---------------------------")
-            speed = self.get_speed(0, ii, test_time)
-            rd_speed_total += speed
-            print("Read speed:   %.2f Gbps" % speed)
-            speed = self.get_speed(1, ii, test_time)
-            wr_speed_total += speed
-            print("Write speed:  %.2f Gbps" % speed)
+            print("Read speed:   %.2f Gbps" % rd_speed[ii])
+            print("Write speed:  %.2f Gbps" % wr_speed[ii])
             print("---------------------------")
 
-        print("HBM TOTAL READ SPEED:  %.2f Gbps" % rd_speed_total)
-        print("HBM TOTAL WRITE SPEED: %.2f Gbps" % wr_speed_total)
+        print("HBM TOTAL READ SPEED:  %.2f Gbps" % sum(rd_speed))
+        print("HBM TOTAL WRITE SPEED: %.2f Gbps" % sum(wr_speed))
 
     def print_latency_result(self, hbm_ports):
         for ii in range(0, hbm_ports):
@@ -152,6 +161,139 @@ class hbm_tester:
             print("WR latency: %d clk cycles (%.2f ns)" % (latency, latency_ns))
             print("---------------------------")
 
+    def sample_latency(self, hbm_ports, samples, rand_addr, test_length=0xFFFF):
+        """
+        Collect latency samples by repeating the latency test
+
+        Monitor measures only one read and one write latency per port and test run,
+        so the test is repeated `samples` times while all `hbm_ports` generate traffic.
+
+        Returns
+        -------
+            Read and write latencies in clock cycles, arrays with shape `(samples, hbm_ports)`
+        """
+
+        rd = np.zeros((samples, hbm_ports), dtype=np.int64)
+        wr = np.zeros((samples, hbm_ports), dtype=np.int64)
+
+        for s in range(0, samples):
+            self.reset_all_counters()
+            self.set_test_length(test_length)
+            self.set_config_reg("latency", 0, rand_addr)
+            self.run_test(hbm_ports)
+            rd[s] = [self.get_counter(0, ii) for ii in range(0, hbm_ports)]
+            wr[s] = [self.get_counter(1, ii) for ii in range(0, hbm_ports)]
+
+        return rd, wr
+
+    def latency_stats(self, latency, percentiles=(50, 99)):
+        """
+        Latency statistics in ns (`avg`, `max` and `p50`, `p99`, ...)
+
+        Percentiles are computed from histogram of clock cycles the same way as for data_logger `Value`
+        (value of the first box where CDF reaches the percentile).
+        """
+
+        latency = np.asarray(latency, dtype=np.int64).ravel()
+        if len(latency) == 0:
+            return None
+
+        cdf = np.cumsum(np.bincount(latency)) / len(latency)
+        res = {
+            'avg': latency.mean() * self.clk_period,
+            'max': latency.max() * self.clk_period,
+        }
+        for q in percentiles:
+            box = min(np.searchsorted(cdf, q / 100), len(cdf) - 1)
+            res[f'p{q:g}'] = box * self.clk_period
+        return res
+
+    def load_test(self, hbm_ports, rand_addr, test_length, samples):
+        """
+        Measure throughput and latency distribution with given number of active ports
+
+        Returns
+        -------
+            Dictionary with total and per port speed [Gbps] and read / write latency statistics [ns]
+        """
+
+        self.reset_all_counters()
+        self.set_test_length(test_length)
+        self.set_config_reg("speed", 0, rand_addr)
+        self.run_test(hbm_ports)
+        rd_speed, wr_speed = self.get_speed_result(test_length, hbm_ports)
+
+        rd_lat, wr_lat = self.sample_latency(hbm_ports, samples, rand_addr)
+
+        return {
+            'ports':       hbm_ports,
+            'rd_speed':    sum(rd_speed),
+            'wr_speed':    sum(wr_speed),
+            'rd_port':     rd_speed,
+            'wr_port':     wr_speed,
+            'rd_latency':  self.latency_stats(rd_lat),
+            'wr_latency':  self.latency_stats(wr_lat),
+            'rd_ports_latency': [self.latency_stats(rd_lat[:, ii]) for ii in range(0, hbm_ports)],
+            'wr_ports_latency': [self.latency_stats(wr_lat[:, ii]) for ii in range(0, hbm_ports)],
+        }
+
+    def port_sweep(self, port_counts, rand_addr, test_length, samples):
+        """
+        Run `load_test` for each number of active ports to show scaling of contention
+        """
+
+        return [self.load_test(p, rand_addr, test_length, samples) for p in port_counts]
+
+    def default_port_counts(self, hbm_ports):
+        # 1, 2, 4, ... up to hbm_ports
+        res = [2 ** i for i in range(0, int(math.log2(hbm_ports)) + 1)]
+        if res[-1] != hbm_ports:
+            res.append(hbm_ports)
+        return res
+
+    def print_load_result(self, results, per_port=False):
+        def lat(latency):
+            return "%8.2f %8.2f %8.2f" % (latency['p50'], latency['p99'], latency['max'])
+
+        print("PORTS | RD [Gbps] | WR [Gbps] | RD p50 / p99 / max [ns] | WR p50 / p99 / max [ns]")
+        print("-----------------------------------------------------------------------------------")
+        for r in results:
+            print("%5d | %9.2f | %9.2f | %s | %s" % (
+                r['ports'], r['rd_speed'], r['wr_speed'], lat(r['rd_latency']), lat(r['wr_latency'])))
+
+        if per_port:
+            for r in results:
+                print("===========================")
+                print("ACTIVE PORTS: %d" % r['ports'])
+                for ii in range(0, r['ports']):
+                    print("HBM PORT %2d: RD %8.2f Gbps %s | WR %8.2f Gbps %s" % (
+                        ii,
+                        r['rd_port'][ii], lat(r['rd_ports_latency'][ii]),
+                        r['wr_port'][ii], lat(r['wr_ports_latency'][ii])))
+
+    def save_load_result(self, file, results, channel=0, **config):
+        """
+        Save results of `port_sweep` as CSV table (one row per number of active ports)
+
+        Columns follow mem_tester `ResultTable` format, so runs can be compared using mem_tester `compare.py`.
+        """
+
+        rows = []
+        for step, r in enumerate(results):
+            row = {'channel': channel, 'test': 'load', 'step': step, 'config.ports': r['ports']}
+            row.update({f'config.{k}': v for k, v in config.items()})
+            row['stats.rd_speed'] = r['rd_speed']
+            row['stats.wr_speed'] = r['wr_speed']
+            for d in ('rd', 'wr'):
+                for k, v in r[f'{d}_latency'].items():
+                    row[f'stats.{d}_latency.{k}'] = v
+            rows.append(row)
+
+        with open(file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+
     def print_data_result(self, hbm_ports):
         for ii in range(0, hbm_ports):
             print("HBM PORT: %d" % ii)
@@ -162,27 +304,23 @@ class hbm_tester:
             print("Error words: %d" % words)
             print("---------------------------")
 
+    def test_timeout(self):
+        # Deadline derived from the configured test length
+        return test_deadline(self.test_length, 1e9 / self.clk_period, margin=100, minimum=1)
+
     def run_test(self, hbm_ports):
         ports_vector = self.get_ports_vector(hbm_ports)
-        test_done = False
-        ii = 0
         #print("REG_RUN_TEST: %s" % hex(ports_vector))
         self.comp.write32(self._REG_RUN_TEST, ports_vector)
 
-        while test_done is False:
-            time.sleep(0.1)
-            reg_done = self.comp.read32(self._REG_DONE_TEST)
-            #print("REG_DONE_TEST: %s" % hex(reg_done))
-            test_done = (reg_done == ports_vector)
-            ii += 1
-            if ii > 5:
-                print("HBM test iteration: " + str(ii))
-            if ii > 10:
-                print("HBM test done fail!")
-                break
+        res = wait_value(self.comp, self._REG_DONE_TEST, ports_vector, timeout=self.test_timeout())
+        self.last_test_time = res.elapsed
+        if not res:
+            print("HBM test done fail!")
 
         self.comp.write32(self._REG_RUN_TEST, 0x0)
         time.sleep(0.1)
+        return res
 
     def get_addr_mode_string(self, rand_addr):
         if rand_addr is True:
@@ -190,7 +328,7 @@ class hbm_tester:
         else:
             return "sequential"
 
-    def hbm_test(self, test_type, rand_addr, hbm_ports, test_length):
+    def hbm_test(self, test_type, rand_addr, hbm_ports, test_length, samples=100, port_counts=None):
         print("===========================")
         print("HBM TESTER by CESNET")
         print("===========================")
@@ -200,6 +338,13 @@ class hbm_tester:
         print("USED PORTS:  " + str(hbm_ports))
         print("===========================")
 
+        if test_type == "load":
+            if port_counts is None:
+                port_counts = self.default_port_counts(hbm_ports)
+            results = self.port_sweep(port_counts, rand_addr, test_length, samples)
+            self.print_load_result(results, per_port=(len(port_counts) == 1))
+            return results
+
         self.reset_all_counters()
         if (test_type == "integrity") or (test_type == "coherency"):
             self.set_test_length(0xFFFF)
@@ -226,9 +371,12 @@ if __name__ == '__main__':
     args = argparse.ArgumentParser()
     args.add_argument("-i", "--index", action="store", nargs='?', default='0')
     args.add_argument("-d", "--device", action="store", nargs='?', default='0')
-    args.add_argument("-t", "--test", action="store", nargs='?', choices=['speed', 'latency', 'integrity', 'coherency'], default='speed')
+    args.add_argument("-t", "--test", action="store", nargs='?', choices=['speed', 'latency', 'integrity', 'coherency', 'load'], default='speed', help="Load test measures speed and latency distribution for different numbers of active ports.")
     args.add_argument("-r", "--random", action='store_true', help="Use random addressing (only for latency or speed test), default is sequential.")
     args.add_argument("-p", "--ports", action="store", nargs='?', default='0', help="Number of actived ports (channels), default is all.")
+    args.add_argument("-s", "--samples", action="store", type=int, default=100, help="Number of latency samples per active ports count (only for load test), default is 100.")
+    args.add_argument("--sweep", action="store", default=None, help="Comma separated numbers of active ports (only for load test), default is 1, 2, 4, ... up to ports.")
+    args.add_argument("-o", "--output", action="store", default=None, help="Save results of load test to CSV file (can be compared using mem_tester compare.py).")
     #args.add_argument("-l","--length", action="store", nargs='?', default='0xFFFFFF', help="Length of test in clock cycles (only for latency or speed test), default is 0xFFFFFF.")
     arguments = args.parse_args()
 
@@ -242,6 +390,15 @@ if __name__ == '__main__':
         arg_ports = tester.ports
     arg_length = 0xFFFFF # int(arguments.length[0], 0)
 
-    tester.hbm_test(arguments.test, arguments.random, arg_ports, arg_length)
+    port_counts = None
+    if arguments.sweep is not None:
+        port_counts = [int(p, 0) for p in arguments.sweep.split(',')]
+
+    results = tester.hbm_test(arguments.test, arguments.random, arg_ports, arg_length, arguments.samples, port_counts)
+    if arguments.output is not None and arguments.test == "load":
+        tester.save_load_result(
+            arguments.output, results, channel=int(arguments.index[0], 0),
+            rand_addr=arguments.random, test_length=arg_length, samples=arguments.samples
+        )
     # reset config register after test
     #tester.set_config_reg("none", 0, False)
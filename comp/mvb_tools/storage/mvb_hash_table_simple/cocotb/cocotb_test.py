@@ -25,7 +25,8 @@ from cocotb_bus.drivers import BitDriver
 from cocotb_bus.scoreboard import Scoreboard
 
 import nfb
-from sw.toolkit import MVB_HASH_TABLE_SIMPLE_TOOLKIT, toeplitz_hash, simple_xor_hash
+from sw.toolkit import MVB_HASH_TABLE_SIMPLE_TOOLKIT
+from sw.table_model import HashTableModel
 from cocotbext.ofm.utils.servicer import Servicer
 from cocotbext.ofm.utils.device import get_dtb
 from cocotbext.ofm.utils.math import ceildiv
@@ -75,7 +76,7 @@ class testbench():
             self.stream_out.log.setLevel(cocotb.logging.DEBUG)
             self.mi_interface.log.setLevel(cocotb.logging.DEBUG)
 
-    def load_file(self, path: str, params: dict) -> (dict, list, list, dict):
+    def load_file(self, path: str, params: dict) -> (dict, list, HashTableModel):
         """function for loading data from configuration files.
 
             Args:
@@ -85,46 +86,20 @@ class testbench():
             Returns:
                 comp_conf: the whole configuration of the component
                 out_config: configuration that is uploaded into the component is configuration through file is used.
-                out_keys: list of MVB keys that have data tied to them.
-                out_data: dictionary of data to be uploaded into the component indexed by their respective keys.
+                model: model of the records in the tables, used to look up expected data of MVB keys.
         """
 
-        out_config = list()
-        out_keys = list()
-        out_data = dict()
-        tables = ["TOEPLITZ", "SIMPLE_XOR"]
-        hash_functions = {"TOEPLITZ": toeplitz_hash, "SIMPLE_XOR": simple_xor_hash}
-
         fp = open(path, 'r')
 
         yaml_data = yaml.safe_load(fp)
         comp_conf = yaml_data["mvb_hash_table_simple"]
 
-        params["hash_key"] = comp_conf["hash_key"]
-
-        for i in range(comp_conf["num_of_tables"]):
-            table = list()
-
-            table_raw_data = comp_conf[tables[i]]
-
-            for j in range(len(table_raw_data)):
-                record = table_raw_data[j]["record"]
-
-                mvb_key = record["mvb_key"]
-                data = record["data"]
-
-                h = hash_functions[tables[i]](mvb_key, params)
-
-                out_keys.append(mvb_key)
-                out_data[mvb_key] = data
-
-                table.append([h, (mvb_key << ((self.stream_out.item_widths["data"] // 8) * 8 + 1)) + ((data << 1) + 1)])
-
-            out_config.append(table)
-
         fp.close()
 
-        return comp_conf, out_config, out_keys, out_data
+        model = HashTableModel.from_config(dict(comp_conf, **params))
+        out_config = [[[slot, model.item(key, data)] for slot, key, data in t.records()] for t in model.tables]
+
+        return comp_conf, out_config, model
 
     def model(self, transaction):
         """Model the DUT based on the input transaction"""
@@ -182,7 +157,7 @@ async def run_test(dut, config_file: str = "test_configs/test_config_1B.yaml", c
     assert hash_width == log2(table_capacity)
 
     """Loading configuration from a config file"""
-    comp_conf, config, model_keys, model_data = tb.load_file(config_file, hash_func_params)
+    comp_conf, config, table_model = tb.load_file(config_file, hash_func_params)
 
     """Asserting that parametres of component match with parametres in config file"""
     assert mvb_key_width == comp_conf["mvb_key_width"]
@@ -239,8 +214,9 @@ async def run_test(dut, config_file: str = "test_configs/test_config_1B.yaml", c
         int_transaction = int.from_bytes(transaction, "little")
 
         mvb_tr = MvbTrClassic()
-        if int_transaction in model_keys:
-            mvb_tr.data = model_data[int_transaction]
+        data = table_model.lookup(int_transaction)
+        if data is not None:
+            mvb_tr.data = data
             vld = 1
         else:
             mvb_tr.data = 0
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+
+# hash_engine.py: Integer implementation of MVB_HASH_TABLE_SIMPLE hash functions
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Integer (and NumPy vectorized) implementation of the hash functions used by MVB_HASH_TABLE_SIMPLE component.
+
+Results are bit-exact with the hardware (and with the original cocotb LogicArray based model, see test_hash_engine.py).
+
+Usage:
+    engine = HashEngine.from_params(params)
+    h = engine.toeplitz(key)
+    hashes = engine.toeplitz_batch(np.arange(2 ** 16))
+
+"""
+
+from functools import lru_cache
+import numpy as np
+
+
+class HashEngine:
+    """Hash functions of MVB_HASH_TABLE_SIMPLE component for one set of parametres.
+
+    Toeplitz hash: each set bit i of the MVB key XORs a window of the hash key into the result, where the window of the
+    most significant key bit are the most significant hash_width bits of the hash key and the window moves by one bit
+    towards LSB with each next key bit. The windows are precomputed, so hashing a key is a scan over its set bits.
+    Batch variant uses precomputed tables of XORed windows for each byte of the key (one lookup per key byte).
+
+    Simple XOR hash: lower hash_width bits of the MVB key XORed with the hash key.
+
+    Atributes:
+        hash_key, mvb_key_width, hash_key_width, hash_width: parametres of the component.
+        windows: hash key window selected by each MVB key bit (index 0 is the LSB of the key).
+
+    """
+
+    def __init__(self, hash_key: int, mvb_key_width: int, hash_key_width: int, hash_width: int) -> None:
+        if hash_width + mvb_key_width - 1 > hash_key_width:
+            raise ValueError(f"Hash key of {hash_key_width} bits is too short for {mvb_key_width} bit MVB key and {hash_width} bit hash.")
+
+        self.hash_key = hash_key
+        self.mvb_key_width = mvb_key_width
+        self.hash_key_width = hash_key_width
+        self.hash_width = hash_width
+
+        self.key_mask = (1 << mvb_key_width) - 1
+        self.hash_mask = (1 << hash_width) - 1
+
+        self.windows = [
+            (hash_key >> (hash_key_width - hash_width - (mvb_key_width - 1 - i))) & self.hash_mask
+            for i in range(mvb_key_width)
+        ]
+
+        self._byte_tables = None
+
+    @classmethod
+    def from_params(cls, params: dict) -> "HashEngine":
+        """Creates engine from the toolkit parametres (hash_key, mvb_key_width, hash_key_width, hash_width)."""
+
+        return get_engine(params["hash_key"], params["mvb_key_width"], params["hash_key_width"], params["hash_width"])
+
+    def toeplitz(self, mvb_key: int) -> int:
+        """Calculates hash of one key using the toeplitz hash function."""
+
+        windows = self.windows
+        key = mvb_key & self.key_mask
+        h = 0
+
+        while key:
+            low = key & -key
+            h ^= windows[low.bit_length() - 1]
+            key ^= low
+
+        return h
+
+    def simple_xor(self, mvb_key: int) -> int:
+        """Calculates hash of one key using the simple xor hash function."""
+
+        return (mvb_key ^ self.hash_key) & self.hash_mask
+
+    @property
+    def byte_tables(self) -> np.ndarray:
+        """Table of XORed windows for each byte of the MVB key and each value of the byte (shape: key bytes x 256)."""
+
+        if self._byte_tables is None:
+            tables = []
+            for b in range((self.mvb_key_width + 7) // 8):
+                table = np.zeros(1, dtype=np.uint64)
+                for i in range(8 * b, 8 * (b + 1)):
+                    window = self.windows[i] if i < self.mvb_key_width else 0
+                    table = np.concatenate([table, table ^ np.uint64(window)])
+                tables.append(table)
+            self._byte_tables = np.array(tables)
+
+        return self._byte_tables
+
+    def _key_array(self, keys) -> np.ndarray:
+        if self.mvb_key_width > 64:
+            return None
+        return np.asarray(keys, dtype=np.uint64) & np.uint64(self.key_mask)
+
+    def toeplitz_batch(self, keys) -> np.ndarray:
+        """Calculates toeplitz hashes of an array of keys.
+
+        Args:
+            keys: array (or list) of MVB keys.
+
+        Returns:
+            Array of hashes (int64).
+
+        """
+
+        arr = self._key_array(keys)
+        if arr is None:
+            # Keys wider than 64 bits can't be stored in NumPy integers
+            return np.array([self.toeplitz(int(k)) for k in keys], dtype=np.int64)
+
+        h = np.zeros(arr.shape, dtype=np.uint64)
+        for b, table in enumerate(self.byte_tables):
+            h ^= table[(arr >> np.uint64(8 * b)) & np.uint64(0xFF)]
+
+        return h.astype(np.int64)
+
+    def simple_xor_batch(self, keys) -> np.ndarray:
+        """Calculates simple xor hashes of an array of keys.
+
+        Args:
+            keys: array (or list) of MVB keys.
+
+        Returns:
+            Array of hashes (int64).
+
+        """
+
+        arr = self._key_array(keys)
+        if arr is None:
+            return np.array([self.simple_xor(int(k)) for k in keys], dtype=np.int64)
+
+        return ((arr ^ np.uint64(self.hash_key & self.hash_mask)) & np.uint64(self.hash_mask)).astype(np.int64)
+
+
+@lru_cache(maxsize=16)
+def get_engine(hash_key: int, mvb_key_width: int, hash_key_width: int, hash_width: int) -> HashEngine:
+    """Returns (cached) engine for given parametres."""
+
+    return HashEngine(hash_key, mvb_key_width, hash_key_width, hash_width)
+
+
+def toeplitz_hash(mvb_key: int, params: dict) -> int:
+    """Calculates hash using the toeplitz hash function.
+
+    Args:
+        mvb_key: integer for which the hash is to be calculated.
+        params: dictionary containing parametres of the component (hash_key, mvb_key_width, hash_key_width, hash_width)
+
+    Returns:
+        Calculated hash.
+
+    """
+
+    return HashEngine.from_params(params).toeplitz(mvb_key)
+
+
+def simple_xor_hash(mvb_key: int, params: dict) -> int:
+    """Calculates hash using the simple xor hash function.
+
+    Args:
+        mvb_key: integer for which the hash is to be calculated.
+        params: dictionary containing parametres of the component (hash_key, mvb_key_width, hash_key_width, hash_width)
+
+    Returns:
+        Calculated hash.
+
+    """
+
+    return HashEngine.from_params(params).simple_xor(mvb_key)
+
+
+def toeplitz_hash_batch(mvb_keys, params: dict) -> np.ndarray:
+    """Calculates hashes of an array of keys using the toeplitz hash function (see toeplitz_hash)."""
+
+    return HashEngine.from_params(params).toeplitz_batch(mvb_keys)
+
+
+def simple_xor_hash_batch(mvb_keys, params: dict) -> np.ndarray:
+    """Calculates hashes of an array of keys using the simple xor hash function (see simple_xor_hash)."""
+
+    return HashEngine.from_params(params).simple_xor_batch(mvb_keys)
+
+
+# Batch variant of each hash function
+batch_hash_functions = {
+    toeplitz_hash: toeplitz_hash_batch,
+    simple_xor_hash: simple_xor_hash_batch,
+}
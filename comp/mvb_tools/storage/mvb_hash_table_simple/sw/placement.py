@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+
+# placement.py: Placement of records into the two tables of MVB_HASH_TABLE_SIMPLE
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Offline solver assigning each key of a full key set to the toeplitz or simple xor table of MVB_HASH_TABLE_SIMPLE.
+
+Each key can be stored only at position toeplitz_hash(key) of the first table or simple_xor_hash(key) of the second
+table. Adding keys one by one fails when both positions are occupied, although the occupants could often be moved to
+their other position. The solver places keys with cuckoo eviction chains: when both positions are occupied, occupants
+are moved along the chain ending in a free position. Because every key has only two positions, the chain from each
+position is unique, so trying both chains gives maximal placement (maximum bipartite matching of keys and positions).
+
+The achievable number of placed keys can also be computed without placing them: positions are vertices and keys are
+edges of a graph, each connected component can hold min(keys, positions) of its keys. This is used to quickly search
+hash keys for the one that maximizes placement.
+
+Usage:
+    python3 placement.py config.yaml [-s candidates] [-o optimized.yaml]
+
+"""
+
+import argparse
+import random
+import numpy as np
+import yaml
+
+try:
+    from .hash_engine import HashEngine
+except ImportError:
+    from hash_engine import HashEngine
+
+
+class Placement:
+    """Result of the placement.
+
+    Atributes:
+        positions: dictionary key -> (table, position) of placed keys.
+        unplaced: list of keys that can't be placed.
+        capacity: total number of positions in all tables.
+
+    """
+
+    def __init__(self, positions: dict, unplaced: list, capacity: int) -> None:
+        self.positions = positions
+        self.unplaced = unplaced
+        self.capacity = capacity
+
+    def placed(self) -> int:
+        return len(self.positions)
+
+    def load_factor(self) -> float:
+        """Ratio of occupied positions in all tables."""
+
+        return len(self.positions) / self.capacity
+
+    def tables(self, num_of_tables: int = 2) -> list:
+        """Lists of keys assigned to each table."""
+
+        res = [list() for _ in range(num_of_tables)]
+        for key, (table, _pos) in self.positions.items():
+            res[table].append(key)
+        return res
+
+
+class PlacementSolver:
+    """Placement of keys into the tables for given parametres of the component.
+
+    Atributes:
+        params: parametres of the hash functions (hash_key, mvb_key_width, hash_key_width, hash_width).
+        table_capacity: number of positions in each table.
+        num_of_tables: number of used tables (1 - only toeplitz table, 2 - both tables).
+
+    """
+
+    def __init__(self, params: dict, table_capacity: int, num_of_tables: int = 2) -> None:
+        self.params = dict(params)
+        self.table_capacity = table_capacity
+        self.num_of_tables = num_of_tables
+
+    def _engine(self, hash_key: int = None) -> HashEngine:
+        p = self.params
+        return HashEngine(p["hash_key"] if hash_key is None else hash_key, p["mvb_key_width"], p["hash_key_width"], p["hash_width"])
+
+    def candidates(self, keys, hash_key: int = None) -> np.ndarray:
+        """Positions of each key in each table (shape: keys x tables). Positions of the second table are shifted by
+        table_capacity, so all positions are unique vertices."""
+
+        engine = self._engine(hash_key)
+        cols = [engine.toeplitz_batch(keys)]
+        if self.num_of_tables > 1:
+            cols.append(engine.simple_xor_batch(keys) + self.table_capacity)
+        return np.stack(cols, axis=1)
+
+    def solve(self, keys, hash_key: int = None) -> Placement:
+        """Places keys using cuckoo eviction chains.
+
+        Args:
+            keys: list of MVB keys.
+            hash_key: hash key (hash key from the parametres by default).
+
+        Returns:
+            Placement of the keys.
+
+        """
+
+        keys = list(keys)
+        cand = self.candidates(keys, hash_key).tolist()
+        occupant = dict()
+        unplaced = list()
+
+        for i in range(len(keys)):
+            chain = None
+            for start in cand[i]:
+                path = self._chain(start, cand, occupant)
+                if path is not None and (chain is None or len(path) < len(chain)):
+                    chain = path
+
+            if chain is None:
+                unplaced.append(keys[i])
+                continue
+
+            # Move occupants along the chain (from its free end) and store the key to the start of the chain
+            for pos, prev in zip(reversed(chain[1:]), reversed(chain[:-1])):
+                occupant[pos] = occupant[prev]
+            occupant[chain[0]] = i
+
+        positions = {keys[i]: divmod(pos, self.table_capacity) for pos, i in occupant.items()}
+        return Placement(positions, unplaced, self.table_capacity * self.num_of_tables)
+
+    @staticmethod
+    def _chain(start: int, cand: list, occupant: dict) -> list:
+        # Positions from start to the first free position (the occupant of each position moves to the next one)
+        path = [start]
+        visited = {start}
+        pos = start
+
+        while pos in occupant:
+            c = cand[occupant[pos]]
+            if len(c) == 1:
+                # Single table: the occupant has no other position to move to
+                return None
+            pos = c[1] if c[0] == pos else c[0]
+            if pos in visited:
+                return None
+            visited.add(pos)
+            path.append(pos)
+
+        return path
+
+    def max_placed(self, keys, hash_key: int = None) -> int:
+        """Achievable number of placed keys (without placing them).
+
+        Args:
+            keys: list of MVB keys.
+            hash_key: hash key (hash key from the parametres by default).
+
+        """
+
+        cand = self.candidates(keys, hash_key)
+        if self.num_of_tables == 1:
+            return len(np.unique(cand[:, 0]))
+
+        parent = list(range(self.table_capacity * 2))
+        edges = [0] * len(parent)
+        vertices = [1] * len(parent)
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b in cand.tolist():
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[rb] = ra
+                edges[ra] += edges[rb]
+                vertices[ra] += vertices[rb]
+            edges[ra] += 1
+
+        return sum(min(edges[r], vertices[r]) for r in range(len(parent)) if parent[r] == r)
+
+    def search_hash_key(self, keys, candidates: int = 256, seed: int = 0) -> (int, int):
+        """Searches random hash keys for the one with the most placed keys.
+
+        Only the toeplitz hash depends on the whole hash key, simple xor hash only XORs lower bits of the key,
+        which doesn't change which keys collide.
+
+        Args:
+            keys: list of MVB keys.
+            candidates: number of tested random hash keys.
+            seed: seed of the random generator.
+
+        Returns:
+            best hash key and its number of placed keys (current hash key is kept if no other is better).
+
+        """
+
+        rand = random.Random(seed)
+        best_key = self.params["hash_key"]
+        best = self.max_placed(keys)
+
+        for _ in range(candidates):
+            if best == len(keys):
+                break
+
+            hash_key = rand.getrandbits(self.params["hash_key_width"])
+            placed = self.max_placed(keys, hash_key)
+            if placed > best:
+                best_key, best = hash_key, placed
+
+        return best_key, best
+
+
+def load_config(path: str) -> (dict, dict):
+    """Loads configuration file of the toolkit.
+
+    Returns:
+        configuration of the component and dictionary key -> data of all records.
+
+    """
+
+    with open(path, 'r') as fp:
+        comp_conf = yaml.safe_load(fp)["mvb_hash_table_simple"]
+
+    records = dict()
+    for name in ("TOEPLITZ", "SIMPLE_XOR"):
+        for record in comp_conf.get(name, []):
+            records[record["record"]["mvb_key"]] = record["record"]["data"]
+
+    return comp_conf, records
+
+
+def save_config(path: str, comp_conf: dict, records: dict, placement: Placement) -> None:
+    """Saves configuration file of the toolkit with records placed by the solver (unplaced records are left out)."""
+
+    comp_conf = {k: v for k, v in comp_conf.items() if k not in ("TOEPLITZ", "SIMPLE_XOR")}
+    tables = placement.tables(comp_conf["num_of_tables"])
+
+    for name, keys in zip(("TOEPLITZ", "SIMPLE_XOR"), tables):
+        comp_conf[name] = [{"record": {"mvb_key": k, "data": records[k]}} for k in sorted(keys)]
+
+    with open(path, 'w+') as fp:
+        yaml.safe_dump({"mvb_hash_table_simple": comp_conf}, fp)
+
+
+def parseParams():
+    parser = argparse.ArgumentParser(
+        description="""Places all records of a configuration file of MVB_HASH_TABLE_SIMPLE toolkit into the tables
+        and reports achievable load factor""",
+    )
+    parser.add_argument('config', help="""configuration file of the toolkit""")
+    parser.add_argument(
+        '-s', '--search', type=int, default=0,
+        help="""number of random hash keys tested for better placement"""
+    )
+    parser.add_argument('--seed', type=int, default=0, help="""seed of the hash key search""")
+    parser.add_argument(
+        '-o', '--output', default=None,
+        help="""save configuration with optimized placement (and hash key) to this file"""
+    )
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    args = parseParams()
+
+    comp_conf, records = load_config(args.config)
+    solver = PlacementSolver(comp_conf, comp_conf["table_capacity"], comp_conf["num_of_tables"])
+    keys = sorted(records)
+
+    # Records listed in the same table with the same hash overwrite each other
+    cand = solver.candidates(keys)
+    listed = set()
+    for t, name in enumerate(("TOEPLITZ", "SIMPLE_XOR")[:comp_conf["num_of_tables"]]):
+        table_keys = set(r["record"]["mvb_key"] for r in comp_conf.get(name, []))
+        listed |= set(int(cand[i, t]) for i, k in enumerate(keys) if k in table_keys)
+
+    print(f"Records: {len(keys)}, positions: {comp_conf['table_capacity'] * comp_conf['num_of_tables']}")
+    print(f"Placed by the configuration file: {len(listed)}")
+
+    hash_key = comp_conf["hash_key"]
+    if args.search > 0:
+        hash_key, best = solver.search_hash_key(keys, args.search, args.seed)
+        if hash_key != comp_conf["hash_key"]:
+            print(f"Found hash key {hash_key} (placing {best} records)")
+            comp_conf["hash_key"] = hash_key
+            solver.params["hash_key"] = hash_key
+
+    placement = solver.solve(keys)
+    print(f"Placed by the solver: {placement.placed()} (load factor {placement.load_factor() * 100:.1f} %), unplaced: {len(placement.unplaced)}")
+
+    if args.output is not None:
+        save_config(args.output, comp_conf, records, placement)
@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+
+# table_model.py: In-memory model of MVB_HASH_TABLE_SIMPLE tables
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Indexed in-memory model of the records stored in MVB_HASH_TABLE_SIMPLE tables.
+
+The model doesn't need the component (nor nfb), so it can be used from scripts and from the cocotb test to prepare
+configurations and expected lookups. Adding, removing and looking up a record are O(1) operations.
+
+Usage:
+    model = HashTableModel.load("config.yaml")
+    table, slot = model.add(key, data)
+    model.lookup(key)
+    for table, slot, key, data in model.records():
+        ...
+    model.save("config.yaml")
+
+"""
+
+from itertools import islice
+import yaml
+
+try:
+    from .hash_engine import get_engine
+except ImportError:
+    from hash_engine import get_engine
+
+
+class HashTable:
+    """One table of the component.
+
+    Atributes:
+        name: name of the table (TOEPLITZ, SIMPLE_XOR).
+        capacity: number of positions (slots) in the table.
+        slots: dictionary MVB key -> slot of the stored records (in the order they were added).
+        keys, data: key and data stored in each slot (records array).
+        valid: occupancy bitmap (one byte per slot).
+
+    """
+
+    def __init__(self, name: str, hash_function, capacity: int) -> None:
+        self.name = name
+        self.hash = hash_function
+        self.capacity = capacity
+
+        self.slots = dict()
+        self.keys = [0] * capacity
+        self.data = [0] * capacity
+        self.valid = bytearray(capacity)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.slots
+
+    def free(self) -> int:
+        return self.capacity - len(self.slots)
+
+    def get(self, key: int):
+        """Data of the key (None if the key isn't stored)."""
+
+        slot = self.slots.get(key)
+        return None if slot is None else self.data[slot]
+
+    def add(self, key: int, data: int):
+        """Stores record to the slot given by hash of the key.
+
+        Returns:
+            slot of the record or None if the slot is occupied.
+
+        """
+
+        slot = self.hash(key)
+        if self.valid[slot]:
+            return None
+
+        self.slots[key] = slot
+        self.keys[slot] = key
+        self.data[slot] = data
+        self.valid[slot] = 1
+
+        return slot
+
+    def remove(self, key: int) -> int:
+        """Removes record of the key.
+
+        Returns:
+            slot of the removed record.
+
+        """
+
+        slot = self.slots.pop(key)
+        self.valid[slot] = 0
+        return slot
+
+    def remove_slot(self, slot: int):
+        """Removes record stored in the slot.
+
+        Returns:
+            key of the removed record or None if the slot was empty.
+
+        """
+
+        if not self.valid[slot]:
+            return None
+
+        key = self.keys[slot]
+        self.remove(key)
+        return key
+
+    def key_of_record(self, num: int):
+        """Key of the num-th record (records are numbered in the order they were added).
+
+        Takes time linear in num (numbers of the records change with each removal, so they are not indexed).
+
+        """
+
+        return next(islice(self.slots, num, None), None)
+
+    def records(self):
+        """Iterates over (slot, key, data) of the stored records in the order they were added."""
+
+        for key, slot in self.slots.items():
+            yield slot, key, self.data[slot]
+
+    def clear(self) -> None:
+        self.slots.clear()
+        self.valid = bytearray(self.capacity)
+
+
+class HashTableModel:
+    """Records of both tables of the component for given parametres of the component.
+
+    Atributes:
+        hash_key, mvb_key_width, data_out_width, hash_key_width, table_capacity, num_of_tables: parametres of the component.
+        tables: list of used tables (toeplitz and simple xor).
+
+    """
+
+    # Table names (in configuration files) and their short names (in toolkit commands)
+    Names = ["TOEPLITZ", "SIMPLE_XOR"]
+    Aliases = {"toeplitz": 0, "xor": 1}
+
+    def __init__(self, hash_key: int, mvb_key_width: int, data_out_width: int, hash_key_width: int, table_capacity: int, num_of_tables: int = 2, hash_width: int = None) -> None:
+        self.hash_key = hash_key
+        self.mvb_key_width = mvb_key_width
+        self.data_out_width = data_out_width
+        self.hash_key_width = hash_key_width
+        self.table_capacity = table_capacity
+        self.hash_width = hash_width if hash_width is not None else (table_capacity - 1).bit_length()
+        self.num_of_tables = num_of_tables
+
+        self.tables = list()
+        self._init_tables()
+
+    def _init_tables(self) -> None:
+        engine = get_engine(self.hash_key, self.mvb_key_width, self.hash_key_width, self.hash_width)
+        hash_functions = [engine.toeplitz, engine.simple_xor]
+
+        self.tables = [HashTable(self.Names[i], hash_functions[i], self.table_capacity) for i in range(self.num_of_tables)]
+        self._key_table = dict()
+
+    @property
+    def params(self) -> dict:
+        """Parametres of the hash functions (see hash_engine)."""
+
+        return {
+            "hash_key": self.hash_key,
+            "mvb_key_width": self.mvb_key_width,
+            "hash_key_width": self.hash_key_width,
+            "hash_width": self.hash_width
+        }
+
+    def table(self, name):
+        """Table by its index, name or short name (toeplitz, xor). Returns None for unknown table."""
+
+        index = name if isinstance(name, int) else self.Aliases.get(name, self.Names.index(name) if name in self.Names else None)
+        if index is None or not 0 <= index < len(self.tables):
+            return None
+        return self.tables[index]
+
+    def __len__(self) -> int:
+        return len(self._key_table)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._key_table
+
+    def check(self, key: int, data: int) -> None:
+        """Checks that key and data can be represented in the component (raises ValueError)."""
+
+        try:
+            key.to_bytes(self.mvb_key_width // 8, 'little')
+        except Exception:
+            raise ValueError(f"Key value {key} can't be represented on {self.mvb_key_width} bits.")
+
+        try:
+            data.to_bytes(self.data_out_width // 8, 'little')
+        except Exception:
+            raise ValueError(f"Data value {data} can't be represented on {self.data_out_width} bits.")
+
+    def add(self, key: int, data: int, table=None) -> (HashTable, int):
+        """Adds record to the chosen table, or to the first table with free slot for the key.
+
+        Returns:
+            table and slot of the record.
+
+        Raises:
+            ValueError: if the key is already used, can't be represented or its slots are occupied.
+
+        """
+
+        self.check(key, data)
+
+        if key in self._key_table:
+            raise ValueError(f"Key {key} already in use.")
+
+        tables = self.tables if table is None else [self.table(table)]
+        if tables[0] is None:
+            raise ValueError(f"Invalid table {table}.")
+
+        for t in tables:
+            slot = t.add(key, data)
+            if slot is not None:
+                self._key_table[key] = t
+                return t, slot
+
+        raise ValueError(f"Record can't be added, position {tables[-1].hash(key)} in {tables[-1].name} TABLE is already occupied.")
+
+    def remove(self, key: int) -> (HashTable, int):
+        """Removes record of the key.
+
+        Returns:
+            table and slot of the removed record.
+
+        Raises:
+            KeyError: if the key isn't stored.
+
+        """
+
+        t = self._key_table.pop(key)
+        return t, t.remove(key)
+
+    def remove_slot(self, table, slot: int):
+        """Removes record stored in the slot of the table. Returns key of the removed record or None."""
+
+        key = self.table(table).remove_slot(slot)
+        if key is not None:
+            del self._key_table[key]
+        return key
+
+    def replace(self, key: int, data: int) -> None:
+        """Replaces data of the stored key (raises KeyError if the key isn't stored)."""
+
+        self.check(key, data)
+        t = self._key_table[key]
+        t.data[t.slots[key]] = data
+
+    def find(self, key: int):
+        """Table and slot of the key (None if the key isn't stored)."""
+
+        t = self._key_table.get(key)
+        return None if t is None else (t, t.slots[key])
+
+    def lookup(self, key: int):
+        """Data the component returns for the key (None on miss)."""
+
+        for t in self.tables:
+            slot = t.hash(key)
+            if t.valid[slot] and t.keys[slot] == key:
+                return t.data[slot]
+        return None
+
+    def records(self):
+        """Iterates over (table, slot, key, data) of all stored records."""
+
+        for t in self.tables:
+            for slot, key, data in t.records():
+                yield t, slot, key, data
+
+    def clear(self, table=None) -> None:
+        """Clears all records of the chosen table (or of all tables)."""
+
+        for t in (self.tables if table is None else [self.table(table)]):
+            for key in t.slots:
+                del self._key_table[key]
+            t.clear()
+
+    def set_hash_key(self, hash_key: int) -> list:
+        """Changes the hash key and adds all records again (to the table they were stored in, if possible).
+
+        Returns:
+            list of (key, data) of records that can't be added with the new hash key.
+
+        """
+
+        records = [(t.name, key, data) for t, slot, key, data in self.records()]
+        self.hash_key = hash_key
+        self._init_tables()
+
+        failed = list()
+        for name, key, data in records:
+            try:
+                self.add(key, data, name)
+            except ValueError:
+                try:
+                    self.add(key, data)
+                except ValueError:
+                    failed.append((key, data))
+
+        return failed
+
+    def item(self, key: int, data: int, valid: bool = True) -> int:
+        """Table item as stored in the component (key, data and valid bit)."""
+
+        return (int(key) << (self.data_out_width + 1)) + (int(data) << 1) + int(valid)
+
+    def images(self) -> list:
+        """Content of the tables as stored in the component (list of items of each table, two tables)."""
+
+        images = [[0] * self.table_capacity for _ in range(2)]
+        for t, slot, key, data in self.records():
+            images[self.tables.index(t)][slot] = self.item(key, data)
+        return images
+
+    def to_config(self) -> dict:
+        """Configuration in the format of the configuration files of the toolkit."""
+
+        comp_conf = {
+            "hash_key": self.hash_key,
+            "mvb_key_width": self.mvb_key_width,
+            "data_out_width": self.data_out_width,
+            "table_capacity": self.table_capacity,
+            "hash_width": self.hash_width,
+            "hash_key_width": self.hash_key_width,
+            "num_of_tables": self.num_of_tables,
+        }
+
+        for t in self.tables:
+            comp_conf[t.name] = [{"record": {"mvb_key": key, "data": data}} for slot, key, data in t.records()]
+
+        return {"mvb_hash_table_simple": comp_conf}
+
+    @classmethod
+    def from_config(cls, comp_conf: dict) -> "HashTableModel":
+        """Creates model from configuration of the component (content of 'mvb_hash_table_simple' in configuration files).
+
+        Raises:
+            KeyError, ValueError: if the configuration is incomplete or records can't be added.
+
+        """
+
+        model = cls(
+            comp_conf["hash_key"],
+            comp_conf["mvb_key_width"],
+            comp_conf["data_out_width"],
+            comp_conf["hash_key_width"],
+            comp_conf["table_capacity"],
+            comp_conf["num_of_tables"],
+            comp_conf.get("hash_width"),
+        )
+
+        for t in model.tables:
+            for record in comp_conf.get(t.name, []):
+                model.add(record["record"]["mvb_key"], record["record"]["data"], t.name)
+
+        return model
+
+    @classmethod
+    def load(cls, path: str) -> "HashTableModel":
+        with open(path, 'r') as fp:
+            return cls.from_config(yaml.safe_load(fp)["mvb_hash_table_simple"])
+
+    def save(self, path: str) -> None:
+        with open(path, 'w+') as fp:
+            yaml.safe_dump(self.to_config(), fp)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+
+# table_writer.py: MI write stream programming MVB_HASH_TABLE_SIMPLE tables
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Preparation of the whole sequence of MI writes that programs MVB_HASH_TABLE_SIMPLE component and issuing it at once.
+
+The stream is prepared in a buffer up front (hash key, clearing, table selection and records), so no hashing or
+conversions are done between the MI writes. Writes to consecutive registers (COMMAND -> ADDR -> DATA -> COMMIT) are
+merged into bursts, so each record with one data word is a single bulk write of the component handle.
+
+Usage:
+    stream = WriteStream(mvb_key_width, data_out_width, hash_key_width)
+    stream.set_hash_key(hash_key)
+    stream.clear()
+    stream.select(0)
+    stream.record(slot, key, data)
+    stats = stream.issue(comp)
+
+"""
+
+import time
+from cocotbext.ofm.utils.math import ceildiv
+
+# MI ADDRESS SPACE
+COMMAND_REG    = 0x00
+ADDR_REG       = 0x04
+DATA_REG       = 0x08
+COMMIT_REG     = 0x0C
+HASH_KEY_REG   = 0x10
+
+# COMMAND REGISTER COMMANDS
+CLEAR_TABLES   = 0x02
+
+# Read interface (configuration of the component)
+CONFIG_ADDR    = 0x00
+CONFIG_REGS    = 6
+
+MI_BYTES       = 4
+
+
+class WriteStream:
+    """Buffer of MI writes (address, value) programming the tables.
+
+    Atributes:
+        writes: list of (address, value) pairs in the order they are issued.
+        data_words: number of 32-bit writes to the data shift register per record.
+
+    """
+
+    def __init__(self, mvb_key_width: int, data_out_width: int, hash_key_width: int) -> None:
+        self.mvb_key_width = mvb_key_width
+        self.data_out_width = data_out_width
+        self.hash_key_width = hash_key_width
+
+        self.item_bytes = (mvb_key_width // 8) + (data_out_width // 8) + 1
+        self.data_words = ceildiv(MI_BYTES, self.item_bytes)
+
+        self.writes = list()
+        self.records = 0
+
+    def __len__(self) -> int:
+        return len(self.writes)
+
+    def item(self, key: int, data: int, valid: bool = True) -> int:
+        """Table item as stored in the component (key, data and valid bit)."""
+
+        return (int(key) << (self.data_out_width + 1)) + (int(data) << 1) + int(valid)
+
+    def set_hash_key(self, hash_key: int) -> None:
+        hash_key_bytes = hash_key.to_bytes(self.hash_key_width // 8, 'little')
+
+        for i in range(ceildiv(MI_BYTES, len(hash_key_bytes))):
+            self.writes.append((HASH_KEY_REG, int.from_bytes(hash_key_bytes[MI_BYTES * i: MI_BYTES * (i + 1)], 'little')))
+
+    def clear(self) -> None:
+        """Clears both tables."""
+
+        self.writes.append((COMMAND_REG, CLEAR_TABLES))
+
+    def select(self, table: int) -> None:
+        """Chooses table for the following records (0 - toeplitz, 1 - simple xor)."""
+
+        self.writes.append((COMMAND_REG, table))
+
+    def item_key(self, item: int) -> int:
+        return item >> (self.data_out_width + 1)
+
+    def record(self, slot: int, key: int = 0, data: int = 0, valid: bool = True) -> None:
+        """Writes item to position `slot` of the selected table (invalid item removes the record)."""
+
+        self.write_item(slot, self.item(key, data, valid))
+
+    def write_item(self, slot: int, item: int) -> None:
+        """Writes raw table item to position `slot` of the selected table."""
+
+        data_bytes = item.to_bytes(self.item_bytes, 'little')
+
+        self.writes.append((ADDR_REG, slot))
+        for k in range(self.data_words):
+            self.writes.append((DATA_REG, int.from_bytes(data_bytes[MI_BYTES * k: MI_BYTES * (k + 1)], 'little')))
+        self.writes.append((COMMIT_REG, 0))
+
+        self.records += 1
+
+    def delta(self, current: list, desired: list, hitless: bool = True) -> dict:
+        """Writes only items that differ between current and desired content of the tables.
+
+        With `hitless` ordering, a key never misses during the update: a key moving to the other table is written
+        to its new position before the position it leaves is overwritten. Keys whose moves depend on each other
+        in a cycle (two keys swapping their positions between the tables) can't be ordered this way, their
+        changes are written last and the keys may miss for the time of one write.
+
+        Args:
+            current: content of both tables in the component (lists of items).
+            desired: content of both tables after the update.
+            hitless: order the writes so no key misses (otherwise they are ordered by table and position).
+
+        Returns:
+            dictionary with number of adds, replacements, removals and unordered changes (keys that may miss).
+
+        """
+
+        changes = [
+            (t, slot, old, new)
+            for t in range(len(desired))
+            for slot, (old, new) in enumerate(zip(current[t], desired[t]))
+            if old != new and (old & 1 or new & 1)
+        ]
+
+        order = range(len(changes))
+        unordered = list()
+        if hitless:
+            order, unordered = self._hitless_order(changes)
+
+        table = None
+        for i in order:
+            t, slot, old, new = changes[i]
+            if t != table:
+                self.select(t)
+                table = t
+            self.write_item(slot, new)
+
+        return {
+            "adds": sum(1 for c in changes if not c[2] & 1),
+            "replacements": sum(1 for c in changes if c[2] & 1 and c[3] & 1),
+            "removals": sum(1 for c in changes if not c[3] & 1),
+            "unordered": len(unordered),
+        }
+
+    def _hitless_order(self, changes: list) -> (list, list):
+        # Position where each key is written
+        new_pos = {self.item_key(new): i for i, (t, slot, old, new) in enumerate(changes) if new & 1}
+
+        # Change overwriting a valid key waits for the change writing that key to its new position
+        children = dict()
+        waiting = [False] * len(changes)
+        for i, (_t, _slot, old, new) in enumerate(changes):
+            if not old & 1 or (new & 1 and self.item_key(old) == self.item_key(new)):
+                continue
+            j = new_pos.get(self.item_key(old))
+            if j is not None and j != i:
+                children.setdefault(j, list()).append(i)
+                waiting[i] = True
+
+        # Adds first, then replacements and removals
+        kind = [(0 if not old & 1 else 1 if new & 1 else 2) for t, slot, old, new in changes]
+        queue = sorted((i for i in range(len(changes)) if not waiting[i]), key=lambda i: kind[i], reverse=True)
+        order = list()
+
+        while len(queue) > 0:
+            i = queue.pop()
+            order.append(i)
+            for c in children.get(i, []):
+                waiting[c] = False
+                queue.append(c)
+
+        unordered = [i for i in range(len(changes)) if waiting[i]]
+        return order + unordered, unordered
+
+    def bursts(self) -> list:
+        """Groups writes into bursts of consecutive registers.
+
+        Returns:
+            list of (address, [values]) pairs, each burst writes values to address, address + 4, ...
+
+        """
+
+        res = list()
+        for addr, value in self.writes:
+            if len(res) > 0 and res[-1][0] + MI_BYTES * len(res[-1][1]) == addr:
+                res[-1][1].append(value)
+            else:
+                res.append((addr, [value]))
+
+        return res
+
+    def issue(self, comp, bulk: bool = None) -> dict:
+        """Issues the stream to the component.
+
+        Args:
+            comp: component handle (nfb.Comp).
+            bulk: use bulk writes of the handle for bursts of consecutive registers. By default, when the handle
+                supports them (write method).
+
+        Returns:
+            dictionary with number of records, MI writes, issued transactions and commit time [s].
+
+        """
+
+        if bulk is None:
+            bulk = callable(getattr(comp, "write", None))
+
+        if bulk:
+            bursts = self.bursts()
+            payloads = [(addr, b''.join(v.to_bytes(MI_BYTES, 'little') for v in values) if len(values) > 1 else values[0]) for addr, values in bursts]
+
+            start = time.perf_counter()
+            for addr, payload in payloads:
+                if isinstance(payload, bytes):
+                    comp.write(addr, payload)
+                else:
+                    comp.write32(addr, payload)
+            duration = time.perf_counter() - start
+
+            transactions = len(bursts)
+
+        else:
+            start = time.perf_counter()
+            for addr, value in self.writes:
+                comp.write32(addr, value)
+            duration = time.perf_counter() - start
+
+            transactions = len(self.writes)
+
+        return {
+            "records": self.records,
+            "writes": len(self.writes),
+            "transactions": transactions,
+            "bulk": bulk,
+            "time": duration,
+        }
+
+    def replay(self, table_capacity: int, tables: list = None) -> list:
+        """Applies the stream to a model of the table write path of the component (used for verification).
+
+        Args:
+            table_capacity: number of items in each table.
+            tables: content of both tables before the stream (empty tables by default).
+
+        Returns:
+            content of both tables after the stream (lists of items).
+
+        """
+
+        tables = [list(t) for t in tables] if tables is not None else [[0] * table_capacity for _ in range(2)]
+        reg_width = self.data_words * MI_BYTES * 8
+        item_mask = (1 << (self.mvb_key_width + self.data_out_width + 1)) - 1
+        choice, addr, data = 0, 0, 0
+
+        for reg, value in self.writes:
+            if reg == COMMAND_REG:
+                choice = value & 1
+                if value & CLEAR_TABLES:
+                    tables = [[0] * table_capacity for _ in range(2)]
+            elif reg == ADDR_REG:
+                addr = value
+            elif reg == DATA_REG:
+                data = (value << (reg_width - MI_BYTES * 8)) | (data >> (MI_BYTES * 8))
+            elif reg == COMMIT_REG:
+                tables[choice][addr] = data & item_mask
+
+        return tables
+
+
+def read_config(comp) -> list:
+    """Reads configuration registers (MVB_ITEMS, MVB_KEY_WIDTH, DATA_OUT_WIDTH, HASH_WIDTH, HASH_KEY_WIDTH,
+    TABLE_CAPACITY) using one bulk read if the handle supports it."""
+
+    if callable(getattr(comp, "read", None)):
+        raw = comp.read(CONFIG_ADDR, CONFIG_REGS * MI_BYTES)
+        return [int.from_bytes(raw[MI_BYTES * i: MI_BYTES * (i + 1)], 'little') for i in range(CONFIG_REGS)]
+
+    return [comp.read32(CONFIG_ADDR + MI_BYTES * i) for i in range(CONFIG_REGS)]
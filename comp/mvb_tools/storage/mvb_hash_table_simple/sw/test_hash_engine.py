@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+# test_hash_engine.py: Equivalence test and benchmark of the integer hash engine
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Checks that hash_engine is bit-exact with the cocotb LogicArray model of the hash functions and measures its speed.
+
+Usage:
+    python3 -m pytest -sv test_hash_engine.py
+
+"""
+
+import os
+import glob
+import time
+import random
+
+import numpy as np
+import pytest
+import yaml
+
+from hash_engine import HashEngine, toeplitz_hash, simple_xor_hash, toeplitz_hash_batch, simple_xor_hash_batch
+
+LogicArray = pytest.importorskip("cocotb.types").LogicArray
+Range = pytest.importorskip("cocotb.types").Range
+
+
+def ref_toeplitz_hash(mvb_key: int, params: dict) -> int:
+    """Reference model of the toeplitz hash function (original LogicArray implementation)."""
+
+    hash_key = params["hash_key"]
+    mvb_key_width = params["mvb_key_width"]
+    hash_key_width = params["hash_key_width"]
+    hash_width = params["hash_width"]
+
+    hash_key_bits = LogicArray(hash_key, Range(hash_key_width-1, 'downto', 0))
+    mvb_key_bits = LogicArray(mvb_key, Range(mvb_key_width-1, 'downto', 0))
+    hash_bits = LogicArray(0, Range(hash_width-1, 'downto', 0))
+
+    for i in Range(mvb_key_width-1, 'downto', 0):
+        key_slice = hash_key_bits[hash_key_width-(mvb_key_width-1-i)-1 : hash_key_width-hash_width-(mvb_key_width-1-i)]
+        key_hash = LogicArray(0, Range(hash_width-1, 'downto', 0))
+
+        if mvb_key_bits[i]:
+            key_hash = key_slice
+
+        hash_bits = hash_bits ^ key_hash
+
+    return hash_bits.to_unsigned()
+
+
+def ref_simple_xor_hash(mvb_key: int, params: dict) -> int:
+    """Reference model of the simple xor hash function (original LogicArray implementation)."""
+
+    hash_key = params["hash_key"]
+    mvb_key_width = params["mvb_key_width"]
+    hash_key_width = params["hash_key_width"]
+    hash_width = params["hash_width"]
+
+    hash_key_bits = LogicArray(hash_key, Range(hash_key_width, 'downto', 0))
+    mvb_key_bits = LogicArray(mvb_key, Range(mvb_key_width, 'downto', 0))
+
+    hash_bits = mvb_key_bits[hash_width-1 : 0] ^ hash_key_bits[hash_width-1 : 0]
+
+    return hash_bits.to_unsigned()
+
+
+def load_params():
+    """Toolkit defaults and parametres of all prepared test configurations."""
+
+    params = [{"hash_key": 2534237992, "mvb_key_width": 8, "hash_key_width": 32, "hash_width": 8}]
+
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cocotb", "test_configs")
+    for path in sorted(glob.glob(os.path.join(folder, "*.yaml"))):
+        with open(path, 'r') as fp:
+            conf = yaml.safe_load(fp)["mvb_hash_table_simple"]
+        params.append({k: conf[k] for k in ("hash_key", "mvb_key_width", "hash_key_width", "hash_width")})
+
+    return params
+
+
+def sample_keys(params: dict, count: int = 2000) -> list:
+    """All keys for narrow keys, otherwise corner cases, one-hot keys and random keys."""
+
+    width = params["mvb_key_width"]
+    if width <= 10:
+        return list(range(2 ** width))
+
+    rand = random.Random(width)
+    keys = [0, 2 ** width - 1] + [1 << i for i in range(width)]
+    keys += [rand.getrandbits(width) for _ in range(count)]
+    return keys
+
+
+Params = load_params()
+ParamIds = [f"k{p['mvb_key_width']}_h{p['hash_width']}_hk{p['hash_key_width']}" for p in Params]
+
+
+@pytest.mark.parametrize("params", Params, ids=ParamIds)
+def test_toeplitz_equivalence(params):
+    keys = sample_keys(params)
+    ref = [ref_toeplitz_hash(k, params) for k in keys]
+
+    assert [toeplitz_hash(k, params) for k in keys] == ref
+    assert toeplitz_hash_batch(keys, params).tolist() == ref
+
+
+@pytest.mark.parametrize("params", Params, ids=ParamIds)
+def test_simple_xor_equivalence(params):
+    keys = sample_keys(params)
+    ref = [ref_simple_xor_hash(k, params) for k in keys]
+
+    assert [simple_xor_hash(k, params) for k in keys] == ref
+    assert simple_xor_hash_batch(keys, params).tolist() == ref
+
+
+@pytest.mark.parametrize("params", Params, ids=ParamIds)
+def test_batch_equivalence(params):
+    # Whole key space (up to 2^16 keys) of the batch variants against the scalar ones
+    width = params["mvb_key_width"]
+    keys = np.arange(2 ** min(width, 16), dtype=np.uint64)
+    if width > 16:
+        keys |= np.uint64(random.Random(0).getrandbits(width - 16) << 16)
+
+    engine = HashEngine.from_params(params)
+    assert engine.toeplitz_batch(keys).tolist() == [engine.toeplitz(int(k)) for k in keys]
+    assert engine.simple_xor_batch(keys).tolist() == [engine.simple_xor(int(k)) for k in keys]
+
+
+def test_wide_keys():
+    # Keys wider than 64 bits fall back to the scalar implementation
+    params = {"hash_key": random.Random(1).getrandbits(128), "mvb_key_width": 96, "hash_key_width": 128, "hash_width": 12}
+    keys = [random.Random(2).getrandbits(96) for _ in range(50)]
+
+    assert toeplitz_hash_batch(keys, params).tolist() == [ref_toeplitz_hash(k, params) for k in keys]
+    assert simple_xor_hash_batch(keys, params).tolist() == [ref_simple_xor_hash(k, params) for k in keys]
+
+
+def test_short_hash_key():
+    with pytest.raises(ValueError):
+        HashEngine(0, mvb_key_width=32, hash_key_width=32, hash_width=8)
+
+
+def measure(func, repeat: int = 3) -> float:
+    res = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        duration = time.perf_counter() - start
+        res = duration if res is None else min(res, duration)
+    return res
+
+
+def test_benchmark():
+    params = next(p for p in Params if p["mvb_key_width"] == 16)
+    keys = list(range(2 ** 12))
+    all_keys = np.arange(2 ** 16)
+
+    ref = measure(lambda: [ref_toeplitz_hash(k, params) for k in keys], repeat=1)
+    scalar = measure(lambda: [toeplitz_hash(k, params) for k in keys])
+    batch = measure(lambda: toeplitz_hash_batch(keys, params))
+    batch_all = measure(lambda: toeplitz_hash_batch(all_keys, params))
+
+    print(f"\ntoeplitz hash of {len(keys)} 16 bit keys:")
+    print(f"    LogicArray model: {ref * 1000:10.3f} ms")
+    print(f"    integer:          {scalar * 1000:10.3f} ms ({ref / scalar:.0f}x)")
+    print(f"    NumPy batch:      {batch * 1000:10.3f} ms ({ref / batch:.0f}x)")
+    print(f"    NumPy batch of the whole 2^16 key space: {batch_all * 1000:.3f} ms")
+
+    assert scalar < ref
+    assert batch < scalar
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+# test_placement.py: Tests of the placement solver of MVB_HASH_TABLE_SIMPLE
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Checks that the cuckoo placement of keys is valid and reaches the achievable number of placed keys.
+
+Usage:
+    python3 -m pytest -sv test_placement.py
+
+"""
+
+import pytest
+
+from hash_engine import toeplitz_hash, simple_xor_hash
+from placement import PlacementSolver
+
+Params = {"hash_key": 2534237992, "mvb_key_width": 16, "hash_key_width": 32, "hash_width": 8}
+
+
+def check_positions(placement, num_of_tables: int) -> None:
+    """Each placed key is at its hash position and no position is used twice."""
+
+    hashes = [toeplitz_hash, simple_xor_hash]
+    used = set()
+    for key, (table, pos) in placement.positions.items():
+        assert table < num_of_tables
+        assert pos == hashes[table](key, Params)
+        assert (table, pos) not in used
+        used.add((table, pos))
+
+
+@pytest.mark.parametrize("num_of_tables", [1, 2])
+@pytest.mark.parametrize("count", [100, 600])
+def test_solve_max_placed(num_of_tables, count):
+    solver = PlacementSolver(Params, 256, num_of_tables)
+    keys = list(range(count))
+    placement = solver.solve(keys)
+
+    check_positions(placement, num_of_tables)
+    assert placement.placed() == solver.max_placed(keys)
+    assert placement.placed() + len(placement.unplaced) == len(keys)
+    assert sorted(sum(placement.tables(num_of_tables), [])) == sorted(placement.positions)
+
+
+def test_single_table():
+    placement = PlacementSolver(Params, 256, 1).solve(range(600))
+
+    assert placement.placed() == len({toeplitz_hash(key, Params) for key in range(600)})
+    assert placement.tables(1) == [list(placement.positions)]
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+# test_table_model.py: Tests of the in-memory model of MVB_HASH_TABLE_SIMPLE tables
+# Copyright (C) 2024 CESNET z. s. p. o.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Checks the indexed model of the tables against a brute-force model of the component lookup.
+
+Usage:
+    python3 -m pytest -sv test_table_model.py
+
+"""
+
+import os
+import glob
+import random
+
+import pytest
+
+from hash_engine import toeplitz_hash, simple_xor_hash
+from table_model import HashTableModel
+
+
+def new_model() -> HashTableModel:
+    return HashTableModel(2534237992, mvb_key_width=16, data_out_width=8, hash_key_width=32, table_capacity=256)
+
+
+def ref_lookup(model: HashTableModel, key: int):
+    """Lookup of the key by scanning the whole content of the tables."""
+
+    images = model.images()
+    hashes = [toeplitz_hash(key, model.params), simple_xor_hash(key, model.params)]
+    for i in range(model.num_of_tables):
+        item = images[i][hashes[i]]
+        if item & 1 and item >> (model.data_out_width + 1) == key:
+            return (item >> 1) & ((1 << model.data_out_width) - 1)
+    return None
+
+
+def test_random_operations():
+    model = new_model()
+    rand = random.Random(0)
+    stored = dict()
+
+    for _ in range(3000):
+        key = rand.getrandbits(10)
+        if key in stored and rand.random() < 0.5:
+            model.remove(key)
+            del stored[key]
+        elif key in stored:
+            stored[key] = rand.getrandbits(8)
+            model.replace(key, stored[key])
+        else:
+            try:
+                model.add(key, stored.setdefault(key, rand.getrandbits(8)))
+            except ValueError:
+                del stored[key]
+
+    assert len(model) == len(stored) == sum(len(t) for t in model.tables)
+    assert {key: data for t, slot, key, data in model.records()} == stored
+    for key in range(2 ** 10):
+        assert model.lookup(key) == ref_lookup(model, key) == stored.get(key)
+
+
+def test_add_errors():
+    model = new_model()
+    t, slot = model.add(1, 2, "xor")
+
+    assert (t.name, slot) == ("SIMPLE_XOR", simple_xor_hash(1, model.params))
+    with pytest.raises(ValueError):
+        model.add(1, 3)
+    with pytest.raises(ValueError):
+        model.add(2 ** 16, 0)
+    with pytest.raises(ValueError):
+        model.add(2, 256)
+    with pytest.raises(KeyError):
+        model.remove(2)
+
+
+def test_remove_slot_and_clear():
+    model = new_model()
+    t, slot = model.add(5, 6)
+
+    assert model.remove_slot("toeplitz", slot) == 5
+    assert model.remove_slot("toeplitz", slot) is None
+    assert model.lookup(5) is None
+
+    model.add(5, 6)
+    model.add(7, 8, "xor")
+    model.clear("toeplitz")
+    assert list(model.records())[0][2:] == (7, 8)
+    model.clear()
+    assert len(model) == 0
+
+
+def test_set_hash_key():
+    model = new_model()
+    for key in range(100):
+        try:
+            model.add(key, key)
+        except ValueError:
+            pass
+
+    stored = {key: data for t, slot, key, data in model.records()}
+    failed = model.set_hash_key(0x12345678)
+
+    assert len(model) + len(failed) == len(stored)
+    for _t, _slot, key, data in model.records():
+        assert model.lookup(key) == data == stored[key]
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cocotb", "test_configs", "*.yaml"))))
+def test_config_roundtrip(path, tmp_path):
+    model = HashTableModel.load(path)
+    model.save(tmp_path / "config.yaml")
+    loaded = HashTableModel.load(tmp_path / "config.yaml")
+
+    assert loaded.to_config() == model.to_config()
+    assert loaded.images() == model.images()
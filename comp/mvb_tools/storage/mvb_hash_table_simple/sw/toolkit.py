@@ -23,25 +23,31 @@ Arguments:
 """
 
 import nfb
-from cocotb.types import LogicArray, Range
-from cocotbext.ofm.utils.math import ceildiv
 import colorama
 import sys
-from math import log2
+import numpy as np
 import yaml
 
+try:
+    from .hash_engine import toeplitz_hash, simple_xor_hash, batch_hash_functions
+    from .table_writer import WriteStream, read_config
+    from .placement import PlacementSolver, load_config
+    from .table_model import HashTableModel
+except ImportError:
+    from hash_engine import toeplitz_hash, simple_xor_hash, batch_hash_functions
+    from table_writer import WriteStream, read_config
+    from placement import PlacementSolver, load_config
+    from table_model import HashTableModel
+
 
 class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
     """Class used for creating, editing and applying configuration files for MVB_HASH_TABLE_SIMPLE component.
 
     Atributes:
         conected_to_comp(bool): if connection to component by loading a device tree was sucessfully established
+        model: indexed model of records in the tables (see table_model.py).
         hash_key, mvb_key_width, data_out_width, table_capacity, hash_width, hash_key_width, num_of_tables: configuration parametres of connected MVB_HASH_TABLE_SIMPLE. If none is connected, default values for MVB_HASH_TABLE_SIMPLE.
         hash_func_params: dictionary of component parametres for hash functions
-        t_hash_table, x_hash_table: lists of all data to be saved to hash tables.
-        t_keys, x_keys: lists of MVB keys that have data adjacent to them in the respective hash tables.
-        t_used, x_used: number of occupied positions in the respective hash tables.
-        t_params, x_params: list including all the params above plus the name of the table.
         commands: dictionary of all commands that can be used in interactive mode.
 
     """
@@ -72,34 +78,22 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
     def __init__(self, inter=False, mod_path="", **kwargs) -> None:
         self._name = "MVB_HASH_TABLE_SIMPLE"
 
-        self.hash_key = 2534237992  # 10884469298454947624
-
         """Setting defaults to component configuration parametres."""
         self.conected_to_comp = False
-        self.mvb_key_width = 8
-        self.data_out_width = 8
-        self.table_capacity = 256
-        self.hash_width = int(log2(self.table_capacity))
-        self.hash_key_width = 32
-        self.num_of_tables = 2
-
-        self.hash_func_params = {
-            "hash_key": self.hash_key,
-            "mvb_key_width": self.mvb_key_width,
-            "hash_key_width": self.hash_key_width,
-            "hash_width": self.hash_width
-        }
+        self.model = HashTableModel(
+            hash_key=2534237992,  # 10884469298454947624
+            mvb_key_width=8,
+            data_out_width=8,
+            hash_key_width=32,
+            table_capacity=256,
+            num_of_tables=2,
+        )
 
-        """Setting script parametres."""
-        self.t_keys = list()
-        self.t_hash_table = self.table_capacity * [[False, 0]]
-        self.t_used = 0
-        self.t_params = ["TOEPLITZ", toeplitz_hash, self.t_keys, self.t_hash_table, self.t_used]
+        self.commit_stats = None
 
-        self.x_keys = list()
-        self.x_hash_table = self.table_capacity * [[False, 0]]
-        self.x_used = 0
-        self.x_params = ["SIMPLE_XOR", simple_xor_hash, self.x_keys, self.x_hash_table, self.x_used]
+        """Shadow copy of the configuration programmed in the component (None until the first commit)."""
+        self.hw_tables = None
+        self.hw_hash_key = None
 
         self.commands = {
             "add": self.comm_add,
@@ -110,6 +104,7 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
             "commit": self.comm_commit,
             "save": self.comm_save,
             "load": self.comm_load,
+            "place": self.comm_place,
             "hash": self.comm_hash,
             "testkey": self.comm_testkey,
             "comparehashes": self.comm_comparehashes,
@@ -138,20 +133,37 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
         else:
             self.comm_commit(silent=True)
 
-    def get_params(self, table: str) -> list:
-        """Gets parametres of the requested table.
-            Args:
-                table: name of the table
+    @property
+    def hash_key(self) -> int:
+        return self.model.hash_key
 
-            Returns:
-                parametres of the chosen table
+    @property
+    def mvb_key_width(self) -> int:
+        return self.model.mvb_key_width
 
-        """
+    @property
+    def data_out_width(self) -> int:
+        return self.model.data_out_width
 
-        params = self.t_params if table == "toeplitz" else None
-        params = self.x_params if table == "xor" else params
+    @property
+    def table_capacity(self) -> int:
+        return self.model.table_capacity
 
-        return params
+    @property
+    def hash_width(self) -> int:
+        return self.model.hash_width
+
+    @property
+    def hash_key_width(self) -> int:
+        return self.model.hash_key_width
+
+    @property
+    def num_of_tables(self) -> int:
+        return self.model.num_of_tables
+
+    @property
+    def hash_func_params(self) -> dict:
+        return self.model.params
 
     def adapt_type(self, data):
         try:
@@ -163,27 +175,17 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
             return str(data)
 
     def get_hw_config(self) -> None:
-        """Reads configuration of the connected MVB_HASH_TABLE_SIMPLE component"""
-
-        self.mvb_key_width = self._comp.read32(self._MVB_KEY_WIDTH)
-        self.data_out_width = self._comp.read32(self._DATA_OUT_WIDTH)
-        self.hash_width = self._comp.read32(self._HASH_WIDTH)
-        self.hash_key_width = self._comp.read32(self._HASH_KEY_WIDTH)
-        self.table_capacity = self._comp.read32(self._TABLE_CAPACITY)
-
-        self.hash_func_params = {
-            "hash_key": self.hash_key,
-            "mvb_key_width": self.mvb_key_width,
-            "hash_key_width": self.hash_key_width,
-            "hash_width": self.hash_width
-        }
-
-        self.hash_func_params = {
-            "hash_key": self.hash_key,
-            "mvb_key_width": self.mvb_key_width,
-            "hash_key_width": self.hash_key_width,
-            "hash_width": self.hash_width
-        }
+        """Reads configuration of the connected MVB_HASH_TABLE_SIMPLE component (records in the tables are dropped)."""
+
+        self.model = HashTableModel(
+            hash_key=self.hash_key,
+            mvb_key_width=self._comp.read32(self._MVB_KEY_WIDTH),
+            data_out_width=self._comp.read32(self._DATA_OUT_WIDTH),
+            hash_key_width=self._comp.read32(self._HASH_KEY_WIDTH),
+            table_capacity=self._comp.read32(self._TABLE_CAPACITY),
+            num_of_tables=self.num_of_tables,
+            hash_width=self._comp.read32(self._HASH_WIDTH),
+        )
 
     def test_key(self, hash_function) -> int:
         """Tests the requested hash function for internal collisions caused by the key, where collision is a situation,
@@ -198,18 +200,9 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
 
         """
 
-        hashes = list()
-        collisions = 0
-
-        for i in range(self.table_capacity):
-            h = hash_function(i, self.hash_func_params)
+        hashes = self.hash_batch(hash_function, np.arange(self.table_capacity))
 
-            if h in hashes:
-                collisions += 1
-            else:
-                hashes.append(h)
-
-        return collisions
+        return self.table_capacity - len(np.unique(hashes))
 
     def test_collisions(self, hash_function1, hash_function2) -> list:
         """Tests collisions between two different hash functions, where collision is a situation, where for the same key both
@@ -223,13 +216,28 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
 
         """
 
-        collisions = list()
+        keys = np.arange(self.table_capacity)
+        hashes1 = self.hash_batch(hash_function1, keys)
+        hashes2 = self.hash_batch(hash_function2, keys)
+
+        return [f"{i} -> {hashes1[i]}" for i in np.flatnonzero(hashes1 == hashes2)]
+
+    def hash_batch(self, hash_function, keys) -> np.ndarray:
+        """Calculates hashes of an array of keys, using the vectorized variant of the hash function if there is one.
+
+        Args:
+            hash_function: reference to a function used for calculating the hash.
+            keys: array of MVB keys.
+
+        Returns:
+            Array of hashes.
+
+        """
 
-        for i in range(self.table_capacity):
-            if hash_function1(i, self.hash_func_params) == hash_function2(i, self.hash_func_params):
-                collisions.append(f"{i} -> {hash_function1(i, self.hash_func_params)}")
+        if hash_function in batch_hash_functions:
+            return batch_hash_functions[hash_function](keys, self.hash_func_params)
 
-        return collisions
+        return np.array([hash_function(int(k), self.hash_func_params) for k in keys])
 
     def command_line(self) -> None:
         """Main interface of the interactive mode used to input commands. Runs until the 'exit' or 'quit' commands.
@@ -253,7 +261,7 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
                 except Exception:
                     self.error()
 
-    def comm_add(self, key: int = None, data: int = None, table: str = "toeplitz", recurse=False) -> None:
+    def comm_add(self, key: int = None, data: int = None, table: str = "toeplitz") -> None:
         """Adds a value to a chosen table, the position of the value is decided by the hash of the key.
 
         Args:
@@ -261,64 +269,47 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
             is calculated from this number.
             data: value to be added to the table.
             table: decided to which table is the value to be added to. Toeplitz table is chosen by default, other option is
-            'xor' for adding to the simple xor table.
+            'xor' for adding to the simple xor table. If the position is occupied, the other table is tried.
 
         """
         if key is None or data is None:
-            print(f"{colorama.Fore.RED}{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL}{colorama.Style.RESET_ALL} Invalid arguments. Usage of add: add (key) (data) (table=[*toeplitz, xor]).")
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of add: add (key) (data) (table=[*toeplitz, xor]).")
             return
 
-        try:
-            key.to_bytes(self.mvb_key_width // 8, 'little')
-        except Exception:
-            print(f"{colorama.Fore.RED}{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL}{colorama.Style.RESET_ALL} Key value {key} can't be represented on {self.mvb_key_width} bits.")
-            return
+        first = self.model.table(table)
 
-        try:
-            data.to_bytes(self.data_out_width // 8, 'little')
-        except Exception:
-            print(f"{colorama.Fore.RED}{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL}{colorama.Style.RESET_ALL} Data value {data} can't be represented on {self.data_out_width} bits.")
+        if first is None:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are toeplitz, xor.")
             return
 
-        if key in self.t_keys or key in self.x_keys:
-            print(f"{colorama.Fore.RED}{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL}{colorama.Style.RESET_ALL} Key already in use.")
+        try:
+            self.model.check(key, data)
+        except ValueError as e:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} {e}")
             return
 
-        params = self.get_params(table)
-
-        if params is None:
-            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are both, toeplitz, xor.")
+        if key in self.model:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Key already in use.")
             return
 
-        name = params[0]
-        hash_function = params[1]
-        keys = params[2]
-        hash_table = params[3]
-        used = params[4]
-
-        if used < self.table_capacity:
-            hash_key = hash_function(key, self.hash_func_params)
+        try:
+            t, slot = self.model.add(key, data, first.name)
 
-            if hash_table[hash_key][0] is False:
-                keys.append(key)
-                hash_table[hash_key] = [True, data]
+        except ValueError as e:
+            if self.num_of_tables == 1:
+                print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} {e} You can use replace (table=[toeplitz, xor]) (record_num) (key) (data) to replace it or remove (mode=[record, hash]) (table=[toeplitz, xor]) (num) to delete it.")
+                return
 
-                used += 1
-                self.t_params[4] += 1 if table == "toeplitz" else 0
-                self.x_params[4] += 1 if table == "xor" else 0
+            second = self.model.tables[1 - self.model.tables.index(first)]
+            print(f"{colorama.Fore.RED}Warning:{colorama.Style.RESET_ALL} {e} Trying to save into the {second.name} table.")
 
-                print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Record number {used - 1} sucessfully added to position {hash_key} in {name} TABLE.")
+            try:
+                t, slot = self.model.add(key, data, second.name)
+            except ValueError as e:
+                print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} {e} You can save it to a different one or use replace (table=[toeplitz, xor]) (record_num) (key) (data) to replace it or remove (mode=[record, hash]) (table=[toeplitz, xor]) (num) to delete it.")
+                return
 
-            else:
-                if self.num_of_tables == 1 or recurse:
-                    print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Record can't be added, position {hash_key} in {name} TABLE is already occupied. You can save it to a different one or use replace (table=[toeplitz, xor]) (record_num) (key) (data) to replace it or remove (mode=[record, hash]) (table=[toeplitz, xor]) (num) to delete it.")
-                    return
-                else:
-                    sec_table = "xor" if table == "toeplitz" else "toeplitz"
-                    print(f"{colorama.Fore.RED}Warning:{colorama.Style.RESET_ALL} Record can't be added, position {hash_key} in {name} TABLE is already occupied. Trying to save into the {self.get_params(sec_table)[0]} table.")
-                    self.comm_add(key, data, sec_table, recurse=True)
-        else:
-            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Record can't be added, because {name} TABLE is full. You can save it to a different one or use replace (table=[toeplitz, xor]) (record_num) (key) (data)  or remove (mode=[record, hash]) (table=[toeplitz, xor]) (num) to make space.")
+        print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Record number {len(t) - 1} sucessfully added to position {slot} in {t.name} TABLE.")
 
     def comm_list(self, mode: str = None, table: str = "both") -> None:
         """Lists the contents of the table(s).
@@ -329,54 +320,35 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
 
         """
 
-        if mode is None:
+        if mode not in ("records", "table"):
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of list: list (mode=[records, table]) (table=[*both, toeplitz, xor]).")
             return
 
-        params = [self.t_params, self.x_params] if table == "both" else None
-        params = [self.t_params] if table == "toeplitz" else params
-        params = [self.x_params] if table == "xor" else params
+        tables = self.model.tables if table == "both" else [self.model.table(table)]
 
-        if params is None:
+        if tables[0] is None:
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are both, toeplitz, xor.")
             return
 
-        for i in range(len(params)):
-            name = params[i][0]
-            hash_function = params[i][1]
-            keys = params[i][2]
-            hash_table = params[i][3]
-            used = params[i][4]
+        for t in tables:
+            lines = [f"\n{colorama.Fore.GREEN  + colorama.Style.BRIGHT}{t.name} TABLE:{colorama.Style.RESET_ALL}"]
 
             if mode == "records":
-                print(f"\n{colorama.Fore.GREEN  + colorama.Style.BRIGHT}{name} TABLE:{colorama.Style.RESET_ALL}")
-
-                if used == 0:
-                    print("No records.\n")
+                if len(t) == 0:
+                    print(lines[0] + "\nNo records.\n")
                     continue
 
-                for j in range(used):
-                    hash_key = hash_function(keys[j], self.hash_func_params)
-                    print(f"\n{colorama.Fore.BLUE  + colorama.Style.BRIGHT}RECORD {j}:{colorama.Style.RESET_ALL}\n\tPOSITION = {hash_key}\n\tKEY = {keys[j]}\n\tDATA = {hash_table[hash_key][1]}")
-
-                print(f"\n {colorama.Fore.BLUE  + colorama.Style.BRIGHT}{used} used, {self.table_capacity - used} free.{colorama.Style.RESET_ALL}\n")
-
-            elif mode == "table":
-                print(f"\n{colorama.Fore.GREEN  + colorama.Style.BRIGHT}{name} TABLE:{colorama.Style.RESET_ALL}\n")
-
-                for j in range(self.table_capacity):
-                    if hash_table[j][0]:
-                        color = colorama.Fore.GREEN
-                    else:
-                        color = colorama.Fore.RED
-
-                    print(f"{color}{j}: VALID = {hash_table[j][0]} ; DATA = {hash_table[j][1]}")
-
-                print(f"\n {colorama.Fore.BLUE + colorama.Style.BRIGHT}{used} used, {self.table_capacity - used} free.{colorama.Style.RESET_ALL}\n")
+                for j, (slot, key, data) in enumerate(t.records()):
+                    lines.append(f"\n{colorama.Fore.BLUE  + colorama.Style.BRIGHT}RECORD {j}:{colorama.Style.RESET_ALL}\n\tPOSITION = {slot}\n\tKEY = {key}\n\tDATA = {data}")
 
             else:
-                print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of list: list (mode=[records, table]) (table=[*both, toeplitz, xor]).")
-                return
+                lines.append("")
+                for j in range(t.capacity):
+                    color = colorama.Fore.GREEN if t.valid[j] else colorama.Fore.RED
+                    lines.append(f"{color}{j}: VALID = {bool(t.valid[j])} ; DATA = {t.data[j] if t.valid[j] else 0}")
+
+            lines.append(f"\n {colorama.Fore.BLUE + colorama.Style.BRIGHT}{len(t)} used, {t.free()} free.{colorama.Style.RESET_ALL}\n")
+            print("\n".join(lines))
 
     def comm_replace(self, table: str = None, record_num: int = None, key: str = None, data: str = None) -> None:
         """Replaces record with a diffent one.
@@ -393,33 +365,41 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of replace: replace (table=[toeplitz, xor]) (num) (key) (data).")
             return
 
-        params = self.get_params(table)
+        t = self.model.table(table)
 
-        if params is None:
-            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are both, toeplitz, xor.")
+        if t is None:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are toeplitz, xor.")
             return
 
-        name = params[0]
-        hash_function = params[1]
-        keys = params[2]
-        hash_table = params[3]
-        used = params[4]
+        old_key = t.key_of_record(record_num)
 
-        if record_num < used:
-            hash_key = hash_function(key, self.hash_func_params)
+        if old_key is None:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Record {record_num} is out of range of 0:{len(t) - 1} indexes of records.")
+            return
 
-            self.comm_remove("record", table, record_num, silent=True)
+        try:
+            self.model.check(key, data)
+        except ValueError as e:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} {e}")
+            return
 
-            keys.insert(record_num, key)
-            hash_table[hash_key] = [True, data]
+        if key != old_key and key in self.model:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Key already in use.")
+            return
 
-            self.t_params[4] += 1 if table == "toeplitz" else 0
-            self.x_params[4] += 1 if table == "xor" else 0
+        slot = t.hash(key)
 
-            print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Record number {record_num} sucessfully ovewritten and added to position {hash_key} in {name} TABLE.")
+        if t.valid[slot] and t.keys[slot] != old_key:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Record can't be added, position {slot} in {t.name} TABLE is already occupied.")
+            return
 
+        if key == old_key:
+            self.model.replace(key, data)
         else:
-            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Record {record_num} is out of range of 0:{self.t_used - 1} indexes of records.")
+            self.model.remove(old_key)
+            self.model.add(key, data, t.name)
+
+        print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Record number {record_num} sucessfully ovewritten and added to position {slot} in {t.name} TABLE.")
 
     def comm_remove(self, mode: str = None, table: str = None, num: int = None, silent: bool = False) -> None:
         """Removes record from the chosen table, or data directly from the table and the tied record.
@@ -436,51 +416,35 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of remove: remove (mode=[record, hash]) (table=[toeplitz, xor]) (num).")
             return
 
-        params = self.get_params(table)
+        t = self.model.table(table)
 
-        if params is None:
-            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are both, toeplitz, xor.")
+        if t is None:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are toeplitz, xor.")
             return
 
-        hash_function, keys, hash_table, used = params[1:5]
-
         if mode == "record":
-            if num < used:
-                hash_key = hash_function(keys[num], self.hash_func_params)
-                hash_table[hash_key][0] = False
-                del keys[num]
+            key = t.key_of_record(num)
 
-                self.t_params[4] -= 1 if table == "toeplitz" else 0
-                self.x_params[4] -= 1 if table == "xor" else 0
+            if key is not None:
+                self.model.remove(key)
 
                 if not silent:
                     print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Record {num} successfully removed.")
 
             else:
-                print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Record {num} is out of range of 0:{used - 1} indexes of records.")
+                print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Record {num} is out of range of 0:{len(t) - 1} indexes of records.")
 
         elif mode == "hash":
-            if num < self.table_capacity:
-                if hash_table[num][0] is True:
-                    hash_table[num][0] = False
-
-                    for i in range(used):
-                        # print(f"DEBUG: self.t_keys: {self.t_keys}")
-                        # print(f"DEBUG: i: {i}, self.t_keys[{i}] = {self.t_keys[i]}")
-                        if num == hash_function(keys[i], self.hash_func_params):
-                            del keys[i]
-                            break
-
-                    self.t_params[4] -= 1 if table == "toeplitz" else 0
-                    self.x_params[4] -= 1 if table == "xor" else 0
-
-                    print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Record on position {num} successfully removed.")
+            if 0 <= num < t.capacity:
+                if self.model.remove_slot(t.name, num) is not None:
+                    if not silent:
+                        print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Record on position {num} successfully removed.")
 
                 else:
                     print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Position {num} is already empty.")
 
             else:
-                print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Position {num} is out of range of 0:{self.table_capacity - 1} indexed of hash_table.")
+                print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Position {num} is out of range of 0:{t.capacity - 1} indexed of hash_table.")
 
         else:
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid mode. The possible modes are: record, hash")
@@ -497,26 +461,22 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of clear: clear (table=[toeplitz, xor]).")
             return
 
-        params = self.get_params(table)
+        t = self.model.table(table)
 
-        if params is None:
-            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are both, toeplitz, xor.")
+        if t is None:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid table. Possible tables are toeplitz, xor.")
             return
 
         clear_safe_switch = False
 
         if not silent:
-            clear_safe_switch = input(f"{colorama.Fore.RED}You are about to delete all records in {params[0]} TABLE. Are you sure? (y/n) {colorama.Style.RESET_ALL}") == "y"
+            clear_safe_switch = input(f"{colorama.Fore.RED}You are about to delete all records in {t.name} TABLE. Are you sure? (y/n) {colorama.Style.RESET_ALL}") == "y"
 
         if clear_safe_switch or silent:
-            params[2].clear()
-            params[3] = self.table_capacity * [[False, 0]]
-
-            self.t_params[4] = 0 if table == "toeplitz" else self.t_params[4]
-            self.x_params[4] = 0 if table == "xor" else self.x_params[4]
+            self.model.clear(t.name)
 
             if not silent:
-                print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} {params[0]} TABLE has been cleared.")
+                print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} {t.name} TABLE has been cleared.")
         else:
             if not silent:
                 print("Clear operation aborted.")
@@ -527,11 +487,21 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
         print(f"\n{colorama.Fore.BLUE + colorama.Style.BRIGHT}CONNECTED TO COMPONENT:{colorama.Style.RESET_ALL} {self.conected_to_comp}")
         print(f"\n{colorama.Fore.BLUE + colorama.Style.BRIGHT}MVB_KEY_WIDTH:{colorama.Style.RESET_ALL} {self.mvb_key_width}\n{colorama.Fore.BLUE + colorama.Style.BRIGHT}DATA_OUT_WIDTH:{colorama.Style.RESET_ALL} {self.data_out_width}\n{colorama.Fore.BLUE + colorama.Style.BRIGHT}HASH_WIDTH:{colorama.Style.RESET_ALL} {self.hash_width}\n{colorama.Fore.BLUE + colorama.Style.BRIGHT}self.hash_key_WIDTH:{colorama.Style.RESET_ALL} {self.hash_key_width}\n{colorama.Fore.BLUE + colorama.Style.BRIGHT}TABLE_CAPACITY:{colorama.Style.RESET_ALL} {self.table_capacity}\n")
 
-    def comm_commit(self, silent: bool = False) -> None:
+    def comm_commit(self, silent: bool = False, verify: bool = False, bulk: bool = None, full: bool = False, hitless: bool = True) -> None:
         """Upload data from the tables to component.
 
+        Only differences against the shadow copy of the programmed tables are written (see prepare_delta). The tables
+        are cleared and all records are written (see prepare_commit) on the first commit, after change of the hash key
+        or when requested. The whole write stream is prepared first and then issued at once. Number of MI writes
+        and commit time are stored in commit_stats.
+
         Args:
             silent: if True, cancels print-outs.
+            verify: if True, verifies the configuration of the component and the committed stream (see verify_commit).
+            bulk: if True, writes to consecutive registers are issued as one bulk write. By default, when the nfb
+            handle supports bulk writes.
+            full: if True, clears the tables and writes all records.
+            hitless: if True, differential update is ordered so no key misses during the update.
 
         """
 
@@ -544,88 +514,120 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
                 print("Commit operation aborted.")
                 return
 
-        hash_key_bytes = (self.hash_key).to_bytes(self.hash_key_width // 8, 'little')
+        full = full or self.hw_tables is None or self.hw_hash_key != self.hash_key
+
+        if full:
+            stream = self.prepare_commit()
+            changes = None
+        else:
+            stream, changes = self.prepare_delta(hitless)
 
-        for i in range(ceildiv(4, len(hash_key_bytes))):
-            self._comp.write32(self._HASH_KEY_REG, int.from_bytes(hash_key_bytes[4 * i: 4 * (i + 1)], 'little'))
+        self.commit_stats = stream.issue(self._comp, bulk=bulk)
+        base = None if full else self.hw_tables
 
-        self._comp.write32(self._COMMAND_REG, self._CLEAR_TABLES)
+        self.hw_tables = stream.replay(self.table_capacity, base)
+        self.hw_hash_key = self.hash_key
 
-        params = [self.t_params, self.x_params]
+        if changes is not None:
+            self.commit_stats.update(changes)
+
+        if not silent:
+            stats = self.commit_stats
+            if changes is None:
+                print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} {stats['records']} records committed in {stats['time'] * 1000:.3f} ms ({stats['writes']} MI writes in {stats['transactions']} transactions).")
+            else:
+                print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} {stats['adds']} added, {stats['replacements']} replaced and {stats['removals']} removed records committed in {stats['time'] * 1000:.3f} ms ({stats['writes']} MI writes in {stats['transactions']} transactions).")
+                if stats['unordered'] > 0:
+                    print(f"{colorama.Fore.RED}Warning:{colorama.Style.RESET_ALL} {stats['unordered']} records swap positions between the tables, their keys could miss during the update.")
 
-        for i in range(self.num_of_tables):
-            self._comp.write32(self._COMMAND_REG, i)
+        if verify:
+            self.verify_commit(stream, base)
 
-            # name = params[i][0]
-            hash_function, keys, hash_table, used = params[i][1:5]
+    def prepare_commit(self) -> WriteStream:
+        """Prepares MI writes that set the hash key, clear both tables and write all records.
 
-            for j in range(len(keys)):
-                hash_key = hash_function(keys[j], self.hash_func_params)
-                address_bytes = hash_key.to_bytes(self.mvb_key_width // 8, 'little')
-                data_bytes = ((int(keys[j]) << (self.data_out_width + 1)) + (hash_table[hash_key][1] << 1) + 1).to_bytes((self.mvb_key_width // 8) + (self.data_out_width // 8) + 1, 'little')
+        Returns:
+            Prepared write stream.
 
-                self._comp.write32(self._ADDR_REG, int.from_bytes(address_bytes, 'little'))
+        """
 
-                for k in range(ceildiv(4, len(data_bytes))):
-                    self._comp.write32(self._DATA_REG, int.from_bytes(data_bytes[4 * k: 4 * (k + 1)], 'little'))
+        stream = WriteStream(self.mvb_key_width, self.data_out_width, self.hash_key_width)
+        stream.set_hash_key(self.hash_key)
+        stream.clear()
 
-                self._comp.write32(self._COMMIT_REG, 0)
+        for i, t in enumerate(self.model.tables):
+            stream.select(i)
+            for slot, key, data in t.records():
+                stream.record(slot, key, data)
 
-    def comm_save(self, path: str = None, silent: bool = False) -> None:
-        """Save configuration to a file.
+        return stream
+
+    def prepare_delta(self, hitless: bool = True) -> (WriteStream, dict):
+        """Prepares MI writes of records that differ from the shadow copy of the programmed tables.
 
         Args:
-            path: path, where is the config file to be saved.
-            silent: if True, cancels print-outs.
+            hitless: if True, orders the writes so no key misses during the update.
+
+        Returns:
+            Prepared write stream and numbers of added, replaced and removed records.
 
         """
-        if path is None:
-            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of save: save (path).")
-            return
-        try:
-            fp = open(path, 'w+')
-        except Exception:
-            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Failed to create file {path}.")
-            return
 
-        yaml_data = dict()
-        comp_conf = dict()
+        stream = WriteStream(self.mvb_key_width, self.data_out_width, self.hash_key_width)
+        changes = stream.delta(self.hw_tables, self.model.images(), hitless)
+
+        return stream, changes
+
+    def verify_commit(self, stream: WriteStream, base: list = None) -> bool:
+        """Verifies the commit. Tables of the component can't be read over MI, so the verification reads configuration
+        of the component (in one bulk read) and checks that the committed stream programs exactly the records of the
+        tables (by replaying it against a model of the table write path).
+
+        Args:
+            stream: committed write stream.
+            base: content of the tables before the commit (for differential commit).
+
+        Returns:
+            True if verification passed.
+
+        """
 
-        yaml_data["mvb_hash_table_simple"] = comp_conf
+        config = read_config(self._comp)
+        expected = [self.mvb_key_width, self.data_out_width, self.hash_width, self.hash_key_width, self.table_capacity]
 
-        comp_conf["hash_key"] = self.hash_key
-        comp_conf["mvb_key_width"] = self.mvb_key_width
-        comp_conf["data_out_width"] = self.data_out_width
-        comp_conf["table_capacity"] = self.table_capacity
-        comp_conf["hash_width"] = self.hash_width
-        comp_conf["hash_key_width"] = self.hash_key_width
-        comp_conf["num_of_tables"] = self.num_of_tables
+        if config[1:] != expected:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Configuration of the component {config[1:]} doesn't match the toolkit {expected}.")
+            return False
 
-        params = [self.t_params, self.x_params]
+        tables = stream.replay(self.table_capacity, base)
+        images = self.model.images()
 
-        for i in range(self.num_of_tables):
-            name = params[i][0]
-            hash_function = params[i][1]
-            keys = params[i][2]
-            hash_table = params[i][3]
-            used = params[i][4]
+        for i, t in enumerate(self.model.tables):
+            if tables[i] != images[i]:
+                print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Committed {t.name} TABLE doesn't match the records.")
+                return False
 
-            yaml_hash_table = comp_conf[name] = list()
+        print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Commit verified.")
+        return True
 
-            for j in range(used):
-                record_wrap = dict()
-                record = dict()
-                h = hash_function(keys[j], self.hash_func_params)
+    def comm_save(self, path: str = None, silent: bool = False) -> None:
+        """Save configuration to a file.
 
-                record_wrap["record"] = record
+        Args:
+            path: path, where is the config file to be saved.
+            silent: if True, cancels print-outs.
 
-                record["mvb_key"] = keys[j]
-                record["data"] = hash_table[h][1]
+        """
 
-                yaml_hash_table.append(record_wrap)
+        if path is None:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of save: save (path).")
+            return
 
-        yaml.safe_dump(yaml_data, fp)
-        fp.close()
+        try:
+            self.model.save(path)
+        except Exception:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Failed to create file {path}.")
+            return
 
         if not silent:
             print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Configuration successfully saved to {path}.")
@@ -636,29 +638,31 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
         Args:
             path: path to the config file to be loaded
             silent: if True, cancels print-outs.
+
         """
 
         if path is None:
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of load: load (path).")
             return
 
-        if (len(self.t_keys) > 0 or len(self.x_keys) > 0) and not silent:
+        if len(self.model) > 0 and not silent:
             if input(f"{colorama.Fore.RED}Warning:{colorama.Style.RESET_ALL} Unsaved changes will be ovewritten. Continue? (y/n) ") != "y":
                 print("Load operation aborted.")
                 return
+
         try:
             fp = open(path, 'r')
         except Exception:
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Failed to open file {path}.")
             return
 
-        params = [self.t_params, self.x_params]
-
         try:
             yaml_data = yaml.safe_load(fp)
         except Exception:
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Failed to read yaml data.")
             return
+        finally:
+            fp.close()
 
         comp_conf = yaml_data.get("mvb_hash_table_simple", None)
 
@@ -666,8 +670,6 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
             print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Configuration file not intended for MVB_HASH_TABLE_SIMPLE or in a wrong format.")
             return
 
-        self.hash_key = comp_conf["hash_key"]
-
         if self.conected_to_comp:
             try:
                 assert (self.mvb_key_width == comp_conf["mvb_key_width"])
@@ -676,57 +678,77 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
                 assert (self.hash_width == comp_conf["hash_width"])
                 assert (self.hash_key_width == comp_conf["hash_key_width"])
                 assert (self.num_of_tables == comp_conf["num_of_tables"])
-
             except Exception:
                 print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Parameter missing or parametres in configuration file and in connected component don't match.")
                 return
 
-        else:
-            self.mvb_key_width = comp_conf["mvb_key_width"]
-            self.data_out_width = comp_conf["data_out_width"]
-            self.table_capacity = comp_conf["table_capacity"]
-            self.hash_width = comp_conf["hash_width"]
-            self.hash_key_width = comp_conf["hash_key_width"]
-            self.num_of_tables = comp_conf["num_of_tables"]
-
-        self.hash_func_params = {
-            "hash_key": self.hash_key,
-            "mvb_key_width": self.mvb_key_width,
-            "hash_key_width": self.hash_key_width,
-            "hash_width": self.hash_width
-        }
+        try:
+            self.model = HashTableModel.from_config(comp_conf)
+        except (KeyError, TypeError):
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Data in record missing or in wrong format.")
+            return
+        except ValueError as e:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} {e}")
+            return
 
-        for i in range(self.num_of_tables):
-            clear_table = "toeplitz" if i == 0 else "xor"
-            self.comm_clear(clear_table, silent=True)
+        if not silent:
+            print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Configuration successfully loaded.")
 
-            name = params[i][0]
-            hash_function = params[i][1]
-            keys = params[i][2]
-            hash_table = params[i][3]
+    def place_records(self, records: dict, candidates: int = 0):
+        """Places all records into the tables using the placement solver (see placement.py) and replaces content
+        of the tables with them.
 
-            table_data = comp_conf.get(name, [])
+        Args:
+            records: dictionary of data indexed by MVB keys.
+            candidates: number of random hash keys tested for better placement (0 keeps the current hash key).
 
-            for j in range(len(table_data)):
-                try:
-                    record = table_data[j]["record"]
+        Returns:
+            Placement of the records.
 
-                    mvb_key = record["mvb_key"]
-                    h = hash_function(mvb_key, self.hash_func_params)
-                    data = record["data"]
+        """
 
-                    keys.append(mvb_key)
-                    hash_table[h] = [True, data]
-                    params[i][4] += 1
+        solver = PlacementSolver(self.hash_func_params, self.table_capacity, self.num_of_tables)
+        keys = sorted(records)
+        hash_key = self.hash_key
 
-                except Exception:
-                    print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Data in record missing or in wrong format.")
-                    return
+        if candidates > 0:
+            hash_key, _ = solver.search_hash_key(keys, candidates)
+            solver.params["hash_key"] = hash_key
 
-        fp.close()
+        placement = solver.solve(keys)
 
-        if not silent:
-            print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} Configuration successfully loaded.")
+        m = self.model
+        self.model = HashTableModel(hash_key, m.mvb_key_width, m.data_out_width, m.hash_key_width, m.table_capacity, m.num_of_tables, m.hash_width)
+        for key, (table, _pos) in placement.positions.items():
+            self.model.add(key, records[key], table)
+
+        return placement
+
+    def comm_place(self, path: str = None, candidates: int = 0) -> None:
+        """Loads all records from a config file (regardless of the table they are listed in) and places them into the
+        tables so that as many records as possible fit.
+
+        Args:
+            path: path to the config file with the records.
+            candidates: number of random hash keys tested for better placement.
+
+        """
+
+        if path is None:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid arguments. Usage of place: place (path) (candidates=0).")
+            return
+
+        try:
+            comp_conf, records = load_config(path)
+        except Exception:
+            print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Failed to read records from {path}.")
+            return
+
+        placement = self.place_records(records, candidates)
+
+        print(f"{colorama.Fore.GREEN}Success:{colorama.Style.RESET_ALL} {placement.placed()} of {len(records)} records placed (load factor {placement.load_factor() * 100:.1f} %), hash key {self.hash_key}.")
+        if len(placement.unplaced) > 0:
+            print(f"{colorama.Fore.RED}Warning:{colorama.Style.RESET_ALL} Records with keys {placement.unplaced} can't be placed.")
 
     def comm_hash(self, hash_function: str = None, num: int = None) -> None:
         """Calculates hash from the passed number using the chosen hash function (used for testing).
@@ -779,7 +801,7 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
     def comm_help(self) -> None:
         """Prints out help."""
 
-        print(f"\nThis script is used for creating, editing and applying configuration files for MVB_HASH_TABLE_SIMPLE component.\n\n{colorama.Fore.BLUE + colorama.Style.BRIGHT}Commands:{colorama.Style.RESET_ALL}\n\tadd (key) (data) (table=[*toeplitz, xor]) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- creates new record{colorama.Style.RESET_ALL}\n\tlist (mode=[records, table]) (table=[*both, toeplitz, xor]) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- lists records or hash table{colorama.Style.RESET_ALL}\n\treplace (table=[toeplitz, xor]) (record_num) (key) (data) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- replaces data in specified record with specified data{colorama.Style.RESET_ALL}\n\tremove (mode=[record, hash]) (table=[toeplitz, xor]) (num) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- removes record by record number or hash number{colorama.Style.RESET_ALL}\n\tclear (table=[toeplitz, xor]) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- deletes all records in specified table{colorama.Style.RESET_ALL}\n\tsave (path) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- save configuration into a file{colorama.Style.RESET_ALL}\n\tload (path) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- loads configuration from a file{colorama.Style.RESET_ALL}\n\thwconfig {colorama.Fore.BLUE + colorama.Style.BRIGHT}- displays configuration of the connected component{colorama.Style.RESET_ALL}\n\tcommit {colorama.Fore.BLUE + colorama.Style.BRIGHT}- uploads configuration to component{colorama.Style.RESET_ALL}\n\thash (hash_function=[toeplitz, xor]) (num) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- calculates hash of specified number using specified hash function (debug){colorama.Style.RESET_ALL}\n\ttestkey (hash_function=[toeplitz, xor]) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- tests hash key for collions (debug){colorama.Style.RESET_ALL}\n\tcomparehashes {colorama.Fore.BLUE + colorama.Style.BRIGHT}- test collions between toeplitz and simple xor hash functions (debug){colorama.Style.RESET_ALL}\n")
+        print(f"\nThis script is used for creating, editing and applying configuration files for MVB_HASH_TABLE_SIMPLE component.\n\n{colorama.Fore.BLUE + colorama.Style.BRIGHT}Commands:{colorama.Style.RESET_ALL}\n\tadd (key) (data) (table=[*toeplitz, xor]) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- creates new record{colorama.Style.RESET_ALL}\n\tlist (mode=[records, table]) (table=[*both, toeplitz, xor]) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- lists records or hash table{colorama.Style.RESET_ALL}\n\treplace (table=[toeplitz, xor]) (record_num) (key) (data) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- replaces data in specified record with specified data{colorama.Style.RESET_ALL}\n\tremove (mode=[record, hash]) (table=[toeplitz, xor]) (num) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- removes record by record number or hash number{colorama.Style.RESET_ALL}\n\tclear (table=[toeplitz, xor]) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- deletes all records in specified table{colorama.Style.RESET_ALL}\n\tplace (path) (candidates=0) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- places all records from a file into both tables, optionally searching for better hash key{colorama.Style.RESET_ALL}\n\tsave (path) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- save configuration into a file{colorama.Style.RESET_ALL}\n\tload (path) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- loads configuration from a file{colorama.Style.RESET_ALL}\n\thwconfig {colorama.Fore.BLUE + colorama.Style.BRIGHT}- displays configuration of the connected component{colorama.Style.RESET_ALL}\n\tcommit {colorama.Fore.BLUE + colorama.Style.BRIGHT}- uploads configuration to component{colorama.Style.RESET_ALL}\n\thash (hash_function=[toeplitz, xor]) (num) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- calculates hash of specified number using specified hash function (debug){colorama.Style.RESET_ALL}\n\ttestkey (hash_function=[toeplitz, xor]) {colorama.Fore.BLUE + colorama.Style.BRIGHT}- tests hash key for collions (debug){colorama.Style.RESET_ALL}\n\tcomparehashes {colorama.Fore.BLUE + colorama.Style.BRIGHT}- test collions between toeplitz and simple xor hash functions (debug){colorama.Style.RESET_ALL}\n")
 
     def error(self) -> None:
         """Prints out generic error."""
@@ -787,64 +809,6 @@ class MVB_HASH_TABLE_SIMPLE_TOOLKIT(nfb.BaseComp):
         print(f"{colorama.Fore.RED}Error:{colorama.Style.RESET_ALL} Invalid command or arguments. Use command 'help' to view usage.")
 
 
-def toeplitz_hash(mvb_key: int, params: dict) -> int:
-    """Calculates hash using the toeplitz hash function.
-
-    Args:
-        mvb_key: integer for which the hash is to be calculated.
-        params: dictionary containing parametres of the component (hash_key, mvb_key_width, hash_key_width, hash_width)
-
-    Returns:
-        Calculated hash.
-
-    """
-
-    hash_key = params["hash_key"]
-    mvb_key_width = params["mvb_key_width"]
-    hash_key_width = params["hash_key_width"]
-    hash_width = params["hash_width"]
-
-    hash_key_bits = LogicArray(hash_key, Range(hash_key_width-1, 'downto', 0))
-    mvb_key_bits = LogicArray(mvb_key, Range(mvb_key_width-1, 'downto', 0))
-    hash_bits = LogicArray(0, Range(hash_width-1, 'downto', 0))
-
-    for i in Range(mvb_key_width-1, 'downto', 0):
-        key_slice = hash_key_bits[hash_key_width-(mvb_key_width-1-i)-1 : hash_key_width-hash_width-(mvb_key_width-1-i)]
-        key_hash = LogicArray(0, Range(hash_width-1, 'downto', 0))
-
-        if mvb_key_bits[i]:
-            key_hash = key_slice
-
-        hash_bits = hash_bits ^ key_hash
-
-    return hash_bits.integer
-
-
-def simple_xor_hash(mvb_key: int, params: dict) -> int:
-    """Calculates hash using the simple xor hash function.
-
-    Args:
-        mvb_key: integer for which the hash is to be calculated.
-        params: dictionary containing parametres of the component (hash_key, mvb_key_width, hash_key_width, hash_width)
-
-    Returns:
-        Calculated hash.
-
-    """
-
-    hash_key = params["hash_key"]
-    mvb_key_width = params["mvb_key_width"]
-    hash_key_width = params["hash_key_width"]
-    hash_width = params["hash_width"]
-
-    hash_key_bits = LogicArray(hash_key, Range(hash_key_width, 'downto', 0))
-    mvb_key_bits = LogicArray(mvb_key, Range(mvb_key_width, 'downto', 0))
-
-    hash_bits = mvb_key_bits[hash_width-1 : 0] ^ hash_key_bits[hash_width-1 : 0]
-
-    return hash_bits.integer
-
-
 def main() -> None:
     """Main function of the script if run from the terminal."""
 